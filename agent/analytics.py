@@ -0,0 +1,308 @@
+"""
+Meeting-load analytics over a window, recurring meetings expanded:
+
+- hours booked per person and week;
+- back-to-back meetings per person (the next one starts at most
+  BACK_TO_BACK_GAP minutes after the previous one ends);
+- a weekday x hour heatmap of meeting starts;
+- what each recurring meeting costs in person-hours;
+- the same totals for teams (any named group of people).
+
+Everything is computed with NumPy on the scheduler's columnar snapshot
+(agent/meeting_store.py). Occurrences are generated arithmetically per
+series, exploded per participant with np.repeat and aggregated with
+bincount / lexsort, never walked one by one in Python. Times are wall
+clock in the calendar zone. Reports are cached per window in the read
+cache until the next write.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import scheduler
+from .cache import read_cache
+from .instrumentation import timed
+from .meeting_store import NO_UNTIL, NONE_CODE, RECURRENCE_CODES
+from .recurrence import RECURRENCE_TYPES
+from .timezones import to_utc_minutes
+
+# Minutes between two meetings of one person that still count as back to back.
+BACK_TO_BACK_GAP = 5
+# Recurring meetings listed by recurring_cost().
+TOP_RECURRING = 20
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+_EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+_MONDAY = 4 * 1440  # 1970-01-05, the first Monday after the epoch
+_WEEK = 7 * 1440
+_PERIODS = {RECURRENCE_CODES["daily"]: 1440, RECURRENCE_CODES["weekly"]: _WEEK}
+_MONTHLY = RECURRENCE_CODES["monthly"]
+
+
+def _wall_minutes(dt):
+    return (dt - _EPOCH) // _MINUTE
+
+
+def _from_wall_minutes(minutes):
+    return _EPOCH + _MINUTE * int(minutes)
+
+
+def _ceil_div(a, b):
+    return -((-a) // b)
+
+
+def _explode(counts):
+    """
+    For `counts` items per row: the row of every item and its number
+    within the row.
+    """
+    owner = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, within
+
+
+def _months(days):
+    # Months since 1970-01 of epoch-day numbers.
+    return days.astype("M8[D]").astype("M8[M]").astype(np.int64)
+
+
+def _month_first_day(months):
+    return months.astype("M8[M]").astype("M8[D]").astype(np.int64)
+
+
+def expand_occurrences(columns, window_start, window_end):
+    """
+    Every occurrence overlapping [window_start, window_end) (wall-clock
+    epoch minutes) as (rows, starts, ends) arrays: rows are positions in
+    `columns`, starts/ends wall-clock minutes.
+    """
+    utc_end = to_utc_minutes(_from_wall_minutes(window_end), round_up=True)
+    one_off = columns.in_range(to_utc_minutes(_from_wall_minutes(window_start)), utc_end)
+    one_off = one_off[columns.recurrence[one_off] == NONE_CODE]
+    parts = [(
+        one_off,
+        columns.local_minutes(columns.start[one_off]),
+        columns.local_minutes(columns.end[one_off]),
+    )]
+
+    series = columns.series_rows()
+    series = series[columns.start[series] < utc_end]
+    first = columns.local_minutes(columns.start[series])
+    duration = columns.end[series] - columns.start[series]
+    cutoff = columns.until[series].copy()
+    finite = cutoff != NO_UNTIL
+    cutoff[finite] = columns.local_minutes(cutoff[finite])
+    codes = columns.recurrence[series]
+
+    # Daily and weekly: occurrence k starts at first + k * period.
+    fixed = np.isin(codes, list(_PERIODS))
+    if fixed.any():
+        rows, s0, d, c = series[fixed], first[fixed], duration[fixed], cutoff[fixed]
+        period = np.where(codes[fixed] == RECURRENCE_CODES["daily"], 1440, _WEEK)
+        k_lo = np.maximum((window_start - d - s0) // period + 1, 0)
+        k_hi = _ceil_div(window_end - s0, period) - 1
+        k_hi = np.where(c != NO_UNTIL, np.minimum(k_hi, _ceil_div(c - s0, period) - 1), k_hi)
+        owner, within = _explode(np.maximum(k_hi - k_lo + 1, 0))
+        starts = s0[owner] + (k_lo[owner] + within) * period[owner]
+        parts.append((rows[owner], starts, starts + d[owner]))
+
+    # Monthly: the same day of month (clamped to shorter months) and time.
+    monthly = codes == _MONTHLY
+    if monthly.any():
+        rows, s0, d, c = series[monthly], first[monthly], duration[monthly], cutoff[monthly]
+        first_month = _months(s0 // 1440)
+        day_of_month = s0 // 1440 - _month_first_day(first_month)
+        k_lo = np.maximum(_months((window_start - d) // 1440) - first_month - 1, 0)
+        k_hi = _months(np.full(len(rows), (window_end - 1) // 1440)) - first_month
+        owner, within = _explode(np.maximum(k_hi - k_lo + 1, 0))
+        month = first_month[owner] + k_lo[owner] + within
+        month_days = _month_first_day(month + 1) - _month_first_day(month)
+        day = _month_first_day(month) + np.minimum(day_of_month[owner], month_days - 1)
+        starts = day * 1440 + s0[owner] % 1440
+        ends = starts + d[owner]
+        keep = (starts < window_end) & (ends > window_start) & (starts < c[owner])
+        parts.append((rows[owner][keep], starts[keep], ends[keep]))
+
+    rows, starts, ends = (np.concatenate(column) for column in zip(*parts))
+    return rows, starts, ends
+
+
+class LoadReport:
+    """
+    The occurrences of one window, exploded per participant, and the
+    reports computed from them. Build through load_report().
+    """
+
+    def __init__(self, columns, window_start, window_end):
+        self.window_start = window_start
+        self.window_end = window_end
+        rows, self.starts, self.ends = expand_occurrences(
+            columns, _wall_minutes(window_start), _wall_minutes(window_end)
+        )
+        self.ids = columns.ids[rows]
+        self.recurrence = columns.recurrence[rows]
+        self.minutes = self.ends - self.starts
+        self.people = columns.people
+        self.person_index = columns.person_index
+        # One entry per (occurrence, participant); meetings without
+        # participants are left out of the per-person reports.
+        owner, within = _explode(columns.person_offsets[rows + 1] - columns.person_offsets[rows])
+        person = columns.person_codes[columns.person_offsets[rows][owner] + within]
+        named = person != columns.person_index.get(scheduler.UNASSIGNED, -1)
+        self.attendance = owner[named]  # occurrence of each entry
+        self.person = person[named]
+        self._totals = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _codes(self, people):
+        return [self.person_index[person] for person in people if person in self.person_index]
+
+    def _entries(self, people=None):
+        if people is None:
+            return np.arange(len(self.person))
+        return np.flatnonzero(np.isin(self.person, self._codes(people)))
+
+    def booked_hours(self):
+        return float(self.minutes.sum()) / 60
+
+    def weekly_hours(self, people=None):
+        """
+        Hours booked per person (rows) and week (columns, by the Monday it
+        starts on), counting each occurrence in the week it starts (the
+        first week for one already running when the window opens).
+        """
+        entries = self._entries(people)
+        first_week = (_wall_minutes(self.window_start) - _MONDAY) // _WEEK
+        weeks = _ceil_div(_wall_minutes(self.window_end) - _MONDAY, _WEEK) - first_week
+        occurrence = self.attendance[entries]
+        week = np.maximum((self.starts[occurrence] - _MONDAY) // _WEEK - first_week, 0)
+        key = self.person[entries] * weeks + week
+        hours = np.bincount(key, weights=self.minutes[occurrence], minlength=len(self.people) * weeks) / 60
+        table = hours.reshape(len(self.people), weeks)
+        booked = np.flatnonzero(table.sum(axis=1))
+        mondays = [
+            (_from_wall_minutes(_MONDAY + (first_week + week) * _WEEK)).date() for week in range(weeks)
+        ]
+        frame = pd.DataFrame(table[booked], index=[self.people[code] for code in booked], columns=mondays)
+        frame.index.name = "Person"
+        return frame.loc[frame.sum(axis=1).sort_values(ascending=False).index]
+
+    def _per_person(self):
+        """
+        Meetings, hours and back-to-back counts per person code.
+        """
+        if self._totals is None:
+            self._totals = self._person_totals()
+        return self._totals
+
+    def _person_totals(self):
+        occurrence = self.attendance
+        order = np.lexsort((self.starts[occurrence], self.person))
+        person = self.person[order]
+        starts, ends = self.starts[occurrence[order]], self.ends[occurrence[order]]
+        gap = starts[1:] - ends[:-1]
+        back_to_back = (person[1:] == person[:-1]) & (gap >= 0) & (gap <= BACK_TO_BACK_GAP)
+        size = len(self.people)
+        return (
+            np.bincount(self.person, minlength=size),
+            np.bincount(self.person, weights=self.minutes[occurrence], minlength=size) / 60,
+            np.bincount(person[1:][back_to_back], minlength=size),
+        )
+
+    def back_to_back(self):
+        """
+        Per person: meetings, hours and how many followed the previous one
+        within BACK_TO_BACK_GAP minutes, most back-to-back first.
+        """
+        meetings, hours, back_to_back = self._per_person()
+        booked = np.flatnonzero(meetings)
+        frame = pd.DataFrame({
+            "Person": [self.people[code] for code in booked],
+            "Meetings": meetings[booked],
+            "Hours": hours[booked].round(2),
+            "Back to back": back_to_back[booked],
+        })
+        return frame.sort_values(["Back to back", "Hours"], ascending=False, ignore_index=True)
+
+    def heatmap(self, people=None):
+        """
+        Meetings starting in each hour (columns 0-23) of each weekday
+        (rows), among those `people` attend (all meetings when None).
+        """
+        if people is None:
+            occurrence = np.arange(len(self))
+        else:
+            occurrence = np.unique(self.attendance[self._entries(people)])
+        starts = self.starts[occurrence]
+        weekday = (starts - _MONDAY) // 1440 % 7
+        hour = starts % 1440 // 60
+        counts = np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+        return pd.DataFrame(counts, index=list(WEEKDAYS), columns=range(24))
+
+    def recurring_cost(self, top=TOP_RECURRING):
+        """
+        The `top` recurring meetings by person-hours in the window
+        (occurrences x length x attendees).
+        """
+        recurring = np.flatnonzero(self.recurrence != NONE_CODE)
+        if not len(recurring):
+            return pd.DataFrame(columns=["Title", "Recurrence", "Occurrences", "Attendees", "Person-hours"])
+        attendees = np.bincount(self.attendance, minlength=len(self))
+        ids, series = np.unique(self.ids[recurring], return_inverse=True)
+        occurrences = np.bincount(series)
+        person_hours = np.bincount(
+            series, weights=self.minutes[recurring] * attendees[recurring]
+        ) / 60
+        first = np.zeros(len(ids), np.int64)
+        first[series[::-1]] = recurring[::-1]  # an occurrence of each series
+        best = np.argsort(-person_hours, kind="stable")[:top]
+        rows = scheduler.get_meetings_by_id(ids[best].tolist())
+        return pd.DataFrame({
+            "Title": [rows[meeting_id].title if meeting_id in rows else "" for meeting_id in ids[best].tolist()],
+            "Recurrence": [RECURRENCE_TYPES[code] for code in self.recurrence[first[best]]],
+            "Occurrences": occurrences[best],
+            "Attendees": attendees[first[best]],
+            "Person-hours": person_hours[best].round(2),
+        })
+
+    def team_summary(self, teams):
+        """
+        One row per team ({name: people}): its meetings (each counted once
+        however many members attend), their hours, the members' summed
+        person-hours and back-to-back meetings, and person-hours per member
+        per week.
+        """
+        meetings, hours, back_to_back = self._per_person()
+        weeks = max((self.window_end - self.window_start) / timedelta(weeks=1), 1 / 7)
+        records = []
+        for name, members in teams.items():
+            codes = self._codes(members)
+            occurrence = np.unique(self.attendance[np.isin(self.person, codes)])
+            person_hours = float(hours[codes].sum())
+            records.append({
+                "Team": name,
+                "Members": len(members),
+                "Meetings": len(occurrence),
+                "Hours": round(float(self.minutes[occurrence].sum()) / 60, 2),
+                "Person-hours": round(person_hours, 2),
+                "Back to back": int(back_to_back[codes].sum()),
+                "Hours per member per week": round(person_hours / max(len(members), 1) / weeks, 2),
+            })
+        return pd.DataFrame(records)
+
+
+@timed("analytics.load_report")
+def load_report(window_start, window_end):
+    """
+    LoadReport of [window_start, window_end) (naive wall-clock datetimes),
+    archived meetings included, from the read cache until the next write.
+    """
+    columns = scheduler.get_history_columns(window_start, window_end)
+    return read_cache.get(
+        ("analytics", window_start, window_end),
+        lambda: LoadReport(columns, window_start, window_end),
+    )
@@ -0,0 +1,64 @@
+from datetime import date, datetime, time, timedelta
+
+import streamlit as st
+
+from agent.analytics import BACK_TO_BACK_GAP, load_report
+from agent.instrumentation import timer
+from agent.scheduler import get_meeting_date_bounds
+
+# Weeks shown when the tab opens, from the Monday of the current week.
+DEFAULT_WEEKS = 4
+
+
+def _default_window():
+    monday = date.today() - timedelta(days=date.today().weekday())
+    return monday, monday + timedelta(weeks=DEFAULT_WEEKS) - timedelta(days=1)
+
+
+def show_analytics_view():
+    """
+    Meeting-load reports for a date range, recurring occurrences included:
+    hours per person and week, back-to-back meetings, a peak-hour heatmap,
+    recurring-meeting cost and a team summary.
+    """
+    first_start, _ = get_meeting_date_bounds()
+    if first_start is None:
+        st.info("No meetings scheduled yet.")
+        return
+
+    window = st.date_input("Window", value=_default_window(), key="analytics_window")
+    if len(window) != 2:
+        st.caption("Pick the last day of the window.")
+        return
+    first_day, last_day = window
+    report = load_report(
+        datetime.combine(first_day, time()), datetime.combine(last_day + timedelta(days=1), time())
+    )
+    if not len(report):
+        st.info("No meetings in this window.")
+        return
+
+    with timer("analytics_view.render"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Meetings", f"{len(report):,}")
+        col2.metric("Hours booked", f"{report.booked_hours():,.1f}")
+        col3.metric("People", f"{len(set(report.person.tolist())):,}")
+
+        st.write("#### Hours booked per week")
+        st.dataframe(report.weekly_hours().round(1), width="stretch")
+
+        st.write(f"#### Back-to-back meetings (≤ {BACK_TO_BACK_GAP} min apart)")
+        st.dataframe(report.back_to_back(), width="stretch", hide_index=True)
+
+        st.write("#### Recurring meetings by cost")
+        st.dataframe(report.recurring_cost(), width="stretch", hide_index=True)
+
+        st.write("#### Peak hours (meetings starting per weekday and hour)")
+        members = st.multiselect(
+            "Team (leave empty for everyone)",
+            sorted(person for person in report.person_index if person),
+            key="analytics_team",
+        )
+        st.dataframe(report.heatmap(members or None), width="stretch")
+        if members:
+            st.dataframe(report.team_summary({"Team": members}), width="stretch", hide_index=True)
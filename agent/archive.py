@@ -0,0 +1,224 @@
+"""
+Archival of past meetings and database upkeep, so the meetings table (and
+every index built from it) stays the size of the live calendar however
+long the history grows.
+
+- run_archival() moves meetings that were over more than ARCHIVE_AFTER ago
+  to meetings_archive, in batched transactions (scheduler.archive_meetings);
+- run_maintenance() refreshes planner statistics (ANALYZE) after an
+  archival that moved rows or at least every ANALYZE_INTERVAL, and
+  reclaims the freed pages (VACUUM) every VACUUM_INTERVAL;
+- get_archive_worker() does both every ARCHIVE_INTERVAL on a background
+  thread.
+
+Archived meetings stay readable: scheduler.get_meeting_history reads both
+tables as one, and conflict checks, the calendar and analytics reach into
+the archive for dates before the horizon.
+
+ARCHIVE_AFTER_DAYS=0 turns archival off; maintenance still runs.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from . import db, timezones
+from .db import session_scope, ArchiveState
+from .instrumentation import timed
+from .scheduler import ARCHIVE_BATCH, archive_meetings
+from .sync import SYNC_PENDING_SOURCE
+
+# Meetings are archived once they have been over this long (whole days).
+ARCHIVE_AFTER = timedelta(days=int(os.getenv("ARCHIVE_AFTER_DAYS", "90")))
+# Seconds between runs of the background worker.
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", str(6 * 3600)))
+ANALYZE_INTERVAL = timedelta(days=1)
+VACUUM_INTERVAL = timedelta(days=7)
+# Never archived: meetings the calendar sync has yet to push.
+KEEP_SOURCES = (SYNC_PENDING_SOURCE,)
+
+# dialect -> statements, run outside a transaction
+ANALYZE_STATEMENTS = {
+    "sqlite": ["ANALYZE"],
+    "postgresql": ["ANALYZE meetings", "ANALYZE meeting_participants", "ANALYZE meetings_archive"],
+}
+VACUUM_STATEMENTS = {
+    # Rewrites the file without the archived pages, then truncates the WAL
+    # the rewrite went through.
+    "sqlite": ["VACUUM", "PRAGMA wal_checkpoint(TRUNCATE)"],
+    "postgresql": ["VACUUM meetings", "VACUUM meeting_participants"],
+}
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def archive_cutoff(now=None):
+    """
+    Calendar-zone midnight ARCHIVE_AFTER before `now` (default: the current
+    time): meetings over by then are archived. None when archival is off.
+    """
+    if ARCHIVE_AFTER <= timedelta(0):
+        return None
+    now = timezones.to_wall_clock(now if now is not None else timezones.now())
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) - ARCHIVE_AFTER
+
+
+@timed("archive.run_archival")
+def run_archival(now=None, batch_size=ARCHIVE_BATCH):
+    """
+    Archive everything over before archive_cutoff(now). Returns the number
+    of meetings moved.
+    """
+    cutoff = archive_cutoff(now)
+    if cutoff is None:
+        return 0
+    return archive_meetings(cutoff, batch_size=batch_size, keep_sources=KEEP_SOURCES)
+
+
+def _execute_outside_transaction(statements):
+    """
+    Run statements that refuse to run inside a transaction (VACUUM) on a
+    raw connection in autocommit mode. SQLite connections already are
+    (see db._configure_sqlite).
+    """
+    connection = db.engine.raw_connection()
+    driver = connection.driver_connection
+    postgres = db.engine.dialect.name == "postgresql"
+    try:
+        if postgres:
+            driver.autocommit = True
+        cursor = connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+    finally:
+        if postgres:
+            driver.autocommit = False
+        connection.close()
+
+
+@timed("archive.run_maintenance")
+def run_maintenance(moved=0, force=False):
+    """
+    ANALYZE if `moved` meetings were just archived or the last ANALYZE is
+    older than ANALYZE_INTERVAL; VACUUM if the last one is older than
+    VACUUM_INTERVAL. `force` runs both. Returns what ran ("analyze",
+    "vacuum").
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in ANALYZE_STATEMENTS:
+        return []
+    with session_scope() as session:
+        analyzed_at, vacuumed_at = session.execute(
+            select(ArchiveState.analyzed_at, ArchiveState.vacuumed_at)
+        ).one()
+
+    now = _utcnow()
+    ran, values = [], {}
+    # VACUUM first, so the ANALYZE after it sees the compacted tables.
+    if force or vacuumed_at is None or now - vacuumed_at >= VACUUM_INTERVAL:
+        _execute_outside_transaction(VACUUM_STATEMENTS[dialect])
+        ran.append("vacuum")
+        values["vacuumed_at"] = now
+    if force or moved or analyzed_at is None or now - analyzed_at >= ANALYZE_INTERVAL:
+        _execute_outside_transaction(ANALYZE_STATEMENTS[dialect])
+        ran.append("analyze")
+        values["analyzed_at"] = now
+    if values:
+        with session_scope(write=True) as session:
+            session.execute(update(ArchiveState).values(**values))
+            session.commit()
+    return ran
+
+
+def run_once(now=None):
+    """
+    One archival pass followed by the maintenance it calls for.
+    """
+    moved = run_archival(now)
+    return {"archived": moved, "maintenance": run_maintenance(moved)}
+
+
+def archive_status():
+    """
+    The ArchiveState row, for display (times as ISO strings).
+    """
+    with session_scope() as session:
+        state = session.get(ArchiveState, 1)
+        if state is None:
+            return {}
+        return {
+            name: value.isoformat(timespec="seconds") if isinstance(value, datetime) else value
+            for name, value in (
+                ("archived_before", state.archived_before),
+                ("archived_total", state.archived_total),
+                ("archived_at", state.archived_at),
+                ("analyzed_at", state.analyzed_at),
+                ("vacuumed_at", state.vacuumed_at),
+            )
+        }
+
+
+class ArchiveWorker:
+    """
+    Background thread calling run_once() every `interval` seconds, the
+    first time straight after start().
+    """
+
+    def __init__(self, interval=ARCHIVE_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+        self.last_result = None
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="archive", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "last_run": self.last_run.isoformat(timespec="seconds") if self.last_run else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.last_result = run_once()
+                self.last_error = None
+            except Exception as exc:
+                # Keep the worker alive; the next run tries again.
+                self.last_error = f"{type(exc).__name__}: {exc}"
+            self.last_run = datetime.now()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_archive_worker():
+    """
+    The process-wide ArchiveWorker, started on first call.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ArchiveWorker().start()
+        return _worker
@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Parse cache bounds: entries kept, and seconds an entry stays valid.
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "1024"))
+PARSE_CACHE_TTL = float(os.getenv("PARSE_CACHE_TTL", "3600"))
+
+
+class ReadCache:
+    """
+    Process-wide cache of read-model snapshots, versioned by a write counter.
+
+    Every write path bumps the counter via invalidate(); readers get the
+    cached snapshot for a key until the counter moves. Writes by other
+    processes are picked up by the scheduler's read API, which invalidates
+    when the calendar revision in the DB has moved (scheduler._catch_up).
+    Snapshots must be
+    immutable (tuples of namedtuples etc.) since they are shared between
+    Streamlit sessions.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries = OrderedDict()  # key -> snapshot, in LRU order
+        self._hits = 0
+        self._misses = 0
+        self._rebuild_seconds = 0.0
+        self._last_rebuild_seconds = 0.0
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self):
+        """
+        Record a write: bump the version and drop every snapshot.
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def get(self, key, loader):
+        """
+        Return the snapshot for `key`, calling loader() to build it on a miss.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+            version = self._version
+
+        started = time.perf_counter()
+        snapshot = loader()
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._rebuild_seconds += elapsed
+            self._last_rebuild_seconds = elapsed
+            # A write may have landed while we were loading; the snapshot
+            # could predate it, so hand it out but don't keep it.
+            if version == self._version:
+                self._entries[key] = snapshot
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def metrics(self):
+        """
+        Hit/miss counters and rebuild timings, for display or export.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "rebuild_seconds_total": self._rebuild_seconds,
+                "last_rebuild_seconds": self._last_rebuild_seconds,
+            }
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire `ttl` seconds after they
+    were stored. For pure functions of their key (the parser), where the
+    only reason to drop an entry is memory or age, not writes.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value), in LRU order
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evicted = 0
+
+    def get(self, key, loader):
+        """
+        Return the value for `key`, calling loader() on a miss or once the
+        entry has expired. loader() runs outside the lock.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._expired += 1
+            self._misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evicted += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        """
+        Hit/miss/eviction counters, for display or export.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "expired": self._expired,
+                "evicted": self._evicted,
+            }
+
+
+def prometheus_text():
+    """
+    Lookup counters and hit rates of the process-wide caches, in the
+    Prometheus text exposition format.
+    """
+    caches = (("read", read_cache.metrics()), ("parse", parse_cache.metrics()))
+    lines = []
+    for metric, kind, help_text, field in (
+        ("scheduler_cache_hits_total", "counter", "Cache lookups served from the cache.", "hits"),
+        ("scheduler_cache_misses_total", "counter", "Cache lookups that had to load.", "misses"),
+        ("scheduler_cache_hit_ratio", "gauge", "Hits over lookups since start.", "hit_rate"),
+        ("scheduler_cache_entries", "gauge", "Entries currently cached.", "entries"),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in caches:
+            lines.append(f'{metric}{{cache="{name}"}} {values[field]}')
+    return "\n".join(lines) + "\n"
+
+
+read_cache = ReadCache()
+# Parsed meeting requests (agent.nlp.parse_meeting_request_cached).
+parse_cache = TTLCache(PARSE_CACHE_SIZE, PARSE_CACHE_TTL)
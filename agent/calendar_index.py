@@ -0,0 +1,86 @@
+from .interval_index import IntervalIndex
+from .recurrence import SeriesIndex
+
+
+def is_recurring(recurrence_type):
+    return recurrence_type not in (None, "none")
+
+
+class CalendarIndex:
+    """
+    All meetings of one calendar: one-off meetings in an IntervalIndex,
+    recurring series in a SeriesIndex, behind a single find() so callers
+    need not care which kind a meeting is.
+    """
+
+    def __init__(self, one_off=None, series=None):
+        self.one_off = one_off if one_off is not None else IntervalIndex()
+        self.series = series if series is not None else SeriesIndex()
+
+    @classmethod
+    def build(cls, rows):
+        """
+        Build from (meeting_id, start, end, recurrence_type, recurrence_until)
+        tuples.
+        """
+        rows = list(rows)
+        return cls(
+            IntervalIndex.build(
+                (meeting_id, start, end)
+                for meeting_id, start, end, rtype, _ in rows
+                if not is_recurring(rtype)
+            ),
+            SeriesIndex.build(row for row in rows if is_recurring(row[3])),
+        )
+
+    def __len__(self):
+        return len(self.one_off) + len(self.series)
+
+    def __contains__(self, meeting_id):
+        return meeting_id in self.one_off or meeting_id in self.series
+
+    def add(self, meeting_id, start, end, recurrence_type="none", recurrence_until=None):
+        """
+        Insert (or move) a meeting, one-off or recurring.
+        """
+        self.remove(meeting_id)
+        if is_recurring(recurrence_type):
+            self.series.add(meeting_id, start, end, recurrence_type, recurrence_until)
+        else:
+            self.one_off.add(meeting_id, start, end)
+
+    def remove(self, meeting_id):
+        self.one_off.remove(meeting_id)
+        self.series.remove(meeting_id)
+
+    def remove_many(self, meeting_ids):
+        self.one_off.remove_many(meeting_ids)
+        for meeting_id in meeting_ids:
+            self.series.remove(meeting_id)
+
+    def find(self, start, end, ignore_id=None):
+        """
+        Ids of meetings with an occurrence overlapping [start, end).
+        """
+        return (
+            self.one_off.find(start, end, ignore_id=ignore_id)
+            + self.series.find(start, end, ignore_id=ignore_id)
+        )
+
+    def overlaps(self, start, end, ignore_id=None):
+        return (
+            self.one_off.overlaps(start, end, ignore_id=ignore_id)
+            or self.series.overlaps(start, end, ignore_id=ignore_id)
+        )
+
+    def intervals(self, window_start, window_end):
+        """
+        Sorted (start, end) of every occurrence inside the window.
+        """
+        busy = [(start, end) for start, end, _ in self.one_off.intervals(window_start, window_end)]
+        busy.extend(
+            (start, end)
+            for _, start, end in self.series.occurrences(window_start, window_end)
+        )
+        busy.sort()
+        return busy
@@ -1,4 +1,9 @@
-from datetime import datetime
+import itertools
+import threading
+from datetime import datetime, timezone
+
+# Most operations a provider accepts in one batch request.
+PROVIDER_MAX_BATCH = 50
 
 
 def create_google_calendar_event(meeting_data: dict) -> dict:
@@ -22,7 +27,7 @@ def create_google_calendar_event(meeting_data: dict) -> dict:
     end = meeting_data.get("end_time")
 
     # Fake event id + link
-    event_id = f"fake-{int(datetime.utcnow().timestamp())}"
+    event_id = f"fake-{int(datetime.now(timezone.utc).timestamp())}"
     event_link = f"https://calendar.google.com/calendar/r/eventedit/{event_id}"
 
     return {
@@ -32,3 +37,216 @@ def create_google_calendar_event(meeting_data: dict) -> dict:
         "start": start.isoformat() if start else None,
         "end": end.isoformat() if end else None,
     }
+
+
+# --- Provider interface ------------------------------------------------------
+
+
+class ProviderError(Exception):
+    """
+    A provider request failed. `retryable` says whether trying again later
+    can succeed (rate limits, 5xx) or not (bad request, not found).
+    """
+
+    def __init__(self, message, retryable=False, status=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+
+class TransientProviderError(ProviderError):
+    def __init__(self, message="provider temporarily unavailable", status=503):
+        super().__init__(message, retryable=True, status=status)
+
+
+class SyncTokenExpired(ProviderError):
+    """
+    The sync token is too old for an incremental listing (HTTP 410 Gone);
+    the caller has to start over with a full listing.
+    """
+
+    def __init__(self, message="sync token expired"):
+        super().__init__(message, retryable=False, status=410)
+
+
+class CalendarProvider:
+    """
+    What the sync engine (agent.sync) needs from a calendar backend.
+
+    Events are dicts with keys id, status ("confirmed" or "cancelled"),
+    updated (opaque version string), title, participants, start_time,
+    end_time (aware datetimes), recurrence_type and recurrence_until.
+    """
+
+    name = "calendar"
+    max_batch = PROVIDER_MAX_BATCH
+
+    def list_events(self, calendar_id, sync_token=None, page_token=None, max_results=500):
+        """
+        One page of events. Without a sync token, every live event; with
+        one, everything changed since it was issued, cancellations included.
+        Returns {"items": [...], "next_page_token": str or None,
+        "next_sync_token": str or None}; the sync token comes with the last
+        page only. Raises SyncTokenExpired if the token is no longer valid.
+        """
+        raise NotImplementedError
+
+    def batch(self, calendar_id, operations):
+        """
+        Apply up to max_batch operations in one request. Each operation is
+        {"op": "create" | "update" | "delete", "event_id": str, "event": dict}
+        (creates carry a client-chosen event_id, so retrying one is safe).
+        Returns one result per operation, in order: {"id", "updated"} on
+        success, {"error", "status", "retryable"} otherwise. Raises
+        ProviderError if the request as a whole fails.
+        """
+        raise NotImplementedError
+
+
+class FakeCalendarProvider(CalendarProvider):
+    """
+    In-memory provider with the same paging, sync-token and batch semantics
+    as the Google Calendar API, for local use, tests and benchmarks.
+
+    Failures can be injected with fail_next(), remote-side changes made with
+    put_event()/cancel_event(), and sync tokens invalidated with
+    expire_sync_tokens().
+    """
+
+    name = "google_calendar"
+
+    def __init__(self, max_batch=PROVIDER_MAX_BATCH):
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._events = {}   # calendar_id -> {event_id: event}
+        self._changed = {}  # calendar_id -> {event_id: change number}
+        self._sequence = itertools.count(1)
+        self._last_change = 0
+        self._token_epoch = 0  # sync tokens from an earlier epoch have expired
+        self._failures = []
+        self._ids = itertools.count(1)
+        self.requests = {"list": 0, "batch": 0}
+
+    # -- test hooks --
+
+    def fail_next(self, error=None, times=1):
+        """
+        Make the next `times` requests raise `error` (default: a 503).
+        """
+        with self._lock:
+            self._failures.extend([error or TransientProviderError()] * times)
+
+    def expire_sync_tokens(self):
+        with self._lock:
+            self._token_epoch += 1
+
+    def put_event(self, calendar_id, event_id=None, **fields):
+        """
+        Create or update an event as if another client had; returns its id.
+        """
+        with self._lock:
+            event_id = event_id or f"remote{next(self._ids)}"
+            event = dict(self._events.get(calendar_id, {}).get(event_id, {}), **fields)
+            event.update(id=event_id, status="confirmed")
+            self._store(calendar_id, event)
+            return event_id
+
+    def cancel_event(self, calendar_id, event_id):
+        with self._lock:
+            event = self._events.get(calendar_id, {}).get(event_id)
+            if event is not None:
+                self._store(calendar_id, dict(event, status="cancelled"))
+
+    def get_event(self, calendar_id, event_id):
+        with self._lock:
+            event = self._events.get(calendar_id, {}).get(event_id)
+            return dict(event) if event is not None else None
+
+    def live_events(self, calendar_id):
+        with self._lock:
+            return [
+                dict(event) for event in self._events.get(calendar_id, {}).values()
+                if event["status"] != "cancelled"
+            ]
+
+    # -- provider interface --
+
+    def _store(self, calendar_id, event):
+        # Caller holds _lock.
+        change = next(self._sequence)
+        self._last_change = change
+        event["updated"] = str(change)
+        self._events.setdefault(calendar_id, {})[event["id"]] = event
+        self._changed.setdefault(calendar_id, {})[event["id"]] = change
+        return event
+
+    def _raise_injected(self):
+        # Caller holds _lock.
+        if self._failures:
+            raise self._failures.pop(0)
+
+    def list_events(self, calendar_id, sync_token=None, page_token=None, max_results=500):
+        with self._lock:
+            self.requests["list"] += 1
+            self._raise_injected()
+            if page_token:
+                # A listing in progress: (full?, changes after, changes up to,
+                # last change returned so far).
+                full, since, upto, after = page_token.split(":")
+                full, since, upto, after = full == "1", int(since), int(upto), int(after)
+            else:
+                since = 0
+                if sync_token:
+                    epoch, since = (int(part) for part in sync_token.split("."))
+                    if epoch != self._token_epoch:
+                        raise SyncTokenExpired()
+                full, upto, after = not sync_token, self._last_change, since
+
+            events = self._events.get(calendar_id, {})
+            changes = sorted(
+                (change, event_id)
+                for event_id, change in self._changed.get(calendar_id, {}).items()
+                if after < change <= upto
+                and not (full and events[event_id]["status"] == "cancelled")
+            )
+            page = changes[:max_results]
+            items = [dict(events[event_id]) for _, event_id in page]
+            if len(changes) > max_results:
+                return {
+                    "items": items,
+                    "next_page_token": f"{int(full)}:{since}:{upto}:{page[-1][0]}",
+                    "next_sync_token": None,
+                }
+            return {
+                "items": items,
+                "next_page_token": None,
+                "next_sync_token": f"{self._token_epoch}.{upto}",
+            }
+
+    def batch(self, calendar_id, operations):
+        with self._lock:
+            self.requests["batch"] += 1
+            self._raise_injected()
+            if len(operations) > self.max_batch:
+                raise ProviderError(
+                    f"at most {self.max_batch} operations per batch", status=400
+                )
+            events = self._events.setdefault(calendar_id, {})
+            results = []
+            for operation in operations:
+                event_id = operation["event_id"]
+                existing = events.get(event_id)
+                if operation["op"] == "create" and existing is not None:
+                    results.append({"error": "duplicate event id", "status": 409, "retryable": False})
+                elif operation["op"] != "create" and (
+                    existing is None or existing["status"] == "cancelled"
+                ):
+                    results.append({"error": "event not found", "status": 404, "retryable": False})
+                else:
+                    if operation["op"] == "delete":
+                        event = dict(existing, status="cancelled")
+                    else:
+                        event = dict(operation["event"], id=event_id, status="confirmed")
+                    event = self._store(calendar_id, event)
+                    results.append({"id": event_id, "updated": event["updated"]})
+            return results
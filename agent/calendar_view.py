@@ -1,48 +1,86 @@
+from datetime import timedelta
+
 import streamlit as st
 import pandas as pd
-from agent.scheduler import get_all_meetings
+from agent.instrumentation import timer
+from agent.scheduler import get_agenda, get_meeting_date_bounds
 
+VIEW_SPANS = ("Day", "Week", "Month")
 
-def show_calendar_view():
+
+def _span(selected_date, span):
     """
-    Simple calendar-like view of meetings grouped by date.
+    First and last date of the day, week (Monday to Sunday) or month
+    containing selected_date.
     """
-    meetings = get_all_meetings()
-    if not meetings:
-        st.info("No meetings scheduled yet.")
-        return
+    if span == "Week":
+        first = selected_date - timedelta(days=selected_date.weekday())
+        return first, first + timedelta(days=6)
+    if span == "Month":
+        first = selected_date.replace(day=1)
+        next_month = (first + timedelta(days=32)).replace(day=1)
+        return first, next_month - timedelta(days=1)
+    return selected_date, selected_date
 
-    rows = []
-    for m in meetings:
-        rows.append({
-            "Date": m.start_time.date(),
-            "Title": m.title,
-            "Time": f"{m.start_time.strftime('%H:%M')} - {m.end_time.strftime('%H:%M')}",
-            "Participants": m.participants or "",
+
+def agenda_frame(agenda):
+    """
+    The table shown for `agenda` (as returned by get_agenda). Rows are
+    already in (date, start) order; keep it rather than sorting on the
+    "Time" text.
+    """
+    return pd.DataFrame([
+        {
+            "Date": day,
+            "Title": meeting.title,
+            "Time": f"{start.strftime('%H:%M')} - {end.strftime('%H:%M')}",
+            "Participants": meeting.participants or "",
             "Recurrence": (
-                m.recurrence_type if getattr(m, "recurrence_type", "none") != "none"
+                meeting.recurrence_type if (meeting.recurrence_type or "none") != "none"
                 else "Once"
             ),
-        })
+        }
+        for day, entries in agenda.items()
+        for start, end, meeting in entries
+    ])
+
+
+def show_calendar_view():
+    """
+    Calendar view of a day, week or month, recurring occurrences included.
+
+    Days are looked up in the scheduler's per-day buckets, so rendering
+    costs the same however many meetings exist outside the range shown.
+    """
+    first_start, _ = get_meeting_date_bounds()
+    if first_start is None:
+        st.info("No meetings scheduled yet.")
+        return
+
+    st.write("### 📅 Calendar View")
 
-    df = pd.DataFrame(rows).sort_values(["Date", "Time"])
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        span = st.radio("Show", VIEW_SPANS, horizontal=True, key="calendar_span")
+    with col2:
+        # No max_value: recurring meetings run past the last start date.
+        selected_date = st.date_input(
+            "Select date to view",
+            value=first_start.date(),
+            min_value=first_start.date(),
+        )
 
-    st.write("### 📅 Calendar View (by Date)")
+    first_day, last_day = _span(selected_date, span)
+    agenda = get_agenda(first_day, last_day)
 
-    unique_dates = sorted(df["Date"].unique())
-    if not unique_dates:
-        st.info("No meetings to show.")
+    with timer("calendar_view.dataframe"):
+        frame = agenda_frame(agenda)
+    if frame.empty:
+        st.info(f"No meetings in this {span.lower()}.")
         return
 
-    selected_date = st.date_input(
-        "Select date to view",
-        value=unique_dates[0],
-        min_value=unique_dates[0],
-        max_value=unique_dates[-1],
-    )
-
-    day_df = df[df["Date"] == selected_date]
-    if day_df.empty:
-        st.info("No meetings on this date.")
-    else:
-        st.dataframe(day_df.reset_index(drop=True), use_container_width=True)
+    if span != "Day":
+        busy_days = sum(1 for entries in agenda.values() if entries)
+        st.caption(f"{len(frame)} meetings on {busy_days} of {len(agenda)} days")
+    with timer("calendar_view.render"):
+        st.dataframe(frame, width="stretch", hide_index=True)
@@ -0,0 +1,118 @@
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
+
+from .calendar_index import is_recurring
+from .recurrence import SeriesIndex
+
+# Expanded recurring days kept before the memo is dropped and refilled.
+EXPANDED_DAYS_LIMIT = 4096
+
+
+class DayBuckets:
+    """
+    Meetings grouped by the day they start on: date -> sorted list of
+    (start, end, meeting_id), so a day, week or month view is a handful of
+    dict lookups however many meetings there are.
+
+    One-off meetings are bucketed as they are written. Recurring series are
+    expanded into the days that get asked for, and those expansions are
+    memoised until a series changes.
+    """
+
+    def __init__(self):
+        self._one_off = {}   # date -> sorted [(start, end, meeting_id)]
+        self._entries = {}   # meeting_id -> its one-off entry
+        self.series = SeriesIndex()
+        self._expanded = {}  # date -> sorted occurrences of series that day
+
+    @classmethod
+    def build(cls, rows):
+        """
+        Build from (meeting_id, start, end, recurrence_type, recurrence_until)
+        tuples.
+        """
+        buckets = cls()
+        series = []
+        for row in rows:
+            meeting_id, start, end, recurrence_type = row[:4]
+            if is_recurring(recurrence_type):
+                series.append(row[:5])
+                continue
+            entry = (start, end, meeting_id)
+            buckets._entries[meeting_id] = entry
+            day = start.date()
+            if day not in buckets._one_off:
+                buckets._one_off[day] = []
+            buckets._one_off[day].append(entry)
+        for entries in buckets._one_off.values():
+            entries.sort()
+        buckets.series = SeriesIndex.build(series)
+        return buckets
+
+    def __len__(self):
+        return len(self._entries) + len(self.series)
+
+    def add(self, meeting_id, start, end, recurrence_type="none", recurrence_until=None):
+        """
+        Insert (or move) a meeting, one-off or recurring.
+        """
+        self.remove(meeting_id)
+        if is_recurring(recurrence_type):
+            self.series.add(meeting_id, start, end, recurrence_type, recurrence_until)
+            self._expanded.clear()
+            return
+        entry = (start, end, meeting_id)
+        self._entries[meeting_id] = entry
+        insort(self._one_off.setdefault(start.date(), []), entry)
+
+    def remove(self, meeting_id):
+        entry = self._entries.pop(meeting_id, None)
+        if entry is not None:
+            day = entry[0].date()
+            entries = self._one_off[day]
+            del entries[bisect_left(entries, entry)]
+            if not entries:
+                del self._one_off[day]
+        elif meeting_id in self.series:
+            self.series.remove(meeting_id)
+            self._expanded.clear()
+
+    def _occurrences_on(self, day):
+        occurrences = self._expanded.get(day)
+        if occurrences is None:
+            if len(self._expanded) >= EXPANDED_DAYS_LIMIT:
+                self._expanded.clear()
+            day_start = datetime.combine(day, time())
+            day_end = day_start + timedelta(days=1)
+            occurrences = sorted(
+                (start, end, meeting_id)
+                for meeting_id, start, end in self.series.occurrences(day_start, day_end)
+                if start >= day_start
+            )
+            self._expanded[day] = occurrences
+        return occurrences
+
+    def day(self, day):
+        """
+        Sorted (start, end, meeting_id) of everything starting on `day`,
+        recurring occurrences included.
+        """
+        one_off = self._one_off.get(day, [])
+        if not len(self.series):
+            return list(one_off)
+        occurrences = self._occurrences_on(day)
+        if not occurrences:
+            return list(one_off)
+        return sorted(one_off + occurrences)
+
+    def days(self, first_day, last_day):
+        """
+        {date: day(date)} for every date from first_day to last_day
+        inclusive, empty days included.
+        """
+        result = {}
+        day = first_day
+        while day <= last_day:
+            result[day] = self.day(day)
+            day += timedelta(days=1)
+        return result
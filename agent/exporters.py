@@ -0,0 +1,299 @@
+import csv
+import io
+import tempfile
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from sqlalchemy import select, union_all
+
+from . import timezones
+from .db import session_scope, Meeting
+from .importers import CSV_COLUMNS
+from .participants import split_participant_names
+from .recurrence import until_cutoff
+from .scheduler import ARCHIVE_ROW_COLUMNS, MEETING_ROW_COLUMNS, MeetingRow
+
+# Rows fetched (and written) per chunk; the export never holds more.
+EXPORT_CHUNK_ROWS = 5000
+# Exports stay in memory up to this size, then spill to a temp file.
+SPOOL_MAX_BYTES = 8 << 20
+
+# format -> (mime type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ics": ("text/calendar", "ics"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "txt": ("text/plain", "txt"),
+}
+
+# CSV header: the importer's columns (so exports round-trip), plus ID and
+# Created.
+_CSV_FIELDS = [("id", "ID")] + list(CSV_COLUMNS.items()) + [("created_at", "Created")]
+
+_ICS_FREQUENCIES = {"daily": "DAILY", "weekly": "WEEKLY", "monthly": "MONTHLY"}
+_ICS_PRODID = "-//AI Meeting Scheduler Agent//EN"
+
+
+def iter_meeting_chunks(chunk_rows=EXPORT_CHUNK_ROWS, include_archived=True):
+    """
+    Yield every meeting, archived ones included unless include_archived is
+    False, ordered by (start_time, id), as lists of at most `chunk_rows`
+    MeetingRow tuples. Rows come from a server-side cursor, so memory
+    stays flat however many meetings there are.
+    """
+    query = select(*MEETING_ROW_COLUMNS)
+    if include_archived:
+        both = union_all(query, select(*ARCHIVE_ROW_COLUMNS)).subquery()
+        query = select(*both.c).order_by(both.c.start_time.asc(), both.c.id.asc())
+    else:
+        query = query.order_by(Meeting.start_time.asc(), Meeting.id.asc())
+    query = query.execution_options(yield_per=chunk_rows)
+    with session_scope() as session:
+        for partition in session.execute(query).partitions():
+            yield [MeetingRow(*row) for row in partition]
+
+
+# --- CSV ---------------------------------------------------------------------
+
+
+def _csv_datetime(value):
+    if value is None:
+        return ""
+    if value.second or value.microsecond:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value.strftime("%Y-%m-%d %H:%M")
+
+
+def iter_csv(chunks=None):
+    """
+    Yield the meetings as UTF-8 CSV, one bytes block per chunk.
+    """
+    chunks = iter_meeting_chunks() if chunks is None else chunks
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in _CSV_FIELDS])
+    for rows in chunks:
+        for row in rows:
+            writer.writerow([
+                _csv_datetime(value) if isinstance(value, datetime)
+                else "" if value is None else value
+                for value in (getattr(row, key) for key, _ in _CSV_FIELDS)
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_text(chunks=None):
+    """
+    Yield the meetings as plain text, one "title - start to end" line per
+    meeting, one bytes block per chunk.
+    """
+    chunks = iter_meeting_chunks() if chunks is None else chunks
+    for rows in chunks:
+        yield "".join(f"{row.title} - {row.start_time} to {row.end_time}\n" for row in rows).encode("utf-8")
+
+
+# --- iCalendar (RFC 5545) ----------------------------------------------------
+
+
+def _ics_text(value):
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;")
+        .replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line):
+    """
+    Fold a content line at 75 octets (RFC 5545 3.1), CRLF-terminated.
+    """
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, width = [], 75
+    while data:
+        # Back off so a multi-byte character is never split.
+        cut = min(width, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        width = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_local(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _ics_utc(value, zone=None):
+    return timezones.convert(value, zone, "UTC").strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ics_offset(minutes):
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+def _ics_vtimezone(zone=None):
+    """
+    VTIMEZONE lines for `zone`, one observance per transition of its offset
+    table (the tz database, not a rule approximation).
+    """
+    name = zone or timezones.CALENDAR_ZONE
+    table = timezones.offset_table(zone)
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{name}"]
+    if len(table.offsets) == 1:
+        offset = _ics_offset(table.offsets[0])
+        lines += [
+            "BEGIN:STANDARD", "DTSTART:19700101T000000",
+            f"TZOFFSETFROM:{offset}", f"TZOFFSETTO:{offset}",
+            f"TZNAME:{table.tzinfos[0].tzname(None)}", "END:STANDARD",
+        ]
+    for i in range(1, len(table.offsets)):
+        kind = "DAYLIGHT" if table.dst[i] else "STANDARD"
+        # DTSTART is the local time of the change, on the old offset.
+        start = timezones.EPOCH + timezones.MINUTE * (table.utc_starts[i] + table.offsets[i - 1])
+        lines += [
+            f"BEGIN:{kind}", f"DTSTART:{_ics_local(start)}",
+            f"TZOFFSETFROM:{_ics_offset(table.offsets[i - 1])}",
+            f"TZOFFSETTO:{_ics_offset(table.offsets[i])}",
+            f"TZNAME:{table.tzinfos[i].tzname(None)}", f"END:{kind}",
+        ]
+    lines.append("END:VTIMEZONE")
+    return lines
+
+
+def _ics_rrule(row):
+    """
+    RRULE equivalent of the meeting's recurrence. Monthly series on day
+    29-31 fall back to the month's last day (see add_months), which RFC
+    5545 spells as the last of BYMONTHDAY=28..day.
+    """
+    parts = [f"FREQ={_ICS_FREQUENCIES[row.recurrence_type]}"]
+    if row.recurrence_type == "monthly" and row.start_time.day > 28:
+        days = ",".join(str(day) for day in range(28, row.start_time.day + 1))
+        parts += [f"BYMONTHDAY={days}", "BYSETPOS=-1"]
+    if row.recurrence_until is not None:
+        # Occurrences may start any time on the until date (until_cutoff);
+        # UNTIL is inclusive and must be UTC when DTSTART has a TZID.
+        last = until_cutoff(row.recurrence_until) - timedelta(seconds=1)
+        parts.append(f"UNTIL={_ics_utc(last)}")
+    return "RRULE:" + ";".join(parts)
+
+
+def _ics_event(row, zone_name, stamp):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:meeting-{row.id}@ai-meeting-scheduler",
+        f"DTSTAMP:{stamp}",
+        f"CREATED:{(row.created_at or datetime(1970, 1, 1)).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART;TZID={zone_name}:{_ics_local(row.start_time)}",
+        f"DTEND;TZID={zone_name}:{_ics_local(row.end_time)}",
+        f"SUMMARY:{_ics_text(row.title)}",
+    ]
+    if (row.recurrence_type or "none") in _ICS_FREQUENCIES:
+        lines.append(_ics_rrule(row))
+    # Split like the scheduler does, so attendees match conflict scoping;
+    # the URI carries the normalised identity.
+    for name in split_participant_names(row.participants):
+        display = name.replace('"', "'")  # not allowed in a quoted param
+        lines.append(f'ATTENDEE;CN="{display}":urn:x-participant:{quote(name.lower())}')
+    lines.append("END:VEVENT")
+    return lines
+
+
+def iter_ics(chunks=None):
+    """
+    Yield the meetings as an iCalendar file, one bytes block per chunk.
+    Times are given in the calendar zone, whose VTIMEZONE is included.
+    """
+    chunks = iter_meeting_chunks() if chunks is None else chunks
+    zone_name = timezones.CALENDAR_ZONE
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    header = [
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{_ICS_PRODID}",
+        "CALSCALE:GREGORIAN", f"X-WR-TIMEZONE:{zone_name}",
+    ] + _ics_vtimezone()
+    yield "".join(_ics_fold(line) for line in header).encode("utf-8")
+    for rows in chunks:
+        yield "".join(
+            _ics_fold(line) for row in rows for line in _ics_event(row, zone_name, stamp)
+        ).encode("utf-8")
+    yield _ics_fold("END:VCALENDAR").encode("utf-8")
+
+
+# --- Parquet -----------------------------------------------------------------
+
+
+def _parquet_schema(pa):
+    timestamp = pa.timestamp("us")
+    return pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("participants", pa.string()),
+        ("start_time", timestamp),
+        ("end_time", timestamp),
+        ("source", pa.string()),
+        ("created_at", timestamp),
+        ("recurrence_type", pa.string()),
+        ("recurrence_until", timestamp),
+    ])
+
+
+def write_parquet(sink, chunks=None):
+    """
+    Write the meetings to `sink` (a path or binary file object) as Parquet,
+    one row group per chunk. Needs the optional `pyarrow` package.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from None
+
+    chunks = iter_meeting_chunks() if chunks is None else chunks
+    schema = _parquet_schema(pa)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows)) if rows else [[] for _ in schema.names]
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+
+
+# --- Download streams --------------------------------------------------------
+
+
+_TEXT_WRITERS = {"csv": iter_csv, "ics": iter_ics, "txt": iter_text}
+
+
+def export_stream(fmt, chunks=None):
+    """
+    The export as a readable binary file object, rewound, for
+    st.download_button or any other consumer. It is written chunk by chunk
+    into a spooled temp file, so large exports go to disk, not memory.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {tuple(EXPORT_FORMATS)}")
+    stream = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    if fmt == "parquet":
+        write_parquet(stream, chunks)
+    else:
+        for block in _TEXT_WRITERS[fmt](chunks):
+            stream.write(block)
+    stream.seek(0)
+    return stream
+
+
+def export_file_name(fmt, now=None):
+    now = now or datetime.now()
+    return f"meetings_{now.strftime('%Y%m%d_%H%M')}.{EXPORT_FORMATS[fmt][1]}"
+
+
+def export_mime_type(fmt):
+    return EXPORT_FORMATS[fmt][0]
@@ -0,0 +1,288 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+from . import timezones
+from .scheduler import bulk_create_meetings
+
+# Column names written by the Manage tab's CSV export
+CSV_COLUMNS = {
+    "title": "Title",
+    "participants": "Participants",
+    "start_time": "Start",
+    "end_time": "End",
+    "source": "Source",
+    "recurrence_type": "Recurrence",
+    "recurrence_until": "Until",
+}
+
+_CSV_DATETIME_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S")
+
+_ICS_FREQUENCIES = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly"}
+
+
+def _as_text_stream(fileobj):
+    """
+    Accept a text or binary file object (e.g. a Streamlit upload), str or
+    bytes.
+    """
+    if isinstance(fileobj, str):
+        return io.StringIO(fileobj, newline="")
+    if isinstance(fileobj, bytes):
+        fileobj = io.BytesIO(fileobj)
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+
+
+def _merge_reports(parsed, parse_errors, on_conflict, source):
+    """
+    Run the parsed records through bulk_create_meetings and fold the parse
+    failures back in, so the report has one entry per input item.
+    """
+    positions = [position for position, _ in parsed]
+    report = bulk_create_meetings(
+        [record for _, record in parsed], on_conflict=on_conflict, source=source
+    )
+    for entry in report:
+        entry["index"] = positions[entry["index"]]
+        entry["conflicting_records"] = [
+            positions[record] for record in entry["conflicting_records"]
+        ]
+    report.extend(
+        {
+            "index": position,
+            "status": "invalid",
+            "meeting_id": None,
+            "error": error,
+            "conflicting_meetings": [],
+            "conflicting_records": [],
+        }
+        for position, error in parse_errors
+    )
+    report.sort(key=lambda entry: entry["index"])
+    return report
+
+
+# --- CSV ---------------------------------------------------------------------
+
+
+def _parse_csv_datetime(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    for fmt in _CSV_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value)
+
+
+def read_csv_records(fileobj):
+    """
+    Yield (row_number, record, error) for each data row of a CSV file with
+    the Manage tab's export columns (Title, Participants, Start, End, ...).
+    """
+    reader = csv.DictReader(_as_text_stream(fileobj))
+    for row_number, row in enumerate(reader, start=1):
+        try:
+            record = {
+                "title": (row.get(CSV_COLUMNS["title"]) or "").strip(),
+                "participants": (row.get(CSV_COLUMNS["participants"]) or "").strip(),
+                "start_time": _parse_csv_datetime(row.get(CSV_COLUMNS["start_time"])),
+                "end_time": _parse_csv_datetime(row.get(CSV_COLUMNS["end_time"])),
+                "source": (row.get(CSV_COLUMNS["source"]) or "").strip() or None,
+                "recurrence_type": (row.get(CSV_COLUMNS["recurrence_type"]) or "none").strip().lower(),
+                "recurrence_until": _parse_csv_datetime(row.get(CSV_COLUMNS["recurrence_until"])),
+            }
+        except ValueError as exc:
+            yield row_number, None, f"Row {row_number}: {exc}"
+            continue
+        yield row_number, record, None
+
+
+def import_csv(fileobj, on_conflict="skip"):
+    """
+    Import meetings from a CSV file (any file object, str or bytes).
+    Returns the bulk_create_meetings report, indexed by data row.
+    """
+    parsed, parse_errors = [], []
+    for row_number, record, error in read_csv_records(fileobj):
+        if error:
+            parse_errors.append((row_number, error))
+        else:
+            parsed.append((row_number, record))
+    return _merge_reports(parsed, parse_errors, on_conflict, source="csv")
+
+
+# --- iCalendar (RFC 5545) ----------------------------------------------------
+
+
+def _unfold_lines(stream):
+    """
+    Undo RFC 5545 line folding (continuation lines start with a space or tab).
+    """
+    current = None
+    for raw in stream:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _split_property(line):
+    """
+    "DTSTART;TZID=Asia/Kolkata:20250101T090000" ->
+    ("DTSTART", {"TZID": "Asia/Kolkata"}, "20250101T090000")
+    """
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(
+        param.split("=", 1) for param in params if "=" in param
+    ), value
+
+
+def _unescape_text(value):
+    return (
+        value.replace("\\n", "\n").replace("\\N", "\n")
+        .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+    )
+
+
+def _parse_ics_datetime(value, params):
+    """
+    Wall-clock datetime in the calendar zone (naive, as stored) for a DATE
+    or DATE-TIME value. Floating times are taken as calendar-zone already.
+    """
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d")
+    if value.endswith("Z"):
+        return timezones.convert(datetime.strptime(value[:-1], "%Y%m%dT%H%M%S"), "UTC")
+    local = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    tzid = params.get("TZID")
+    if tzid:
+        return timezones.convert(local, tzid.strip('"'))
+    return local
+
+
+def _parse_ics_duration(value):
+    """
+    Minimal RFC 5545 DURATION: [+]P[nW][nD][T[nH][nM][nS]].
+    """
+    value = value.strip().lstrip("+")
+    if not value.startswith("P"):
+        raise ValueError(f"Bad DURATION {value!r}")
+    total, number, in_time = timedelta(), "", False
+    units = {
+        "W": timedelta(weeks=1), "D": timedelta(days=1),
+        "H": timedelta(hours=1), "M": timedelta(minutes=1), "S": timedelta(seconds=1),
+    }
+    for char in value[1:]:
+        if char == "T":
+            in_time = True
+        elif char.isdigit():
+            number += char
+        elif char in units and number:
+            if char == "M" and not in_time:
+                raise ValueError(f"Bad DURATION {value!r}")
+            total += int(number) * units[char]
+            number = ""
+        else:
+            raise ValueError(f"Bad DURATION {value!r}")
+    return total
+
+
+def _ics_attendee(value, params):
+    name = params.get("CN", "").strip('"')
+    if name:
+        return name
+    return value.split(":", 1)[-1] if value.lower().startswith("mailto:") else value
+
+
+def read_ics_records(fileobj):
+    """
+    Yield (event_number, record, error) for each VEVENT of an iCalendar
+    file. Supports SUMMARY, DTSTART, DTEND/DURATION, ATTENDEE and an RRULE
+    with FREQ=DAILY/WEEKLY/MONTHLY and optional UNTIL.
+    """
+    event, event_number = None, 0
+    for line in _unfold_lines(_as_text_stream(fileobj)):
+        if line == "BEGIN:VEVENT":
+            event_number += 1
+            event = []
+            continue
+        if line == "END:VEVENT" and event is not None:
+            record, error = None, None
+            try:
+                record = _ics_event_record(event)
+            except (KeyError, ValueError) as exc:
+                error = f"Event {event_number}: {exc}"
+            yield event_number, record, error
+            event = None
+            continue
+        if event is not None and line:
+            event.append(_split_property(line))
+
+
+def _ics_event_record(properties):
+    fields, attendees = {}, []
+    for name, params, value in properties:
+        if name == "ATTENDEE":
+            attendees.append(_ics_attendee(value, params))
+        else:
+            fields.setdefault(name, (params, value))
+
+    if "DTSTART" not in fields:
+        raise ValueError("missing DTSTART")
+    start = _parse_ics_datetime(fields["DTSTART"][1], fields["DTSTART"][0])
+    if "DTEND" in fields:
+        end = _parse_ics_datetime(fields["DTEND"][1], fields["DTEND"][0])
+    elif "DURATION" in fields:
+        end = start + _parse_ics_duration(fields["DURATION"][1])
+    else:
+        end = start + timedelta(days=1 if len(fields["DTSTART"][1].strip()) == 8 else 0)
+
+    recurrence_type, recurrence_until = "none", None
+    if "RRULE" in fields:
+        rule = dict(
+            part.split("=", 1) for part in fields["RRULE"][1].split(";") if "=" in part
+        )
+        freq = rule.get("FREQ", "").upper()
+        if freq not in _ICS_FREQUENCIES:
+            raise ValueError(f"unsupported RRULE FREQ {freq!r}")
+        if int(rule.get("INTERVAL", "1")) != 1:
+            raise ValueError("RRULE INTERVAL other than 1 is not supported")
+        recurrence_type = _ICS_FREQUENCIES[freq]
+        if "UNTIL" in rule:
+            recurrence_until = _parse_ics_datetime(rule["UNTIL"], {})
+
+    summary = fields.get("SUMMARY", ({}, "Meeting"))[1]
+    return {
+        "title": _unescape_text(summary).strip() or "Meeting",
+        "participants": ", ".join(attendees),
+        "start_time": start,
+        "end_time": end,
+        "recurrence_type": recurrence_type,
+        "recurrence_until": recurrence_until,
+    }
+
+
+def import_ics(fileobj, on_conflict="skip"):
+    """
+    Import meetings from an iCalendar file (any file object, str or bytes).
+    Returns the bulk_create_meetings report, indexed by VEVENT number.
+    """
+    parsed, parse_errors = [], []
+    for event_number, record, error in read_ics_records(fileobj):
+        if error:
+            parse_errors.append((event_number, error))
+        else:
+            parsed.append((event_number, record))
+    return _merge_reports(parsed, parse_errors, on_conflict, source="ics")
@@ -0,0 +1,300 @@
+"""
+Lightweight instrumentation for the hot paths (parsing, conflict checks,
+reads, rendering).
+
+- timed(name) / timer(name) record wall time per call into process-wide
+  histograms, and into the current Streamlit rerun if one is being
+  collected (rerun_scope);
+- every SQL statement is counted and timed as "sql" through SQLAlchemy
+  engine events;
+- rerun_scope(profile=...) can capture a cProfile or pyinstrument profile
+  of the rerun;
+- prometheus_text() renders the histograms for a /metrics endpoint, and
+  INSTRUMENTATION_LOG=path appends one JSON line per rerun.
+
+INSTRUMENTATION=0 turns timers and SQL counting off; each instrumented call
+then costs one flag check.
+"""
+import cProfile
+import importlib.util
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ENABLED = os.getenv("INSTRUMENTATION", "1") != "0"
+# Append one JSON line per rerun to this file, if set.
+JSON_LOG_PATH = os.getenv("INSTRUMENTATION_LOG")
+
+# Histogram bucket upper bounds, seconds.
+HISTOGRAM_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+PROFILERS = ("cprofile", "pyinstrument")
+# Functions listed in a cProfile report.
+PROFILE_TOP = 25
+
+SQL = "sql"
+RERUN = "rerun"
+
+
+class _Metric:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)  # last one is +Inf
+
+
+class _Local(threading.local):
+    rerun = None  # the Rerun being collected on this thread
+
+
+_metrics = {}  # name -> _Metric, process-wide
+_lock = threading.Lock()  # for creating metrics and reading them out
+_local = _Local()
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def record(name, seconds):
+    """
+    Record one call of `name` that took `seconds`.
+
+    Updates are not locked (a lock would cost more than the timing): two
+    threads recording the same name at the same instant can, rarely, lose
+    one update, which monitoring can live with.
+    """
+    metric = _metrics.get(name)
+    if metric is None:
+        with _lock:
+            metric = _metrics.setdefault(name, _Metric())
+    metric.count += 1
+    metric.total += seconds
+    if seconds > metric.max:
+        metric.max = seconds
+    metric.buckets[bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+    rerun = _local.rerun
+    if rerun is not None:
+        rerun.add(name, seconds)
+
+
+def timed(name):
+    """
+    Decorator recording the wall time of every call under `name`.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def timer(name):
+    """
+    Context manager recording the wall time of its block under `name`.
+    """
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    if ENABLED and context is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_instrumentation_started", None)
+    if started is not None:
+        record(SQL, time.perf_counter() - started)
+
+
+# --- Per-rerun collection and profiling --------------------------------------
+
+
+class Rerun:
+    """
+    What one Streamlit rerun spent its time on: calls and seconds per
+    instrumented name (SQL statements included), plus an optional profile.
+    Times are inclusive, so a timed call inside another is counted in both.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.timings = {}  # name -> [calls, seconds]
+        self.seconds = None
+        self.profile = None
+
+    def add(self, name, seconds):
+        timing = self.timings.get(name)
+        if timing is None:
+            self.timings[name] = [1, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+
+    @property
+    def sql_statements(self):
+        return self.timings.get(SQL, (0, 0.0))[0]
+
+    def breakdown(self):
+        """
+        [{"name", "calls", "ms"}], slowest first.
+        """
+        return [
+            {"name": name, "calls": calls, "ms": round(seconds * 1000, 3)}
+            for name, (calls, seconds) in sorted(
+                self.timings.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+    def as_dict(self):
+        return {
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "ms": round((self.seconds or 0.0) * 1000, 3),
+            "sql_statements": self.sql_statements,
+            "timings": self.breakdown(),
+        }
+
+
+def available_profilers():
+    """
+    PROFILERS that can run here (pyinstrument is optional).
+    """
+    return [
+        name for name in PROFILERS
+        if name != "pyinstrument" or importlib.util.find_spec("pyinstrument") is not None
+    ]
+
+
+def _start_profiler(kind):
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("pyinstrument profiling needs pyinstrument (pip install pyinstrument)") from None
+        profiler = Profiler()
+        profiler.start()
+        return profiler
+    if kind != "cprofile":
+        raise ValueError(f"profile must be one of {PROFILERS}")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler):
+    """
+    Stop `profiler` and return its report as text.
+    """
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return out.getvalue()
+    profiler.stop()
+    return profiler.output_text(unicode=True)
+
+
+@contextmanager
+def rerun_scope(profile=None):
+    """
+    Collect everything timed on this thread inside the block into a Rerun,
+    which is yielded (and complete once the block exits, even by an
+    exception such as Streamlit's rerun). profile: None, "cprofile" or
+    "pyinstrument" to also capture a profile of the block.
+    """
+    rerun = Rerun()
+    previous = _local.rerun
+    _local.rerun = rerun
+    profiler = _start_profiler(profile) if profile else None
+    started = time.perf_counter()
+    try:
+        yield rerun
+    finally:
+        rerun.seconds = time.perf_counter() - started
+        if profiler is not None:
+            rerun.profile = _stop_profiler(profiler)
+        _local.rerun = previous
+        if ENABLED:
+            record(RERUN, rerun.seconds)
+            if JSON_LOG_PATH:
+                log_json(rerun)
+
+
+# --- Export ------------------------------------------------------------------
+
+
+def snapshot():
+    """
+    Process-wide totals: {name: {"count", "total_seconds", "max_seconds"}}.
+    """
+    with _lock:
+        return {
+            name: {"count": metric.count, "total_seconds": metric.total, "max_seconds": metric.max}
+            for name, metric in sorted(_metrics.items())
+        }
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+def prometheus_text():
+    """
+    The histograms in the Prometheus text exposition format (0.0.4), one
+    series per instrumented name.
+    """
+    with _lock:
+        metrics = [(name, metric.count, metric.total, list(metric.buckets))
+                   for name, metric in sorted(_metrics.items())]
+    lines = [
+        "# HELP scheduler_call_seconds Wall time of instrumented calls, SQL statements and reruns.",
+        "# TYPE scheduler_call_seconds histogram",
+    ]
+    for name, count, total, buckets in metrics:
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, hits in zip(HISTOGRAM_BUCKETS + ("+Inf",), buckets):
+            cumulative += hits
+            lines.append(f'scheduler_call_seconds_bucket{{name="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'scheduler_call_seconds_sum{{name="{label}"}} {total}')
+        lines.append(f'scheduler_call_seconds_count{{name="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def log_json(rerun, path=None):
+    """
+    Append the rerun as one JSON line to `path` (default JSON_LOG_PATH).
+    """
+    with open(path or JSON_LOG_PATH, "a", encoding="utf-8") as log:
+        log.write(json.dumps(rerun.as_dict()) + "\n")
@@ -0,0 +1,270 @@
+from bisect import bisect_left, bisect_right
+
+# Entries per chunk when an index is built; a chunk is split in two once it
+# holds twice as many. A long interval makes a query scan at most the rest
+# of its chunk, so this also bounds the work one outlier can cause.
+CHUNK_SIZE = 64
+
+
+def _latest(a, b):
+    # max() where None stands for "no interval".
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if a >= b else b
+
+
+def _running_ends(chunk, prefix=None, first=0):
+    """
+    Latest end among chunk[:j + 1] for every j, recomputed from position
+    `first` onwards into `prefix` (a fresh list by default).
+    """
+    if prefix is None:
+        prefix = []
+    del prefix[first:]
+    latest = prefix[-1] if prefix else None
+    for _, end, _ in chunk[first:]:
+        if latest is None or end > latest:
+            latest = end
+        prefix.append(latest)
+    return prefix
+
+
+class IntervalIndex:
+    """
+    In-memory index of half-open [start, end) intervals keyed by meeting id.
+
+    Entries are kept sorted by start, in chunks of up to 2 * CHUNK_SIZE.
+    Each chunk records the running latest end of its entries, and a max
+    segment tree over the chunks' latest ends finds the chunks holding an
+    interval still running at a given time, descending only into subtrees
+    that have one. Within such a chunk the scan runs backwards from the
+    query's end and stops once no earlier entry can still be running. An
+    overlap query is a binary search plus O(log n) tree steps per chunk
+    holding an overlap: a week-long meeting costs at most one chunk scan,
+    not a scan of every meeting that starts during it.
+
+    Keys can be anything that is ordered (datetimes, integers, ...), as
+    long as one index uses a single kind.
+    """
+
+    def __init__(self):
+        self._load([])
+
+    @classmethod
+    def build(cls, intervals):
+        """
+        Build an index from an iterable of (meeting_id, start, end) tuples.
+        """
+        index = cls()
+        index._load(sorted((start, end, meeting_id) for meeting_id, start, end in intervals))
+        return index
+
+    def _load(self, entries):
+        """
+        Replace the contents with `entries`, sorted (start, end, meeting_id)
+        tuples.
+        """
+        self._by_id = {entry[2]: entry for entry in entries}  # meeting_id -> entry
+        self._chunks = [entries[i:i + CHUNK_SIZE] for i in range(0, len(entries), CHUNK_SIZE)]
+        self._firsts = [chunk[0] for chunk in self._chunks]  # for locating chunks
+        self._prefix = [_running_ends(chunk) for chunk in self._chunks]
+        self._ends = [prefix[-1] for prefix in self._prefix]  # latest end per chunk
+        self._build_tree()
+
+    def _build_tree(self):
+        """
+        (Re)build the max tree over _ends, after chunks were split or dropped.
+        Leaves past the last chunk hold None.
+        """
+        size = 1
+        while size < len(self._ends):
+            size *= 2
+        tree = [None] * (2 * size)
+        tree[size:size + len(self._ends)] = self._ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = _latest(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+        self._size = size
+
+    def _set_end(self, chunk_index, end):
+        self._ends[chunk_index] = end
+        tree = self._tree
+        node = self._size + chunk_index
+        tree[node] = end
+        node //= 2
+        while node:
+            tree[node] = _latest(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, meeting_id):
+        return meeting_id in self._by_id
+
+    def add(self, meeting_id, start, end):
+        """
+        Insert (or move) a meeting's interval.
+        """
+        if meeting_id in self._by_id:
+            self.remove(meeting_id)
+
+        entry = (start, end, meeting_id)
+        self._by_id[meeting_id] = entry
+        if not self._chunks:
+            self._load([entry])
+            return
+
+        i = max(bisect_right(self._firsts, entry) - 1, 0)
+        chunk = self._chunks[i]
+        pos = bisect_right(chunk, entry)
+        chunk.insert(pos, entry)
+        self._firsts[i] = chunk[0]
+        prefix = _running_ends(chunk, self._prefix[i], pos)
+        if prefix[-1] != self._ends[i]:
+            self._set_end(i, prefix[-1])
+
+        if len(chunk) >= 2 * CHUNK_SIZE:
+            left, right = chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]
+            self._chunks[i:i + 1] = [left, right]
+            self._firsts[i:i + 1] = [left[0], right[0]]
+            self._prefix[i:i + 1] = [_running_ends(left), _running_ends(right)]
+            self._ends[i:i + 1] = [self._prefix[i][-1], self._prefix[i + 1][-1]]
+            self._build_tree()
+
+    def remove(self, meeting_id):
+        """
+        Drop a meeting's interval. Unknown ids are ignored.
+        """
+        entry = self._by_id.pop(meeting_id, None)
+        if entry is None:
+            return
+
+        i = bisect_right(self._firsts, entry) - 1
+        chunk = self._chunks[i]
+        pos = bisect_left(chunk, entry)
+        del chunk[pos]
+        if not chunk:
+            del self._chunks[i]
+            del self._firsts[i]
+            del self._prefix[i]
+            del self._ends[i]
+            self._build_tree()
+            return
+        self._firsts[i] = chunk[0]
+        prefix = _running_ends(chunk, self._prefix[i], pos)
+        if prefix[-1] != self._ends[i]:
+            self._set_end(i, prefix[-1])
+
+    def remove_many(self, meeting_ids):
+        """
+        Drop many meetings' intervals at once: each touched chunk is
+        refreshed and the tree rebuilt once, not once per meeting. Past a
+        quarter of the index, rebuilding from what is left is cheaper.
+        Unknown ids are ignored.
+        """
+        dropped = [self._by_id.pop(meeting_id) for meeting_id in set(meeting_ids) if meeting_id in self._by_id]
+        if not dropped:
+            return
+        if len(dropped) * 3 > len(self._by_id):
+            gone = {entry[2] for entry in dropped}
+            self._load([entry for chunk in self._chunks for entry in chunk if entry[2] not in gone])
+            return
+
+        touched = set()
+        for entry in dropped:
+            # _firsts stays a valid lower bound for each chunk meanwhile.
+            i = bisect_right(self._firsts, entry) - 1
+            chunk = self._chunks[i]
+            del chunk[bisect_left(chunk, entry)]
+            touched.add(i)
+        for i in touched:
+            chunk = self._chunks[i]
+            if chunk:
+                self._firsts[i] = chunk[0]
+                self._prefix[i] = _running_ends(chunk)
+                self._ends[i] = self._prefix[i][-1]
+        kept = [i for i, chunk in enumerate(self._chunks) if chunk]
+        if len(kept) < len(self._chunks):
+            self._chunks = [self._chunks[i] for i in kept]
+            self._firsts = [self._firsts[i] for i in kept]
+            self._prefix = [self._prefix[i] for i in kept]
+            self._ends = [self._ends[i] for i in kept]
+        self._build_tree()
+
+    def clear(self):
+        self._load([])
+
+    def _running(self, start, hi):
+        """
+        Positions of the chunks before chunk `hi` holding an interval that
+        ends after `start`, last first. Each step to the next such chunk
+        climbs the tree to the nearest left subtree with one and descends
+        to its rightmost qualifying leaf.
+        """
+        tree, size = self._tree, self._size
+        i = hi - 1
+        if i < 0:
+            return
+        if self._ends[i] > start:
+            yield i
+        node = size + i
+        while True:
+            # Up until a left sibling holds a later end...
+            while True:
+                if node == 1:
+                    return
+                if node & 1 and tree[node - 1] is not None and tree[node - 1] > start:
+                    node -= 1
+                    break
+                node //= 2
+            # ...then down its rightmost branch that does.
+            while node < size:
+                node = 2 * node + 1
+                if tree[node] is None or tree[node] <= start:
+                    node -= 1
+            yield node - size
+
+    def _overlapping(self, start, end):
+        """
+        Entries overlapping [start, end), latest start first.
+        """
+        hi = bisect_left(self._firsts, (end,))
+        for i in self._running(start, hi):
+            chunk, prefix = self._chunks[i], self._prefix[i]
+            # Only the last chunk can hold entries starting at or after `end`.
+            j = (bisect_left(chunk, (end,)) if i == hi - 1 else len(chunk)) - 1
+            # prefix[j] is the latest end among chunk[:j + 1]: once it is
+            # not after `start`, nothing earlier in the chunk overlaps.
+            while j >= 0 and prefix[j] > start:
+                if chunk[j][1] > start:
+                    yield chunk[j]
+                j -= 1
+
+    def overlaps(self, start, end, ignore_id=None):
+        """
+        Return True if any indexed interval overlaps [start, end).
+        """
+        # Latest start first: it is the one most likely to still be running.
+        for entry in self._overlapping(start, end):
+            if entry[2] != ignore_id:
+                return True
+        return False
+
+    def find(self, start, end, ignore_id=None):
+        """
+        Return the ids of all indexed intervals overlapping [start, end),
+        ordered by start.
+        """
+        return [entry[2] for entry in self.intervals(start, end) if entry[2] != ignore_id]
+
+    def intervals(self, start, end):
+        """
+        Return (start, end, meeting_id) for every indexed interval
+        overlapping [start, end), ordered by start.
+        """
+        found = list(self._overlapping(start, end))
+        found.reverse()
+        return found
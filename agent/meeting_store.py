@@ -0,0 +1,315 @@
+"""
+Columnar, read-optimised snapshot of the meetings table.
+
+One NumPy array per column, sorted by (start, id): int32 ids, int64 UTC
+epoch minutes for start, end and the recurrence cutoff, an int8 category
+code for recurrence_type, and the participants as interned int32 person
+codes in CSR form (row i's codes are
+person_codes[person_offsets[i]:person_offsets[i + 1]]).
+Range filters, day bucketing and overlap counts are searchsorted / bincount
+calls over these, with no ORM objects or per-meeting Python.
+
+Like the SQL range reads, a recurring meeting is one row: its first
+occurrence. Callers needing every occurrence use the scheduler's indexes.
+
+MeetingColumns snapshots are never modified. MeetingStore keeps the
+current one and folds writes into a new snapshot on the next read, so a
+reader can keep using the snapshot it got without any lock.
+"""
+from datetime import date
+
+import numpy as np
+
+from .recurrence import RECURRENCE_TYPES
+from .timezones import offset_table
+
+# recurrence_type category codes are positions in RECURRENCE_TYPES.
+RECURRENCE_CODES = {name: code for code, name in enumerate(RECURRENCE_TYPES)}
+NONE_CODE = RECURRENCE_CODES["none"]
+# Recurrence cutoff of series that never end (and of one-off meetings).
+NO_UNTIL = np.iinfo(np.int64).max
+# What a snapshot may cost per meeting, all columns and participant links
+# included (see MeetingColumns.bytes_per_meeting and
+# benchmarks/bench_meeting_store.py).
+BYTES_PER_MEETING_BUDGET = 64
+
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+
+def _sort_key(start, ids):
+    # (start, id) as one int64: ids are int32, minutes fit in 32 bits.
+    return (start << 31) | ids
+
+
+class MeetingColumns:
+    """
+    One immutable columnar snapshot. `people` holds the interned names;
+    person_index maps a name to its code.
+    """
+
+    def __init__(self, ids, start, end, recurrence, until, person_offsets, person_codes, people):
+        self.ids = ids
+        self.start = start
+        self.end = end
+        self.recurrence = recurrence
+        self.until = until
+        self.person_offsets = person_offsets
+        self.person_codes = person_codes
+        self.people = people
+        self.person_index = {person: code for code, person in enumerate(people)}
+        self.longest = int((end - start).max()) if len(ids) else 0
+        self._sorted_end = None
+        self._series_rows = None
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.int64),
+            np.empty(0, np.int8), np.empty(0, np.int64),
+            np.zeros(1, np.int32), np.empty(0, np.int32), [],
+        )
+
+    @classmethod
+    def build(cls, rows, people_of):
+        """
+        Build from (meeting_id, start_minute, end_minute, recurrence_type,
+        until_minute) tuples and a {meeting_id: people} mapping. until_minute
+        is the UTC minute occurrences must start before (see
+        recurrence.until_cutoff), None for no end.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        ids = np.fromiter((row[0] for row in rows), np.int32, len(rows))
+        start = np.fromiter((row[1] for row in rows), np.int64, len(rows))
+        end = np.fromiter((row[2] for row in rows), np.int64, len(rows))
+        recurrence = np.fromiter((RECURRENCE_CODES[row[3] or "none"] for row in rows), np.int8, len(rows))
+        until = np.fromiter((NO_UNTIL if row[4] is None else row[4] for row in rows), np.int64, len(rows))
+        order = np.argsort(_sort_key(start, ids), kind="stable")
+        ids, start, end, recurrence, until = (
+            column[order] for column in (ids, start, end, recurrence, until)
+        )
+
+        people = []
+        index = {}
+        counts = np.empty(len(ids), np.int32)
+        codes = []
+        for position, meeting_id in enumerate(ids.tolist()):
+            names = people_of.get(meeting_id, ())
+            counts[position] = len(names)
+            for person in names:
+                code = index.get(person)
+                if code is None:
+                    code = index[person] = len(people)
+                    people.append(person)
+                codes.append(code)
+        offsets = np.zeros(len(ids) + 1, np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(ids, start, end, recurrence, until, offsets, np.array(codes, np.int32), people)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        arrays = [self.ids, self.start, self.end, self.recurrence, self.until,
+                  self.person_offsets, self.person_codes]
+        arrays.extend(array for array in (self._sorted_end, self._series_rows) if array is not None)
+        return sum(array.nbytes for array in arrays)
+
+    def bytes_per_meeting(self):
+        return self.nbytes / len(self) if len(self) else 0.0
+
+    # --- Reads -----------------------------------------------------------
+
+    def in_range(self, start_minute=None, end_minute=None):
+        """
+        Row positions, in (start, id) order, of meetings overlapping
+        [start_minute, end_minute); either bound may be None.
+        """
+        hi = len(self) if end_minute is None else int(np.searchsorted(self.start, end_minute))
+        if start_minute is None:
+            return np.arange(hi)
+        # Nothing starting more than `longest` before start_minute can
+        # still be running, so only that slice is checked.
+        lo = int(np.searchsorted(self.start, start_minute - self.longest))
+        return lo + np.flatnonzero(self.end[lo:hi] > start_minute)
+
+    def series_rows(self):
+        """
+        Positions of the recurring meetings, in row order.
+        """
+        if self._series_rows is None:
+            self._series_rows = np.flatnonzero(self.recurrence != NONE_CODE)
+        return self._series_rows
+
+    def first_start(self):
+        return int(self.start[0]) if len(self) else None
+
+    def last_start(self):
+        return int(self.start[-1]) if len(self) else None
+
+    def local_minutes(self, minutes, zone=None):
+        """
+        UTC epoch minutes as wall-clock minutes in `zone` (default
+        CALENDAR_ZONE), vectorised over the zone's offset table.
+        """
+        table = offset_table(zone)
+        position = np.searchsorted(np.asarray(table.utc_starts, np.int64), minutes, side="right") - 1
+        return minutes + np.asarray(table.offsets, np.int64)[np.maximum(position, 0)]
+
+    def day_counts(self, first_day, last_day, zone=None):
+        """
+        Meetings starting on each wall-clock day (in `zone`) from
+        first_day to last_day inclusive, as an int array.
+        """
+        days = (last_day - first_day).days + 1
+        if days <= 0:
+            return np.zeros(0, np.int64)
+        first_minute = (first_day.toordinal() - _EPOCH_DAY) * 1440
+        # Offsets are under a day, so a day's wider margin is enough.
+        lo = int(np.searchsorted(self.start, first_minute - 1440))
+        hi = int(np.searchsorted(self.start, first_minute + (days + 1) * 1440))
+        day = (self.local_minutes(self.start[lo:hi], zone) - first_minute) // 1440
+        day = day[(day >= 0) & (day < days)]
+        return np.bincount(day, minlength=days)
+
+    def overlap_counts(self, window_starts, window_ends):
+        """
+        For each [start, end) window, how many meetings overlap it: those
+        starting before its end minus those that ended by its start.
+        """
+        if self._sorted_end is None:
+            self._sorted_end = np.sort(self.end)
+        window_starts = np.asarray(window_starts, np.int64)
+        window_ends = np.asarray(window_ends, np.int64)
+        return (
+            np.searchsorted(self.start, window_ends, side="left")
+            - np.searchsorted(self._sorted_end, window_starts, side="right")
+        )
+
+    def rows_with_people(self, rows, people):
+        """
+        The subset of `rows` (positions) whose meeting includes any of
+        `people`.
+        """
+        codes = [self.person_index[person] for person in people if person in self.person_index]
+        if not codes or not len(rows):
+            return rows[:0]
+        counts = self.person_offsets[rows + 1] - self.person_offsets[rows]
+        owner = np.repeat(np.arange(len(rows)), counts)
+        # Link positions of every row in `rows`, back to back.
+        links = np.repeat(self.person_offsets[rows] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        wanted = np.zeros(len(self.people), bool)
+        wanted[codes] = True
+        hit = np.zeros(len(rows), bool)
+        hit[owner[wanted[self.person_codes[links]]]] = True
+        return rows[hit]
+
+    def precheck(self, start_minute, end_minute, people=None, ignore_id=None):
+        """
+        Cheap conflict pre-check of [start_minute, end_minute) against the
+        meetings of `people` (all meetings when None):
+        (ids of one-off meetings overlapping it, ids of recurring series
+        that may). One-off overlaps are exact; a series is listed when it
+        has started by end_minute and not ended before start_minute, and
+        needs the scheduler's exact check.
+        """
+        lo = int(np.searchsorted(self.start, start_minute - self.longest))
+        hi = int(np.searchsorted(self.start, end_minute))
+        one_off = lo + np.flatnonzero(
+            (self.end[lo:hi] > start_minute) & (self.recurrence[lo:hi] == NONE_CODE)
+        )
+        series = self.series_rows()
+        series = series[: np.searchsorted(series, hi)]
+        # An occurrence starting before the cutoff can run for as long as
+        # the first one did.
+        series = series[self.until[series] > start_minute - (self.end[series] - self.start[series])]
+        if people is not None:
+            one_off = self.rows_with_people(one_off, people)
+            series = self.rows_with_people(series, people)
+        one_off_ids, series_ids = self.ids[one_off].tolist(), self.ids[series].tolist()
+        if ignore_id is not None:
+            one_off_ids = [meeting_id for meeting_id in one_off_ids if meeting_id != ignore_id]
+            series_ids = [meeting_id for meeting_id in series_ids if meeting_id != ignore_id]
+        return one_off_ids, series_ids
+
+
+class MeetingStore:
+    """
+    The current MeetingColumns plus the writes made since it was built,
+    folded into a new snapshot by snapshot(). Not thread-safe; the
+    scheduler calls it under its index lock.
+    """
+
+    def __init__(self, columns=None):
+        self._columns = columns if columns is not None else MeetingColumns.empty()
+        self._added = {}      # meeting_id -> (start, end, recurrence code, until, people)
+        self._removed = set()  # meeting ids to drop from the snapshot
+
+    def add(self, meeting_id, start_minute, end_minute, recurrence_type="none", until_minute=None, people=()):
+        """
+        Insert (or move) a meeting.
+        """
+        self._removed.add(meeting_id)
+        self._added[meeting_id] = (
+            start_minute, end_minute, RECURRENCE_CODES[recurrence_type or "none"],
+            NO_UNTIL if until_minute is None else until_minute, tuple(people),
+        )
+
+    def remove(self, meeting_id):
+        self._added.pop(meeting_id, None)
+        self._removed.add(meeting_id)
+
+    def snapshot(self):
+        """
+        The up-to-date MeetingColumns. Pending writes cost one pass over the
+        arrays, however many there are.
+        """
+        if self._added or self._removed:
+            self._columns = self._merge()
+            self._added.clear()
+            self._removed.clear()
+        return self._columns
+
+    def _merge(self):
+        old = self._columns
+        keep = ~np.isin(old.ids, np.fromiter(self._removed, np.int64, len(self._removed)))
+        link_keep = np.repeat(keep, np.diff(old.person_offsets))
+        ids, start, end = old.ids[keep], old.start[keep], old.end[keep]
+        recurrence, until = old.recurrence[keep], old.until[keep]
+        counts = np.diff(old.person_offsets)[keep]
+        codes = old.person_codes[link_keep]
+        offsets = np.zeros(len(ids) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        people = list(old.people)
+        index = dict(old.person_index)
+        added = sorted(self._added.items(), key=lambda item: (item[1][0], item[0]))
+        new_ids = np.array([meeting_id for meeting_id, _ in added], np.int32)
+        new_start = np.array([values[0] for _, values in added], np.int64)
+        new_counts = np.array([len(values[4]) for _, values in added], np.int32)
+        new_codes = []
+        for _, values in added:
+            for person in values[4]:
+                code = index.get(person)
+                if code is None:
+                    code = index[person] = len(people)
+                    people.append(person)
+                new_codes.append(code)
+
+        at = np.searchsorted(_sort_key(start, ids.astype(np.int64)), _sort_key(new_start, new_ids.astype(np.int64)))
+        merged_codes = np.insert(codes, np.repeat(offsets[at], new_counts), np.array(new_codes, np.int32))
+        merged_counts = np.insert(counts, at, new_counts)
+        merged_offsets = np.zeros(len(merged_counts) + 1, np.int32)
+        np.cumsum(merged_counts, out=merged_offsets[1:])
+        return MeetingColumns(
+            np.insert(ids, at, new_ids),
+            np.insert(start, at, new_start),
+            np.insert(end, at, np.array([values[1] for _, values in added], np.int64)),
+            np.insert(recurrence, at, np.array([values[2] for _, values in added], np.int8)),
+            np.insert(until, at, np.array([values[3] for _, values in added], np.int64)),
+            merged_offsets,
+            merged_codes.astype(np.int32, copy=False),
+            people,
+        )
@@ -1,12 +1,99 @@
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import islice
 from dateutil import parser as date_parser
 import pytz
 import re
 
+from . import timezones
+from .cache import parse_cache
+from .instrumentation import timed
+
 IST = pytz.timezone("Asia/Kolkata")
 
+# One pass over the lower-cased input finds every token the parser cares
+# about. The lookahead makes each match zero-width, so tokens that overlap
+# ("without" -> "with") are all seen, exactly like the substring checks
+# they replace. The leading character class lets the scan skip positions
+# that cannot start any token without trying the alternatives.
+_TOKEN_RE = re.compile(
+    r"(?=[\dadetuwm])"
+    r"(?="
+    # Duration: "30 minutes", "1 hour", "2 hrs"
+    r"(?P<duration>(?P<dur_num>\d+)\s*(?P<dur_unit>minute|min|hour|hr|hours|hrs))"
+    # Time: "4 pm", "11:30 am"
+    r"|(?P<clock>(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm))"
+    # Keywords
+    r"|(?P<keyword>tomorrow|today|with|about|until"
+    r"|every day|daily|every week|weekly|every month|monthly)"
+    r")"
+)
+
+_RECURRENCE_KEYWORDS = {
+    "every day": "daily",
+    "daily": "daily",
+    "every week": "weekly",
+    "weekly": "weekly",
+    "every month": "monthly",
+    "monthly": "monthly",
+}
+
+# Argument of "until <date>", matched right after the keyword
+_UNTIL_ARG_RE = re.compile(r"\s+([a-zA-Z0-9 ,/-]+)")
+
+# Dates parsed without dateutil. Anything else (or anything these reject)
+# still goes through dateutil with dayfirst=True.
+_DAYFIRST_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+
+def _parse_clock(match):
+    """
+    Hour and minute of a "4 pm" / "11:30 am" token, or None.
+    """
+    hour = int(match.group("hour"))
+    minute = int(match.group("minute") or 0)
+    if 1 <= hour <= 12 and minute <= 59:
+        hour = hour % 12 + (12 if match.group("meridiem") == "pm" else 0)
+        return hour, minute
+    # Odd inputs ("13 pm", "0 am") keep dateutil's interpretation.
+    try:
+        parsed = date_parser.parse(match.group("clock"))
+    except Exception:
+        return None
+    return parsed.hour, parsed.minute
+
 
-def parse_meeting_request(user_input: str):
+def _parse_until(value, now):
+    """
+    Naive datetime for the argument of an "until" clause, or None.
+    """
+    value = value.strip()
+    try:
+        match = _DAYFIRST_DATE_RE.fullmatch(value)
+        if match:
+            day, month, year = map(int, match.groups())
+            return datetime(year, month, day)
+        match = _ISO_DATE_RE.fullmatch(value)
+        # dateutil's dayfirst reads 2025-03-04 as 3 April; only take the
+        # shortcut where that reading is impossible.
+        if match and int(match.group(3)) > 12:
+            year, month, day = map(int, match.groups())
+            return datetime(year, month, day)
+    except ValueError:
+        pass
+
+    try:
+        default = now.replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+        return date_parser.parse(value, dayfirst=True, default=default)
+    except Exception:
+        return None
+
+
+@timed("nlp.parse_meeting_request")
+def parse_meeting_request(user_input: str, now=None, zone=None):
     """
     Offline/local parser for meeting extraction without external APIs.
 
@@ -17,13 +104,16 @@ def parse_meeting_request(user_input: str):
     - participants
     - recurrence_type: none/daily/weekly/monthly
     - recurrence_until: optional end date
+
+    Times are read as wall-clock time in `zone` (a tz database name,
+    default the calendar zone) and returned aware in that zone. `now` is
+    the reference for relative dates; defaults to the current time.
     """
 
     text = user_input.strip()
     lower = text.lower()
 
-    now = datetime.now(IST)
-    start_time = now + timedelta(hours=1)
+    now = timezones.localize(now, zone) if now is not None else timezones.now(zone)
     duration_minutes = 30
     title = "Meeting"
     participants = ""
@@ -31,36 +121,37 @@ def parse_meeting_request(user_input: str):
     recurrence_type = "none"
     recurrence_until = None
 
-    # Duration: "30 minutes", "1 hour", "2 hrs"
-    dur = re.search(r"(\d+)\s*(minute|min|hour|hr|hours|hrs)", lower)
-    if dur:
-        num = int(dur.group(1))
-        unit = dur.group(2)
+    duration = None
+    clock = None
+    keywords = {}  # keyword -> list of positions
+    for match in _TOKEN_RE.finditer(lower):
+        kind = match.lastgroup
+        if kind == "keyword":
+            keywords.setdefault(match.group("keyword"), []).append(match.start())
+        elif kind == "duration":
+            duration = duration or match
+        elif kind == "clock":
+            clock = clock or match
+
+    if duration:
+        num = int(duration.group("dur_num"))
+        unit = duration.group("dur_unit")
         if "hour" in unit or "hr" in unit:
             duration_minutes = num * 60
         else:
             duration_minutes = num
 
-    # Date: today / tomorrow
-    base_date = now
-    if "tomorrow" in lower:
-        base_date = now + timedelta(days=1)
-    elif "today" in lower:
-        base_date = now
-
-    # Time: "4 pm", "11:30 am", "16:00"
-    time_match = re.search(r"(\d{1,2}(:\d{2})?\s*(am|pm))", lower)
-    parsed_time = None
-    if time_match:
-        try:
-            parsed_time = date_parser.parse(time_match.group(1))
-        except Exception:
-            parsed_time = None
+    # Date: today / tomorrow. Work on the wall clock and localize at the
+    # end, so a DST change in between gets the right offset.
+    base_date = now.replace(tzinfo=None)
+    if "tomorrow" in keywords:
+        base_date = base_date + timedelta(days=1)
 
+    parsed_time = _parse_clock(clock) if clock else None
     if parsed_time:
         start_time = base_date.replace(
-            hour=parsed_time.hour,
-            minute=parsed_time.minute,
+            hour=parsed_time[0],
+            minute=parsed_time[1],
             second=0,
             microsecond=0,
         )
@@ -70,39 +161,40 @@ def parse_meeting_request(user_input: str):
             minute=0, second=0, microsecond=0
         ) + timedelta(hours=1)
 
-    # Participants: after "with"
-    with_idx = lower.find("with")
-    if with_idx != -1:
-        participants = text[with_idx + len("with"):].strip()
-        about_idx = participants.lower().find("about")
-        if about_idx != -1:
-            participants = participants[:about_idx].strip()
+    # Participants: after "with", up to the next "about"
+    about_positions = keywords.get("about", [])
+    if "with" in keywords:
+        after_with = keywords["with"][0] + len("with")
+        next_about = bisect_left(about_positions, after_with)
+        if next_about < len(about_positions):
+            participants = text[after_with:about_positions[next_about]].strip()
+        else:
+            participants = text[after_with:].strip()
 
     # Title/topic: after "about"
-    about_idx_full = lower.find("about")
-    if about_idx_full != -1:
-        title = text[about_idx_full + len("about"):].strip().capitalize() or "Meeting"
+    if about_positions:
+        title = text[about_positions[0] + len("about"):].strip().capitalize() or "Meeting"
     else:
         title = text[:60] + ("..." if len(text) > 60 else "")
 
-    # Recurrence: daily/weekly/monthly
-    if "every day" in lower or "daily" in lower:
-        recurrence_type = "daily"
-    elif "every week" in lower or "weekly" in lower:
-        recurrence_type = "weekly"
-    elif "every month" in lower or "monthly" in lower:
-        recurrence_type = "monthly"
+    # Recurrence: daily beats weekly beats monthly
+    found = {_RECURRENCE_KEYWORDS[k] for k in keywords if k in _RECURRENCE_KEYWORDS}
+    for candidate in ("daily", "weekly", "monthly"):
+        if candidate in found:
+            recurrence_type = candidate
+            break
 
     # Optional: "until <date>"
-    m_until = re.search(r"until\s+([a-zA-Z0-9 ,/-]+)", lower)
-    if m_until:
-        try:
-            dt = date_parser.parse(m_until.group(1), dayfirst=True)
-            recurrence_until = IST.localize(dt)
-        except Exception:
-            recurrence_until = None
+    for pos in keywords.get("until", []):
+        m_until = _UNTIL_ARG_RE.match(lower, pos + len("until"))
+        if m_until:
+            dt = _parse_until(m_until.group(1), now)
+            if dt is not None and dt.tzinfo is None:
+                recurrence_until = timezones.localize(dt, zone)
+            break
 
-    end_time = start_time + timedelta(minutes=duration_minutes)
+    end_time = timezones.localize(start_time + timedelta(minutes=duration_minutes), zone)
+    start_time = timezones.localize(start_time, zone)
 
     return {
         "title": title,
@@ -112,3 +204,82 @@ def parse_meeting_request(user_input: str):
         "recurrence_type": recurrence_type,
         "recurrence_until": recurrence_until,
     }
+
+
+def parse_meeting_request_cached(user_input: str, now=None, zone=None):
+    """
+    parse_meeting_request through the process-wide parse cache (see
+    agent.cache.TTLCache), for the UI and the HTTP service where the same
+    request is often analysed again.
+
+    The input is keyed as typed (titles and participants keep its
+    whitespace, so variants must not share an entry), with the zone and
+    the wall-clock hour of `now`: the parser only reads the date and hour
+    of `now`, so within that bucket a cached result is exactly what a
+    fresh parse would return. Returns a copy the caller may modify.
+    """
+    now = timezones.localize(now, zone) if now is not None else timezones.now(zone)
+    hour = now.replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    parsed = parse_cache.get(
+        (user_input, zone or timezones.CALENDAR_ZONE, hour),
+        lambda: parse_meeting_request(user_input, now=now, zone=zone),
+    )
+    return dict(parsed)
+
+
+def _parse_one(user_input, now, zone=None):
+    """
+    (parsed, error) for one batch item; never raises.
+    """
+    if not isinstance(user_input, str):
+        return None, f"Expected a string, got {type(user_input).__name__}."
+    try:
+        return parse_meeting_request(user_input, now=now, zone=zone), None
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def _parse_chunk(chunk, now, zone=None):
+    return [_parse_one(user_input, now, zone) for user_input in chunk]
+
+
+def parse_meeting_requests(user_inputs, now=None, workers=None, chunk_size=500, zone=None):
+    """
+    Parse many meeting requests, streaming results as a generator.
+
+    Yields (index, parsed, error) in input order: `parsed` is the dict
+    parse_meeting_request returns, or None with `error` describing why the
+    item failed. A failing item never aborts the batch.
+
+    One reference `now` is pinned for the whole batch (the current time if
+    not given), so the results do not drift while it runs. `zone` is passed
+    on to parse_meeting_request.
+
+    With workers > 1, chunks of `chunk_size` inputs are parsed in a process
+    pool; at most 2 * workers chunks are in flight, so the input is still
+    consumed lazily.
+    """
+    if now is None:
+        now = timezones.now(zone)
+
+    if not workers or workers <= 1:
+        for index, user_input in enumerate(user_inputs):
+            parsed, error = _parse_one(user_input, now, zone)
+            yield index, parsed, error
+        return
+
+    inputs = iter(user_inputs)
+    index = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(inputs, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_parse_chunk, chunk, now, zone))
+            if not pending:
+                return
+            for parsed, error in pending.popleft().result():
+                yield index, parsed, error
+                index += 1
@@ -0,0 +1,29 @@
+import re
+
+# "Rahul, Priya and Sam", "rahul & priya; sam"
+_SEPARATORS = re.compile(r"\s*(?:,|;|&|\band\b)\s*", re.IGNORECASE)
+
+
+def split_participant_names(text):
+    """
+    The people in the free-text participants field as written (whitespace
+    collapsed, case kept), de-duplicated ignoring case, in input order:
+    split_participants before lower-casing.
+    """
+    if not text:
+        return []
+    names, seen = [], set()
+    for part in _SEPARATORS.split(text):
+        name = " ".join(part.split())
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def split_participants(text):
+    """
+    Split the free-text participants field into normalised identities:
+    lower-cased, whitespace-collapsed, de-duplicated, in input order.
+    """
+    return [name.lower() for name in split_participant_names(text)]
@@ -0,0 +1,313 @@
+import calendar
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
+
+RECURRENCE_TYPES = ("none", "daily", "weekly", "monthly")
+
+# Fixed-length periods. Monthly series are handled separately because their
+# period varies with the month.
+PERIODS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+# Phases of fixed-period series are measured from this instant.
+EPOCH = datetime(1970, 1, 5)  # a Monday, so weekly phases line up with weekdays
+
+
+def _ceil_div(a, b):
+    return -((-a) // b)
+
+
+def add_months(dt, months):
+    """
+    Shift dt by whole months, clamping the day to the end of shorter months
+    (Jan 31 + 1 month -> Feb 28/29).
+    """
+    month_index = dt.month - 1 + months
+    year = dt.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+def _months_between(earlier, later):
+    return (later.year - earlier.year) * 12 + (later.month - earlier.month)
+
+
+def until_cutoff(recurrence_until):
+    """
+    Occurrences may start any time on the `until` date, so the exclusive
+    cutoff is midnight after it. None means open-ended.
+    """
+    if recurrence_until is None:
+        return None
+    return datetime.combine(recurrence_until.date() + timedelta(days=1), time())
+
+
+class Series:
+    """
+    A recurring meeting: its first occurrence plus the rule that repeats it.
+
+    All the questions asked of a series are answered arithmetically from the
+    occurrence number k, never by walking occurrences from the first one.
+    """
+
+    __slots__ = ("meeting_id", "start", "duration", "recurrence_type", "last")
+
+    def __init__(self, meeting_id, start, end, recurrence_type, recurrence_until=None):
+        if recurrence_type not in PERIODS and recurrence_type != "monthly":
+            raise ValueError(f"Unsupported recurrence type: {recurrence_type!r}")
+
+        self.meeting_id = meeting_id
+        self.start = start
+        self.duration = end - start
+        self.recurrence_type = recurrence_type
+        self.last = self._last_index(until_cutoff(recurrence_until))
+
+    def _last_index(self, cutoff):
+        """
+        Number of the last occurrence starting before `cutoff` (None when
+        open-ended, -1 when the series never occurs).
+        """
+        if cutoff is None:
+            return None
+        if cutoff <= self.start:
+            return -1
+        period = PERIODS.get(self.recurrence_type)
+        if period is not None:
+            return _ceil_div(cutoff - self.start, period) - 1
+        k = _months_between(self.start, cutoff)
+        while add_months(self.start, k) >= cutoff:
+            k -= 1
+        return k
+
+    def occurrence(self, k):
+        period = PERIODS.get(self.recurrence_type)
+        if period is not None:
+            start = self.start + k * period
+        else:
+            start = add_months(self.start, k)
+        return start, start + self.duration
+
+    def _index_range(self, window_start, window_end):
+        """
+        Range of occurrence numbers [k_lo, k_hi] that can overlap the window.
+        Exact for fixed periods, a tight superset for monthly series.
+        """
+        period = PERIODS.get(self.recurrence_type)
+        if period is not None:
+            # Occurrence k overlaps iff start + k*P < window_end and
+            # start + k*P + duration > window_start.
+            k_lo = (window_start - self.duration - self.start) // period + 1
+            k_hi = _ceil_div(window_end - self.start, period) - 1
+        else:
+            k_lo = _months_between(self.start, window_start - self.duration) - 1
+            k_hi = _months_between(self.start, window_end)
+
+        k_lo = max(k_lo, 0)
+        if self.last is not None:
+            k_hi = min(k_hi, self.last)
+        return k_lo, k_hi
+
+    def overlaps(self, window_start, window_end):
+        """
+        Return True if any occurrence overlaps [window_start, window_end).
+        """
+        k_lo, k_hi = self._index_range(window_start, window_end)
+        if k_lo > k_hi:
+            return False
+        if self.recurrence_type in PERIODS:
+            return True
+        return any(True for _ in self.occurrences(window_start, window_end))
+
+    def occurrences(self, window_start, window_end):
+        """
+        Lazily yield the (start, end) of each occurrence overlapping
+        [window_start, window_end).
+        """
+        k_lo, k_hi = self._index_range(window_start, window_end)
+        for k in range(k_lo, k_hi + 1):
+            start, end = self.occurrence(k)
+            if start < window_end and end > window_start:
+                yield start, end
+
+
+def iter_occurrences(start, end, recurrence_type, recurrence_until, window_start, window_end):
+    """
+    Lazily yield the (start, end) occurrences of a meeting inside a window.
+    One-off meetings yield themselves if they overlap it.
+    """
+    if recurrence_type in (None, "none"):
+        if start < window_end and end > window_start:
+            yield start, end
+        return
+    series = Series(None, start, end, recurrence_type, recurrence_until)
+    yield from series.occurrences(window_start, window_end)
+
+
+class SeriesIndex:
+    """
+    Index of recurring series answering "which series have an occurrence
+    overlapping [start, end)?".
+
+    Fixed-period series are bucketed by period and sorted by phase (their
+    start modulo the period), so a short query window only inspects the
+    series whose phase falls in the matching arc of the period. Monthly
+    series are bucketed by day of month, so a short window only inspects
+    the series that can land on the dates it covers.
+    """
+
+    def __init__(self):
+        self._series = {}   # meeting_id -> Series
+        self._phases = {rtype: [] for rtype in PERIODS}  # sorted (phase, meeting_id)
+        self._longest = {rtype: timedelta(0) for rtype in PERIODS}
+        self._monthly = {}  # day of month -> {meeting_id: Series}
+        self._longest_monthly = timedelta(0)
+
+    @classmethod
+    def build(cls, rows):
+        """
+        Build an index from (meeting_id, start, end, recurrence_type,
+        recurrence_until) tuples.
+        """
+        index = cls()
+        for row in rows:
+            index._insert(Series(*row))
+        for entries in index._phases.values():
+            entries.sort()
+        return index
+
+    def __len__(self):
+        return len(self._series)
+
+    def __contains__(self, meeting_id):
+        return meeting_id in self._series
+
+    def _insert(self, series, keep_sorted=False):
+        self._series[series.meeting_id] = series
+        rtype = series.recurrence_type
+        if rtype in PERIODS:
+            entry = ((series.start - EPOCH) % PERIODS[rtype], series.meeting_id)
+            if keep_sorted:
+                insort(self._phases[rtype], entry)
+            else:
+                self._phases[rtype].append(entry)
+            if series.duration > self._longest[rtype]:
+                self._longest[rtype] = series.duration
+        else:
+            self._monthly.setdefault(series.start.day, {})[series.meeting_id] = series
+            if series.duration > self._longest_monthly:
+                self._longest_monthly = series.duration
+
+    def add(self, meeting_id, start, end, recurrence_type, recurrence_until=None):
+        """
+        Insert (or move) a recurring meeting.
+        """
+        if meeting_id in self._series:
+            self.remove(meeting_id)
+        self._insert(
+            Series(meeting_id, start, end, recurrence_type, recurrence_until),
+            keep_sorted=True,
+        )
+
+    def remove(self, meeting_id):
+        """
+        Drop a recurring meeting. Unknown ids are ignored.
+
+        The per-period longest duration is left as is: it only widens the
+        phase arc that queries inspect, never hides a match.
+        """
+        series = self._series.pop(meeting_id, None)
+        if series is None:
+            return
+        rtype = series.recurrence_type
+        if rtype in PERIODS:
+            entries = self._phases[rtype]
+            entry = ((series.start - EPOCH) % PERIODS[rtype], meeting_id)
+            del entries[bisect_left(entries, entry)]
+        else:
+            bucket = self._monthly[series.start.day]
+            del bucket[meeting_id]
+            if not bucket:
+                del self._monthly[series.start.day]
+
+    def get(self, meeting_id):
+        return self._series.get(meeting_id)
+
+    def _candidates(self, start, end):
+        for rtype, period in PERIODS.items():
+            entries = self._phases[rtype]
+            if not entries:
+                continue
+            # An occurrence starting at t overlaps iff t is in
+            # (start - longest, end); map that arc onto [0, period).
+            span = end - start + self._longest[rtype]
+            if span >= period:
+                for _, meeting_id in entries:
+                    yield self._series[meeting_id]
+                continue
+            lo = (start - self._longest[rtype] - EPOCH) % period
+            hi = lo + span
+            if hi <= period:
+                arcs = [(lo, hi)]
+            else:
+                arcs = [(lo, period), (timedelta(0), hi - period)]
+            for arc_lo, arc_hi in arcs:
+                pos = bisect_left(entries, (arc_lo,))
+                while pos < len(entries) and entries[pos][0] < arc_hi:
+                    yield self._series[entries[pos][1]]
+                    pos += 1
+        yield from self._monthly_candidates(start, end)
+
+    def _monthly_candidates(self, start, end):
+        if not self._monthly:
+            return
+        # An occurrence can start up to the longest duration before the
+        # window; long windows fall back to checking every bucket.
+        first_day = (start - self._longest_monthly).date()
+        last_day = end.date()
+        if (last_day - first_day).days >= 7:
+            for bucket in self._monthly.values():
+                yield from bucket.values()
+            return
+
+        days = set()
+        day = first_day
+        while day <= last_day:
+            days.add(day.day)
+            month_length = calendar.monthrange(day.year, day.month)[1]
+            if day.day == month_length:
+                # Series on the 29th-31st are clamped onto short months' last day.
+                days.update(range(month_length + 1, 32))
+            day += timedelta(days=1)
+        for day_of_month in days:
+            yield from self._monthly.get(day_of_month, {}).values()
+
+    def find(self, start, end, ignore_id=None):
+        """
+        Return the ids of series with an occurrence overlapping [start, end).
+        """
+        return [
+            series.meeting_id
+            for series in self._candidates(start, end)
+            if series.meeting_id != ignore_id and series.overlaps(start, end)
+        ]
+
+    def overlaps(self, start, end, ignore_id=None):
+        """
+        Return True if any series has an occurrence overlapping [start, end).
+        """
+        return any(
+            series.meeting_id != ignore_id and series.overlaps(start, end)
+            for series in self._candidates(start, end)
+        )
+
+    def occurrences(self, window_start, window_end):
+        """
+        Lazily yield (meeting_id, start, end) for every occurrence of every
+        series inside the window.
+        """
+        for series in self._candidates(window_start, window_end):
+            for start, end in series.occurrences(window_start, window_end):
+                yield series.meeting_id, start, end
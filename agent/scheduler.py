@@ -1,32 +1,578 @@
-from .db import get_session, Meeting
+import heapq
+import os
+import threading
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, time, timedelta, timezone
+from functools import wraps
+from time import monotonic
 
+from sqlalchemy import bindparam, delete, func, insert, literal, select, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
 
-def is_conflict(start_time, end_time, session=None, ignore_meeting_id=None):
+from .cache import read_cache
+from .calendar_index import CalendarIndex
+from .day_buckets import DayBuckets
+from .db import (
+    PARTICIPANT_OVERLAP_CONSTRAINT,
+    bump_revision,
+    read_revision,
+    session_scope,
+    ArchiveState,
+    Meeting,
+    MeetingArchive,
+    MeetingParticipant,
+)
+from .instrumentation import timed
+from .meeting_store import MeetingColumns, MeetingStore
+from .participants import split_participants
+from .recurrence import RECURRENCE_TYPES, Series, until_cutoff
+from .timezones import from_utc_minutes, to_utc_minutes, to_wall_clock
+
+# Process-wide indexes over the meetings table: one CalendarIndex for the
+# whole table, plus one per participant so conflict checks only look at the
+# calendars of the people invited. Built from the DB on first use (or
+# explicitly at startup) and kept in sync by the write paths.
+_calendar = None
+_people = {}          # person -> CalendarIndex of their meetings
+_meeting_people = {}  # meeting_id -> people it is indexed under
+_days = None  # DayBuckets of the whole calendar, for the day/week/month views
+_store = None  # MeetingStore: columnar snapshot for vectorised reads
+_index_revision = None  # CalendarRevision the indexes reflect
+# ArchiveState as of that revision: meetings before the horizon live in
+# meetings_archive, and the longest of them bounds reads of it.
+_archive_horizon = None
+_archive_longest = None
+_index_lock = threading.Lock()
+
+# Held by every write path from its conflict check until the indexes are
+# updated, so two sessions of this process cannot both book one slot.
+_write_lock = threading.Lock()
+
+# Seconds reads trust the indexes and the read cache before checking the
+# calendar revision in the DB again, to pick up writes made by other
+# processes (a second app process, the HTTP service). 0 checks on every read.
+REVISION_CHECK_INTERVAL = float(os.getenv("REVISION_CHECK_SECONDS", "0.25"))
+_revision_checked_at = None  # monotonic() of the last check
+_booking_thread = threading.local()  # .active inside _booking()
+
+# Meetings without participants share one calendar of their own, so they
+# still conflict with each other (but not with anyone's meetings).
+UNASSIGNED = ""
+
+# Columns returned by the windowed read API, as plain tuples rather than ORM
+# objects.
+MEETING_ROW_COLUMNS = (
+    Meeting.id,
+    Meeting.title,
+    Meeting.participants,
+    Meeting.start_time,
+    Meeting.end_time,
+    Meeting.source,
+    Meeting.created_at,
+    Meeting.recurrence_type,
+    Meeting.recurrence_until,
+)
+MeetingRow = namedtuple("MeetingRow", [column.key for column in MEETING_ROW_COLUMNS])
+# The same columns of meetings_archive, for reads spanning both tables.
+ARCHIVE_ROW_COLUMNS = tuple(getattr(MeetingArchive, column.key) for column in MEETING_ROW_COLUMNS)
+
+# on_conflict policies understood by bulk_create_meetings
+BULK_CONFLICT_POLICIES = ("skip", "fail", "report")
+# Rows per executemany() call in bulk_create_meetings
+BULK_INSERT_CHUNK = 5000
+
+# Defaults for find_free_slots: 09:00-18:00, Monday to Friday, slot starts
+# rounded up to the quarter hour.
+WORKING_HOURS = (time(9), time(18))
+WORKING_DAYS = (0, 1, 2, 3, 4)
+SLOT_GRANULARITY = timedelta(minutes=15)
+FREE_SLOT_MODES = ("sweep", "bitmap")
+# Longest window find_free_slots searches; bitmap mode holds one cell per
+# minute of it.
+MAX_FREE_SLOT_WINDOW = timedelta(days=366)
+
+# How far ahead a *new* recurring meeting is checked against the calendar.
+# Existing series are always checked exactly, whatever their length.
+RECURRENCE_HORIZON = timedelta(days=365)
+
+# Meetings moved to meetings_archive per transaction (archive_meetings).
+ARCHIVE_BATCH = 1000
+# As an IN list, so the (recurrence_type, start_time) index serves it.
+RECURRING_TYPES = tuple(rtype for rtype in RECURRENCE_TYPES if rtype != "none")
+
+# Threads running speculative proposal checks (check_proposal_async).
+PROPOSAL_CHECK_WORKERS = 2
+_proposal_pool = None
+_proposal_pool_lock = threading.Lock()
+
+
+def _naive(dt):
     """
-    Check if the given time range conflicts with any existing meeting.
-    Optionally ignore one meeting (for edits).
+    The meetings table stores naive wall-clock times in the calendar zone;
+    aware values (in whatever zone) are converted to that form.
+    """
+    return to_wall_clock(dt)
+
+
+def _is_recurring(recurrence_type):
+    return recurrence_type not in (None, "none")
+
+
+def _scope(participants):
+    """
+    Normalised people (free text or a list of names) whose calendars a
+    meeting lives in; UNASSIGNED when nobody is named.
     """
-    close_session = False
-    if session is None:
-        session = get_session()
-        close_session = True
+    if not isinstance(participants, str):
+        participants = ", ".join(participants)
+    return tuple(split_participants(participants)) or (UNASSIGNED,)
+
+
+def _cutoff_minute(recurrence_until):
+    """
+    UTC minute a series' occurrences must start before, or None.
+    """
+    cutoff = until_cutoff(recurrence_until)
+    return None if cutoff is None else to_utc_minutes(cutoff)
+
+
+def _use_session(session):
+    """
+    The caller's session if given, else a fresh session_scope().
+    """
+    return nullcontext(session) if session is not None else session_scope()
+
+
+def _catch_up():
+    """
+    Rebuild the indexes and drop the read cache if another process has
+    written since they were built. Looks at the DB at most once every
+    REVISION_CHECK_INTERVAL; inside _booking() it has just been checked.
+    """
+    global _revision_checked_at
+    if getattr(_booking_thread, "active", False):
+        return
+    now = monotonic()
+    if _revision_checked_at is not None and now - _revision_checked_at < REVISION_CHECK_INTERVAL:
+        return
+    with session_scope() as session:
+        revision = read_revision(session)
+    _revision_checked_at = now
+    if _index_revision is not None and revision <= _index_revision:
+        return
+    # Under the write lock, so the rebuild cannot interleave with a booking
+    # of this process; another thread may have caught up meanwhile.
+    with _write_lock:
+        if _index_revision is None or _index_revision < revision:
+            rebuild_interval_index()
+            read_cache.invalidate()
+
+
+def _current(read):
+    """
+    Decorator for the read API: _catch_up() before reading.
+    """
+    @wraps(read)
+    def wrapper(*args, **kwargs):
+        _catch_up()
+        return read(*args, **kwargs)
+    return wrapper
+
+
+def rebuild_interval_index(session=None):
+    """
+    (Re)build the in-memory calendar and per-participant indexes from the
+    meetings table.
+    """
+    global _calendar, _people, _meeting_people, _days, _store, _index_revision
+    global _archive_horizon, _archive_longest
+
+    with _use_session(session) as session:
+        revision = read_revision(session)
+        archive = session.execute(
+            select(ArchiveState.archived_before, ArchiveState.longest_minutes)
+        ).first()
+        fetched = session.query(
+            Meeting.id,
+            Meeting.start_time,
+            Meeting.end_time,
+            Meeting.recurrence_type,
+            Meeting.recurrence_until,
+            Meeting.start_minute,
+            Meeting.end_minute,
+        ).all()
+        links = session.query(MeetingParticipant.meeting_id, MeetingParticipant.person).all()
+    rows = [row[:5] for row in fetched]
+
+    people_of = {}
+    for meeting_id, person in links:
+        people_of.setdefault(meeting_id, []).append(person)
+    meeting_people = {row[0]: tuple(people_of.get(row[0], ())) or (UNASSIGNED,) for row in rows}
+    rows_of = {}
+    for row in rows:
+        for person in meeting_people[row[0]]:
+            rows_of.setdefault(person, []).append(row)
 
-    query = session.query(Meeting).filter(
-        Meeting.start_time < end_time,
-        Meeting.end_time > start_time,
+    with _index_lock:
+        _calendar = CalendarIndex.build(rows)
+        _people = {person: CalendarIndex.build(person_rows) for person, person_rows in rows_of.items()}
+        _meeting_people = meeting_people
+        _days = DayBuckets.build(rows)
+        _store = MeetingStore(MeetingColumns.build(
+            (
+                (meeting_id, start_minute, end_minute, rtype, _cutoff_minute(until))
+                for meeting_id, _, _, rtype, until, start_minute, end_minute in fetched
+            ),
+            meeting_people,
+        ))
+        _index_revision = revision
+        _archive_horizon, _archive_longest = archive or (None, None)
+    return _calendar.one_off
+
+
+@_current
+def get_calendar_index():
+    """
+    Return the process-wide index of every meeting, building it on first use.
+    """
+    if _calendar is None:
+        rebuild_interval_index()
+    return _calendar
+
+
+@_current
+def get_interval_index():
+    """
+    Return the process-wide interval index of one-off meetings.
+    """
+    return get_calendar_index().one_off
+
+
+@_current
+def get_series_index():
+    """
+    Return the process-wide recurring-series index.
+    """
+    return get_calendar_index().series
+
+
+@_current
+def get_person_index(person):
+    """
+    Return the index of one participant's meetings (empty if unknown).
+    """
+    get_calendar_index()
+    with _index_lock:
+        return _people.get(person) or CalendarIndex()
+
+
+@_current
+def get_meeting_columns():
+    """
+    The current columnar snapshot of the meetings table (a
+    meeting_store.MeetingColumns), shared by the calendar view, the Manage
+    tab and conflict pre-checks. It is never modified, so it can be read
+    without any lock.
+    """
+    get_calendar_index()
+    with _index_lock:
+        return _store.snapshot()
+
+
+def _add_to_indexes(meeting_id, start, end, recurrence_type, recurrence_until, people):
+    # Caller holds _index_lock.
+    _remove_from_indexes(meeting_id)
+    _calendar.add(meeting_id, start, end, recurrence_type, recurrence_until)
+    _days.add(meeting_id, start, end, recurrence_type, recurrence_until)
+    _store.add(
+        meeting_id, to_utc_minutes(start), to_utc_minutes(end, round_up=True),
+        recurrence_type, _cutoff_minute(recurrence_until), people,
     )
+    for person in people:
+        if person not in _people:
+            _people[person] = CalendarIndex()
+        _people[person].add(meeting_id, start, end, recurrence_type, recurrence_until)
+    _meeting_people[meeting_id] = people
+
+
+def _remove_from_indexes(meeting_id):
+    # Caller holds _index_lock.
+    _calendar.remove(meeting_id)
+    _days.remove(meeting_id)
+    _store.remove(meeting_id)
+    for person in _meeting_people.pop(meeting_id, ()):
+        index = _people.get(person)
+        if index is not None:
+            index.remove(meeting_id)
+            if not len(index):
+                del _people[person]
+
+
+def _remove_many_from_indexes(meeting_ids):
+    # Caller holds _index_lock. Each index is filtered once per batch rather
+    # than shifted once per meeting.
+    _calendar.remove_many(meeting_ids)
+    by_person = defaultdict(list)
+    for meeting_id in meeting_ids:
+        _days.remove(meeting_id)
+        _store.remove(meeting_id)
+        for person in _meeting_people.pop(meeting_id, ()):
+            by_person[person].append(meeting_id)
+    for person, ids in by_person.items():
+        index = _people.get(person)
+        if index is not None:
+            index.remove_many(ids)
+            if not len(index):
+                del _people[person]
+
+
+def _index_meeting(meeting, revision):
+    global _index_revision
+    get_calendar_index()
+    with _index_lock:
+        _index_revision = revision
+        _add_to_indexes(
+            meeting.id,
+            _naive(meeting.start_time),
+            _naive(meeting.end_time),
+            meeting.recurrence_type,
+            _naive(meeting.recurrence_until),
+            _scope(meeting.participants),
+        )
+
+
+def _unindex_meeting(meeting_id, revision):
+    global _index_revision
+    get_calendar_index()
+    with _index_lock:
+        _index_revision = revision
+        _remove_from_indexes(meeting_id)
 
-    if ignore_meeting_id is not None:
-        query = query.filter(Meeting.id != ignore_meeting_id)
 
-    conflicts = query.all()
+@contextmanager
+def _booking():
+    """
+    Session for a check-then-write. It holds this process's write lock and
+    the database write lock (session_scope(write=True)) until it ends, so
+    nothing can book between the check and the commit. If another process
+    has written since the indexes were built, they are rebuilt first.
+    """
+    with _write_lock, session_scope(write=True) as session:
+        if read_revision(session) != _index_revision:
+            rebuild_interval_index(session)
+            read_cache.invalidate()
+        _booking_thread.active = True
+        try:
+            yield session
+        finally:
+            _booking_thread.active = False
+
+
+def _commit(session):
+    """
+    Bump the calendar revision and commit; returns the new revision.
+    """
+    revision = bump_revision(session)
+    session.commit()
+    return revision
 
-    if close_session:
-        session.close()
 
-    return len(conflicts) > 0, conflicts
+def _rejected_by_database(exc):
+    """
+    True if `exc` is the Postgres per-person overlap constraint firing.
+    The indexes missed that booking, so they are rebuilt on the next one.
+    """
+    global _index_revision
+    if PARTICIPANT_OVERLAP_CONSTRAINT not in str(exc.orig):
+        return False
+    _index_revision = None
+    return True
 
 
+def _scoped_indexes(people):
+    """
+    Indexes a check has to look at: the whole calendar when `people` is
+    None, otherwise just those people's. Caller holds _index_lock.
+    """
+    if people is None:
+        return [_calendar]
+    return [_people[person] for person in people if person in _people]
+
+
+def _proposal_windows(start, end, recurrence_type="none", recurrence_until=None):
+    """
+    Windows a proposed meeting occupies: the meeting itself, or for a
+    recurring proposal its occurrences up to RECURRENCE_HORIZON (lazily).
+    """
+    if _is_recurring(recurrence_type):
+        proposal = Series(None, start, end, recurrence_type, recurrence_until)
+        return proposal.occurrences(start, start + RECURRENCE_HORIZON)
+    return [(start, end)]
+
+
+def _archived_rows(window_start, window_end=None, session=None):
+    """
+    Archived meetings that may have an occurrence in [window_start,
+    window_end) (no end: up to the horizon), as (id, start_time, end_time,
+    recurrence_type, recurrence_until, participants, start_minute,
+    end_minute) rows. One-offs are read by range; archived series are few,
+    so all those starting before the end are returned and the caller's
+    index works out where their occurrences fall.
+    """
+    start_minute = to_utc_minutes(window_start)
+    one_off = (MeetingArchive.recurrence_type == "none") & (MeetingArchive.end_minute > start_minute)
+    if _archive_longest is not None:
+        one_off = one_off & (MeetingArchive.start_minute >= start_minute - _archive_longest)
+    recurring = MeetingArchive.recurrence_type != "none"
+    if window_end is not None:
+        end_minute = to_utc_minutes(window_end, round_up=True)
+        one_off = one_off & (MeetingArchive.start_minute < end_minute)
+        recurring = recurring & (MeetingArchive.start_minute < end_minute)
+    query = select(
+        MeetingArchive.id,
+        MeetingArchive.start_time,
+        MeetingArchive.end_time,
+        MeetingArchive.recurrence_type,
+        MeetingArchive.recurrence_until,
+        MeetingArchive.participants,
+        MeetingArchive.start_minute,
+        MeetingArchive.end_minute,
+    ).where(one_off | recurring)
+    with _use_session(session) as session:
+        return session.execute(query).all()
+
+
+def _load_archive_indexes(first_start, session=None):
+    """
+    (CalendarIndex, {person: CalendarIndex}) of the archived meetings that
+    may overlap [first_start, archive horizon): only conflict checks of
+    meetings proposed before the horizon read the archive.
+    """
+    rows = _archived_rows(first_start, session=session)
+    rows_of = {}
+    for row in rows:
+        for person in _scope(row.participants or ""):
+            rows_of.setdefault(person, []).append(row[:5])
+    return (
+        CalendarIndex.build([row[:5] for row in rows]),
+        {person: CalendarIndex.build(person_rows) for person, person_rows in rows_of.items()},
+    )
+
+
+def _scoped_archive(archive, people):
+    """
+    _scoped_indexes for indexes from _load_archive_indexes.
+    """
+    calendar, people_indexes = archive
+    if people is None:
+        return [calendar]
+    return [people_indexes[person] for person in people if person in people_indexes]
+
+
+def _windows_before(windows, horizon):
+    """
+    The windows starting before `horizon`: the only ones that can overlap
+    an archived meeting.
+    """
+    return [window for window in windows if window[0] < horizon]
+
+
+def _collect_conflicts(windows, indexes, ignore_meeting_id=None):
+    """
+    Ids, across `indexes`, of entries overlapping any of `windows`.
+    """
+    found = {}
+    for window_start, window_end in windows:
+        for index in indexes:
+            for meeting_id in index.find(window_start, window_end, ignore_id=ignore_meeting_id):
+                found[meeting_id] = None
+    return list(found)
+
+
+def _find_conflict_ids(
+    start_time,
+    end_time,
+    recurrence_type="none",
+    recurrence_until=None,
+    ignore_meeting_id=None,
+    participants=None,
+):
+    """
+    Ids of meetings with an occurrence overlapping the proposed meeting,
+    among those sharing a participant with it (or all meetings when
+    `participants` is None).
+    """
+    get_calendar_index()
+    people = None if participants is None else _scope(participants)
+    start = _naive(start_time)
+    windows = _proposal_windows(start, _naive(end_time), recurrence_type, _naive(recurrence_until))
+    archived = []
+    horizon = _archive_horizon
+    if horizon is not None and start < horizon:
+        windows = list(windows)
+        archived = _collect_conflicts(
+            _windows_before(windows, horizon), _scoped_archive(_load_archive_indexes(start), people)
+        )
+    with _index_lock:
+        return _collect_conflicts(
+            windows, _scoped_indexes(people), ignore_meeting_id=ignore_meeting_id
+        ) + archived
+
+
+@timed("scheduler.is_conflict")
+@_current
+def is_conflict(
+    start_time,
+    end_time,
+    session=None,
+    ignore_meeting_id=None,
+    recurrence_type="none",
+    recurrence_until=None,
+    participants=None,
+):
+    """
+    Check if the given time range conflicts with any existing meeting,
+    including every occurrence of recurring meetings. Pass recurrence_type /
+    recurrence_until to check a recurring proposal.
+    Optionally ignore one meeting (for edits).
+
+    With `participants` (free text or a list of names) only meetings
+    sharing an attendee count; meetings without participants only clash
+    with each other. None checks against the whole calendar.
+
+    The overlap test runs against the in-memory indexes; only the
+    conflicting rows themselves are loaded from the DB.
+    """
+    conflict_ids = _find_conflict_ids(
+        start_time,
+        end_time,
+        recurrence_type=recurrence_type,
+        recurrence_until=recurrence_until,
+        ignore_meeting_id=ignore_meeting_id,
+        participants=participants,
+    )
+
+    if not conflict_ids:
+        return False, []
+
+    with _use_session(session) as session:
+        conflicts = (
+            session.query(Meeting)
+            .filter(Meeting.id.in_(conflict_ids))
+            .order_by(Meeting.start_time.asc())
+            .all()
+        )
+        if len(conflicts) < len(conflict_ids):
+            # The rest are archived meetings.
+            archived = session.query(MeetingArchive).filter(MeetingArchive.id.in_(conflict_ids)).all()
+            conflicts = sorted(conflicts + archived, key=lambda meeting: meeting.start_time)
+
+    return True, conflicts
+
+
+@timed("scheduler.create_meeting")
 def create_meeting(
     title,
     participants,
@@ -37,93 +583,1017 @@ def create_meeting(
     recurrence_until=None,
 ):
     """
-    Create a new meeting if there is no time conflict.
+    Create a new meeting if none of its participants is busy at that time.
+    The check and the insert are atomic (see _booking).
+    """
+    start_time, end_time = _naive(start_time), _naive(end_time)
+    recurrence_until = _naive(recurrence_until)
+    with _booking() as session:
+        conflict, _ = is_conflict(
+            start_time,
+            end_time,
+            session=session,
+            recurrence_type=recurrence_type,
+            recurrence_until=recurrence_until,
+            participants=participants or "",
+        )
+
+        if conflict:
+            return None, "Time slot conflicts with an existing meeting of a participant."
+
+        meeting = Meeting(
+            title=title,
+            start_time=start_time,
+            end_time=end_time,
+            source=source,
+            recurrence_type=recurrence_type or "none",
+            recurrence_until=recurrence_until,
+        )
+        meeting.set_participants(participants)
+        session.add(meeting)
+        try:
+            revision = _commit(session)
+        except IntegrityError as exc:
+            if not _rejected_by_database(exc):
+                raise
+            return None, "Time slot conflicts with an existing meeting of a participant."
+        session.refresh(meeting)
+
+        _index_meeting(meeting, revision)
+    read_cache.invalidate()
+    return meeting, None
+
+
+def _bulk_record_values(record, source):
+    """
+    Column values for one bulk record, or (None, error) if it is unusable.
+    """
+    title = record.get("title")
+    start = _naive(record.get("start_time"))
+    end = _naive(record.get("end_time"))
+    recurrence_type = record.get("recurrence_type") or "none"
+
+    if not title:
+        return None, "Missing title."
+    if start is None or end is None:
+        return None, "Missing start_time or end_time."
+    if end <= start:
+        return None, "end_time must be after start_time."
+    if recurrence_type not in RECURRENCE_TYPES:
+        return None, f"Unknown recurrence type {recurrence_type!r}."
+
+    return {
+        "title": title,
+        "participants": record.get("participants") or "",
+        "start_time": start,
+        "end_time": end,
+        "source": record.get("source") or source,
+        "recurrence_type": recurrence_type,
+        "recurrence_until": _naive(record.get("recurrence_until")),
+    }, None
+
+
+def _chunks(items, size):
+    for pos in range(0, len(items), size):
+        yield items[pos:pos + size]
+
+
+def _check_bulk_candidates(candidates, report, archive=None):
+    """
+    The conflict sweep of bulk_create_meetings: fills in `report` for
+    rejected candidates and returns the accepted ones as
+    (position, values, people). `archive` (from _load_archive_indexes) is
+    needed when candidates start before the archive horizon.
+    """
+    batch = {}  # person -> CalendarIndex of accepted records
+    sweep = {}  # person -> (latest end, position) of accepted one-offs
+    accepted = []
+
+    with _index_lock:
+        for start, end, position, values, people in candidates:
+            recurrence_type = values["recurrence_type"]
+            recurrence_until = values["recurrence_until"]
+            windows = list(_proposal_windows(start, end, recurrence_type, recurrence_until))
+
+            conflict_ids = _collect_conflicts(windows, _scoped_indexes(people))
+            if archive is not None and start < _archive_horizon:
+                conflict_ids += _collect_conflicts(
+                    _windows_before(windows, _archive_horizon), _scoped_archive(archive, people)
+                )
+            batch_indexes = [batch[person] for person in people if person in batch]
+            if _is_recurring(recurrence_type):
+                clashing = _collect_conflicts(windows, batch_indexes)
+            else:
+                # Every accepted one-off starts at or before this one, so it
+                # overlaps one of a person's iff it starts before their
+                # latest end.
+                clashing = _collect_conflicts(windows, [index.series for index in batch_indexes])
+                for person in people:
+                    latest = sweep.get(person)
+                    if latest is not None and start < latest[0] and latest[1] not in clashing:
+                        clashing.append(latest[1])
+
+            entry = report[position]
+            if conflict_ids or clashing:
+                entry["status"] = "conflict"
+                entry["conflicting_meetings"] = conflict_ids
+                entry["conflicting_records"] = sorted(clashing)
+                entry["error"] = (
+                    "Time slot conflicts with an existing meeting."
+                    if conflict_ids
+                    else "Time slot conflicts with another record in the batch."
+                )
+                continue
+
+            accepted.append((position, values, people))
+            for person in people:
+                if person not in batch:
+                    batch[person] = CalendarIndex()
+                batch[person].add(position, start, end, recurrence_type, recurrence_until)
+                if not _is_recurring(recurrence_type) and (
+                    person not in sweep or end > sweep[person][0]
+                ):
+                    sweep[person] = (end, position)
+    return accepted
+
+
+def bulk_create_meetings(records, on_conflict="skip", source="import", on_insert=None):
     """
-    session = get_session()
-    conflict, _ = is_conflict(start_time, end_time, session=session)
+    Create many meetings at once, checking each against its participants'
+    calendars and against the other records that share a participant.
+
+    `records` are dicts with the create_meeting keyword arguments. They are
+    sorted by start time and swept once: one-off records are checked
+    against each other by tracking, per person, the latest end seen so far,
+    recurring ones against per-person batch indexes; everything is also
+    checked against the in-memory indexes of existing meetings. Survivors
+    are inserted with batched executemany calls in a single transaction.
+
+    on_conflict:
+    - "skip": create every record that does not conflict;
+    - "fail": create nothing if any record conflicts or is invalid;
+    - "report": create nothing, just report what would happen.
 
-    if conflict:
-        session.close()
-        return None, "Time slot conflicts with an existing meeting."
+    on_insert, if given, is called as on_insert(session, created) with the
+    (record index, meeting id) pairs just inserted, before the commit, so
+    the caller can write rows that must land in the same transaction.
 
-    meeting = Meeting(
-        title=title,
+    Returns one dict per record, in input order, with keys index, status
+    ("created", "ok", "conflict", "invalid" or "aborted"), meeting_id,
+    error, and for conflicts the ids in conflicting_meetings and the record
+    indexes in conflicting_records.
+    """
+    if on_conflict not in BULK_CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of {BULK_CONFLICT_POLICIES}")
+
+    report = []
+    candidates = []
+    for position, record in enumerate(records):
+        values, error = _bulk_record_values(record, source)
+        report.append({
+            "index": position,
+            "status": "invalid" if error else None,
+            "meeting_id": None,
+            "error": error,
+            "conflicting_meetings": [],
+            "conflicting_records": [],
+        })
+        if values is not None:
+            candidates.append((
+                values["start_time"], values["end_time"], position, values,
+                _scope(values["participants"]),
+            ))
+    candidates.sort(key=lambda candidate: candidate[:3])
+
+    global _index_revision
+    with _booking() as session:
+        archive = None
+        if candidates and _archive_horizon is not None and candidates[0][0] < _archive_horizon:
+            archive = _load_archive_indexes(candidates[0][0], session)
+        accepted = _check_bulk_candidates(candidates, report, archive)
+
+        rejected = any(entry["status"] for entry in report)
+        if on_conflict == "report" or (on_conflict == "fail" and rejected):
+            status = "ok" if on_conflict == "report" else "aborted"
+            for position, _, _ in accepted:
+                report[position]["status"] = status
+            return report
+
+        if not accepted:
+            return report
+
+        rows = [values for _, values, _ in accepted]
+        meeting_ids = []
+        for chunk in _chunks(rows, BULK_INSERT_CHUNK):
+            meeting_ids.extend(session.scalars(
+                insert(Meeting).returning(Meeting.id, sort_by_parameter_order=True),
+                chunk,
+            ))
+        links = []
+        for meeting_id, (_, values, people) in zip(meeting_ids, accepted):
+            one_off = not _is_recurring(values["recurrence_type"])
+            links.extend(
+                {
+                    "meeting_id": meeting_id,
+                    "person": person,
+                    "start_time": values["start_time"] if one_off else None,
+                    "end_time": values["end_time"] if one_off else None,
+                }
+                for person in people
+                if person != UNASSIGNED
+            )
+        try:
+            for chunk in _chunks(links, BULK_INSERT_CHUNK):
+                session.execute(insert(MeetingParticipant), chunk)
+            if on_insert is not None:
+                on_insert(session, [
+                    (position, meeting_id)
+                    for meeting_id, (position, _, _) in zip(meeting_ids, accepted)
+                ])
+            revision = _commit(session)
+        except IntegrityError as exc:
+            _rejected_by_database(exc)
+            raise
+
+        with _index_lock:
+            _index_revision = revision
+            for meeting_id, (_, values, people) in zip(meeting_ids, accepted):
+                _add_to_indexes(
+                    meeting_id, values["start_time"], values["end_time"],
+                    values["recurrence_type"], values["recurrence_until"], people,
+                )
+    read_cache.invalidate()
+
+    for meeting_id, (position, _, _) in zip(meeting_ids, accepted):
+        report[position]["status"] = "created"
+        report[position]["meeting_id"] = meeting_id
+    return report
+
+
+def _busy_interval_lists(people, window_start, window_end):
+    """
+    Sorted busy (start, end) lists inside the window, recurring meetings
+    expanded: one list per person, or one for the whole calendar when
+    `people` is None.
+    """
+    get_calendar_index()
+    with _index_lock:
+        return [
+            index.intervals(window_start, window_end)
+            for index in _scoped_indexes(people)
+        ]
+
+
+def _merge_busy(interval_lists):
+    """
+    k-way merge of sorted interval lists into disjoint busy blocks.
+    """
+    merged = []
+    for start, end in heapq.merge(*interval_lists):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _align_up(dt, granularity):
+    midnight = datetime.combine(dt.date(), time())
+    steps = -(-(dt - midnight) // granularity)
+    return midnight + steps * granularity
+
+
+def _working_windows(window_start, window_end, working_hours, working_days):
+    """
+    Yield the [start, end) working periods inside the window, in order.
+    Periods that touch (e.g. whole days) are yielded as one.
+    """
+    pending = None
+    day = window_start.date()
+    while datetime.combine(day, time()) < window_end:
+        if working_days is None or day.weekday() in working_days:
+            if working_hours is None:
+                opens = datetime.combine(day, time())
+                closes = opens + timedelta(days=1)
+            else:
+                opens = datetime.combine(day, working_hours[0])
+                closes = datetime.combine(day, working_hours[1])
+            opens, closes = max(opens, window_start), min(closes, window_end)
+            if opens < closes:
+                if pending and pending[1] == opens:
+                    pending = (pending[0], closes)
+                else:
+                    if pending:
+                        yield pending
+                    pending = (opens, closes)
+        day += timedelta(days=1)
+    if pending:
+        yield pending
+
+
+def _free_slots_sweep(busy, window_start, window_end, duration, working_hours,
+                      working_days, granularity, n):
+    slots = []
+    pos = 0
+    for opens, closes in _working_windows(window_start, window_end, working_hours, working_days):
+        # Skip busy blocks that ended before this working period.
+        while pos < len(busy) and busy[pos][1] <= opens:
+            pos += 1
+        cursor = opens
+        scan = pos
+        while cursor < closes:
+            gap_end = closes
+            if scan < len(busy) and busy[scan][0] < closes:
+                gap_end = max(cursor, busy[scan][0])
+            slot_start = _align_up(cursor, granularity)
+            if slot_start + duration <= gap_end:
+                slots.append((slot_start, slot_start + duration))
+                if len(slots) == n:
+                    return slots
+            if gap_end == closes:
+                break
+            cursor = max(cursor, busy[scan][1])
+            scan += 1
+    return slots
+
+
+def _free_slots_bitmap(busy, window_start, window_end, duration, working_hours,
+                       working_days, granularity, n):
+    """
+    Minute-granularity search: busy and working-hours masks as NumPy arrays,
+    free runs found with a vectorised diff.
+    """
+    import numpy as np
+
+    minute = timedelta(minutes=1)
+    t0 = window_start.replace(second=0, microsecond=0)
+    length = -(-(window_end - t0) // minute)
+
+    diff = np.zeros(length + 1, dtype=np.int32)
+    if busy:
+        starts = np.array([(start - t0) // minute for start, _ in busy], dtype=np.int64)
+        ends = np.array([-(-(end - t0) // minute) for _, end in busy], dtype=np.int64)
+        np.add.at(diff, np.clip(starts, 0, length), 1)
+        np.add.at(diff, np.clip(ends, 0, length), -1)
+    is_busy = np.cumsum(diff[:length]) > 0
+
+    day_offset = (t0 - datetime.combine(t0.date(), time())) // minute
+    since_midnight = np.arange(length, dtype=np.int64) + day_offset
+    free = ~is_busy
+    if working_hours is not None:
+        minute_of_day = since_midnight % 1440
+        opens = working_hours[0].hour * 60 + working_hours[0].minute
+        closes = working_hours[1].hour * 60 + working_hours[1].minute
+        free &= (minute_of_day >= opens) & (minute_of_day < closes)
+    if working_days is not None:
+        weekday = (t0.weekday() + since_midnight // 1440) % 7
+        free &= np.isin(weekday, list(working_days))
+    if t0 < window_start:
+        free[0] = False
+
+    edges = np.diff(np.concatenate(([0], free.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    step = granularity // minute
+    need = -(-duration // minute)
+    aligned = -(-(run_starts + day_offset) // step) * step - day_offset
+    fits = np.flatnonzero(aligned + need <= run_ends)[:n]
+    return [
+        (t0 + int(aligned[i]) * minute, t0 + int(aligned[i]) * minute + duration)
+        for i in fits
+    ]
+
+
+@timed("scheduler.find_free_slots")
+@_current
+def find_free_slots(
+    participants,
+    duration,
+    window,
+    working_hours=WORKING_HOURS,
+    n=5,
+    working_days=WORKING_DAYS,
+    granularity=SLOT_GRANULARITY,
+    mode="sweep",
+):
+    """
+    Find the earliest `n` free slots of `duration` that suit everyone.
+
+    participants: names (list or free text) whose calendars must all be
+    free, or None for the whole calendar; an empty list or string means
+    the calendar of meetings without participants. Each person's busy intervals,
+    recurring meetings expanded over the window, are merged with a k-way
+    sweep. Only working hours on working days count (pass None to lift
+    either limit), and slot starts are rounded up to `granularity`.
+    At most one slot is returned per gap.
+
+    mode="bitmap" does the gap search on NumPy minute masks instead, which
+    is faster for long windows with many busy intervals.
+
+    Returns a list of (start, end) naive wall-clock datetimes. Raises
+    ValueError for a duration that is not positive, n < 1, or a window
+    longer than MAX_FREE_SLOT_WINDOW.
+    """
+    if mode not in FREE_SLOT_MODES:
+        raise ValueError(f"mode must be one of {FREE_SLOT_MODES}")
+    if not isinstance(duration, timedelta):
+        duration = timedelta(minutes=duration)
+    if duration <= timedelta(0):
+        raise ValueError("duration must be positive")
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    window_start, window_end = _naive(window[0]), _naive(window[1])
+    if window_end - window_start > MAX_FREE_SLOT_WINDOW:
+        raise ValueError(f"window must not be longer than {MAX_FREE_SLOT_WINDOW.days} days")
+
+    people = None if participants is None else _scope(participants)
+    busy = _merge_busy(_busy_interval_lists(people, window_start, window_end))
+    search = _free_slots_bitmap if mode == "bitmap" else _free_slots_sweep
+    return search(
+        busy, window_start, window_end, duration,
+        working_hours, working_days, granularity, n,
+    )
+
+
+@_current
+def suggest_slots(
+    start_time,
+    end_time,
+    participants=None,
+    recurrence_type="none",
+    recurrence_until=None,
+    n=3,
+    search_days=14,
+):
+    """
+    Free alternatives to a proposed meeting that create_meeting would
+    accept: same duration, searched from the proposed start onwards. For a
+    recurring proposal every candidate is re-checked occurrence by
+    occurrence.
+    """
+    start, end = _naive(start_time), _naive(end_time)
+    if end <= start:
+        return []
+    candidates = find_free_slots(
+        participants,
+        end - start,
+        (start, start + timedelta(days=search_days)),
+        n=n * 4 if _is_recurring(recurrence_type) else n,
+    )
+    slots = []
+    for slot_start, slot_end in candidates:
+        if _is_recurring(recurrence_type) and _find_conflict_ids(
+            slot_start, slot_end, recurrence_type, recurrence_until,
+            participants=participants,
+        ):
+            continue
+        slots.append((slot_start, slot_end))
+        if len(slots) == n:
+            break
+    return slots
+
+
+@timed("scheduler.check_proposal")
+@_current
+def check_proposal(
+    start_time,
+    end_time,
+    participants=None,
+    recurrence_type="none",
+    recurrence_until=None,
+):
+    """
+    (conflicts, suggested_slots) for a proposed meeting, before it is
+    booked: the MeetingRows it would clash with, ordered by start time,
+    and free alternatives when there are any clashes. create_meeting
+    still checks again when the meeting is confirmed.
+    """
+    conflict_ids = _find_conflict_ids(
+        start_time,
+        end_time,
+        recurrence_type=recurrence_type,
+        recurrence_until=recurrence_until,
+        participants=participants or "",
+    )
+    if not conflict_ids:
+        return [], []
+    rows = get_meetings_by_id(conflict_ids)
+    conflicts = sorted(rows.values(), key=lambda row: (row.start_time, row.id))
+    suggestions = suggest_slots(
+        start_time,
+        end_time,
         participants=participants,
-        start_time=start_time,
-        end_time=end_time,
-        source=source,
-        recurrence_type=recurrence_type or "none",
+        recurrence_type=recurrence_type,
         recurrence_until=recurrence_until,
     )
-    session.add(meeting)
-    session.commit()
-    session.refresh(meeting)
-    session.close()
-    return meeting, None
+    return conflicts, suggestions
+
+
+def check_proposal_async(*args, **kwargs):
+    """
+    Run check_proposal on a background thread and return its Future, so
+    the caller can render the proposal meanwhile.
+    """
+    global _proposal_pool
+    with _proposal_pool_lock:
+        if _proposal_pool is None:
+            _proposal_pool = ThreadPoolExecutor(
+                max_workers=PROPOSAL_CHECK_WORKERS, thread_name_prefix="proposal-check"
+            )
+    return _proposal_pool.submit(check_proposal, *args, **kwargs)
 
 
+@timed("scheduler.get_all_meetings")
+@_current
 def get_all_meetings():
     """
-    Return all meetings ordered by start time.
+    Return all meetings ordered by start time, as MeetingRow tuples.
+    Served from the read cache until the next write.
+    """
+    return list(read_cache.get(("all",), _load_all_meetings))
+
+
+def _load_all_meetings():
+    query = select(*MEETING_ROW_COLUMNS).order_by(Meeting.start_time.asc())
+    with session_scope() as session:
+        return tuple(MeetingRow(*row) for row in session.execute(query))
+
+
+@timed("scheduler.get_meetings_in_range")
+@_current
+def get_meetings_in_range(start=None, end=None, limit=None, cursor=None):
+    """
+    Return meetings overlapping [start, end), ordered by (start_time, id),
+    as lightweight MeetingRow tuples. Either bound may be None (unbounded).
+
+    Pages are keyset-paginated: pass the returned cursor back to get the
+    next page. Returns (rows, next_cursor); next_cursor is None on the last
+    page or when no limit is given.
+
+    Served from the read cache until the next write.
+    """
+    start, end = _naive(start), _naive(end)
+    rows, next_cursor = read_cache.get(
+        ("range", start, end, limit, cursor),
+        lambda: _load_meetings_in_range(start, end, limit, cursor),
+    )
+    return list(rows), next_cursor
+
+
+@timed("scheduler.get_meeting_history")
+@_current
+def get_meeting_history(start=None, end=None, limit=None, cursor=None):
+    """
+    get_meetings_in_range over the whole history: the meetings table and
+    meetings_archive read as one. Ranges after the archive horizon never
+    touch the archive.
+    """
+    get_calendar_index()
+    start, end = _naive(start), _naive(end)
+    horizon = _archive_horizon
+    if horizon is None or (start is not None and start >= horizon):
+        return get_meetings_in_range(start, end, limit, cursor)
+    rows, next_cursor = read_cache.get(
+        ("history", start, end, limit, cursor),
+        lambda: _load_history(start, end, limit, cursor),
+    )
+    return list(rows), next_cursor
+
+
+def _load_history(start, end, limit, cursor):
+    longest = _longest_meeting_minutes() if start is not None else None
+    # Each side is ordered and limited on its own index, then merged.
+    parts = [
+        _range_select(Meeting, MEETING_ROW_COLUMNS, start, end, limit, cursor, longest).subquery(),
+        _range_select(
+            MeetingArchive, ARCHIVE_ROW_COLUMNS, start, end, limit, cursor, _archive_longest
+        ).subquery(),
+    ]
+    both = union_all(*(select(*part.c) for part in parts)).subquery()
+    query = select(*both.c).order_by(both.c.start_time.asc(), both.c.id.asc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return _load_page(query, limit)
+
+
+def _longest_meeting_minutes():
+    """
+    Length in minutes of the longest meeting (first occurrence), or None
+    when there are none. Cached until the next write.
+    """
+    def load():
+        with session_scope() as session:
+            return session.execute(
+                select(func.max(Meeting.end_minute - Meeting.start_minute))
+            ).scalar()
+    return read_cache.get(("longest",), load)
+
+
+def _range_select(model, columns, start, end, limit, cursor, longest):
+    """
+    SELECT of `columns` from `model` (Meeting or MeetingArchive): rows
+    overlapping [start, end) after `cursor`, in (start_time, id) order.
+    `longest` is the longest meeting in that table, in minutes.
+    """
+    query = select(*columns)
+    if end is not None:
+        query = query.where(model.start_minute < to_utc_minutes(end, round_up=True))
+    if start is not None:
+        start_minute = to_utc_minutes(start)
+        query = query.where(model.end_minute > start_minute)
+        if longest is not None:
+            # Nothing starting earlier than that can still be running, so
+            # the index range is bounded on both sides instead of scanning
+            # every meeting that starts before `end`.
+            query = query.where(model.start_minute >= start_minute - longest)
+    if cursor is not None:
+        cursor_start, cursor_id = cursor
+        # A row-value comparison, which SQLite and Postgres turn into an
+        # index range; the equivalent OR form scans the whole index.
+        query = query.where(tuple_(model.start_time, model.id) > tuple_(cursor_start, cursor_id))
+    query = query.order_by(model.start_time.asc(), model.id.asc())
+    if limit is not None:
+        # One extra row tells us whether there is a next page.
+        query = query.limit(limit + 1)
+    return query
+
+
+def _load_meetings_in_range(start, end, limit, cursor):
+    longest = _longest_meeting_minutes() if start is not None else None
+    return _load_page(_range_select(Meeting, MEETING_ROW_COLUMNS, start, end, limit, cursor, longest), limit)
+
+
+def _load_page(query, limit):
     """
-    session = get_session()
-    meetings = session.query(Meeting).order_by(Meeting.start_time.asc()).all()
-    session.close()
-    return meetings
+    (rows, next_cursor) of a _range_select query.
+    """
+    with session_scope() as session:
+        rows = tuple(MeetingRow(*row) for row in session.execute(query))
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1].start_time, rows[-1].id)
+    return rows, next_cursor
+
+
+@timed("scheduler.get_agenda")
+@_current
+def get_agenda(first_day, last_day):
+    """
+    Meetings by the day they start on, recurring occurrences included:
+    {date: [(start, end, MeetingRow), ...]} for every date from first_day
+    to last_day inclusive, each list ordered by start.
+
+    Days come from the in-memory DayBuckets; only the rows of the meetings
+    shown are read from the DB (through the read cache).
+    """
+    get_calendar_index()
+    with _index_lock:
+        days = _days.days(first_day, last_day)
+    horizon = _archive_horizon
+    if horizon is not None and first_day < horizon.date():
+        archived = read_cache.get(
+            ("archive_days", first_day, last_day), lambda: _load_archive_days(first_day, last_day)
+        )
+        days = {
+            day: sorted(entries + archived[day]) if archived[day] else entries
+            for day, entries in days.items()
+        }
+    rows = get_meetings_by_id({meeting_id for entries in days.values() for _, _, meeting_id in entries})
+    return {
+        day: [(start, end, rows[meeting_id]) for start, end, meeting_id in entries if meeting_id in rows]
+        for day, entries in days.items()
+    }
+
+
+def _load_archive_days(first_day, last_day):
+    """
+    DayBuckets.days() of the archived meetings, for days before the
+    archive horizon.
+    """
+    rows = _archived_rows(
+        datetime.combine(first_day, time()), datetime.combine(last_day + timedelta(days=1), time())
+    )
+    return DayBuckets.build(row[:5] for row in rows).days(first_day, last_day)
 
 
-def edit_meeting(meeting_id, title=None, participants=None, start_time=None, end_time=None):
+@_current
+def get_meetings_by_id(ids):
     """
-    Edit an existing meeting. Only non-None fields are updated.
-    Checks for time conflicts when changing time.
+    {id: MeetingRow} for the given meeting ids (unknown ids are left out),
+    archived meetings included. Served from the read cache until the next
+    write.
     """
-    session = get_session()
-    meeting = session.get(Meeting, meeting_id)
+    key = tuple(sorted(ids))
+    return read_cache.get(("by_id", key), lambda: _load_meetings_by_id(key)) if key else {}
+
+
+def _load_meetings_by_id(ids):
+    query = select(*MEETING_ROW_COLUMNS).where(Meeting.id.in_(ids))
+    with session_scope() as session:
+        rows = {row.id: MeetingRow(*row) for row in session.execute(query)}
+        missing = [meeting_id for meeting_id in ids if meeting_id not in rows]
+        if missing and _archive_horizon is not None:
+            query = select(*ARCHIVE_ROW_COLUMNS).where(MeetingArchive.id.in_(missing))
+            rows.update((row.id, MeetingRow(*row)) for row in session.execute(query))
+    return rows
+
 
-    if meeting is None:
-        session.close()
-        return False, f"Meeting with id {meeting_id} not found."
+@_current
+def get_meeting_date_bounds():
+    """
+    Return the (earliest, latest) meeting start times, archived meetings
+    included, or (None, None) when there are no meetings.
+    """
+    columns = get_meeting_columns()
+    bounds = []
+    if len(columns):
+        bounds.append((from_utc_minutes(columns.first_start()), from_utc_minutes(columns.last_start())))
+    if _archive_horizon is not None:
+        first, last = read_cache.get(("archive_bounds",), _load_archive_bounds)
+        if first is not None:
+            bounds.append((first, last))
+    if not bounds:
+        return None, None
+    return min(first for first, _ in bounds), max(last for _, last in bounds)
 
-    new_start = start_time if start_time is not None else meeting.start_time
-    new_end = end_time if end_time is not None else meeting.end_time
 
-    conflict, _ = is_conflict(
-        new_start,
-        new_end,
-        session=session,
-        ignore_meeting_id=meeting_id,
+def _load_archive_bounds():
+    # Two subqueries, so each is answered from the start_time index.
+    query = select(
+        select(func.min(MeetingArchive.start_time)).scalar_subquery(),
+        select(func.max(MeetingArchive.start_time)).scalar_subquery(),
     )
+    with session_scope() as session:
+        return tuple(session.execute(query).one())
 
-    if conflict:
-        session.close()
-        return False, "Updated time slot conflicts with another meeting."
 
-    if title is not None:
-        meeting.title = title
-    if participants is not None:
-        meeting.participants = participants
+@_current
+def get_history_columns(window_start, window_end):
+    """
+    get_meeting_columns(), plus the archived meetings that may occur in
+    [window_start, window_end) (naive wall clock) when the window reaches
+    back past the archive horizon. Cached per window until the next write.
+    """
+    columns = get_meeting_columns()
+    horizon = _archive_horizon
+    if horizon is None or window_start >= horizon:
+        return columns
 
-    meeting.start_time = new_start
-    meeting.end_time = new_end
+    def load():
+        store = MeetingStore(columns)
+        for row in _archived_rows(window_start, window_end):
+            store.add(
+                row.id, row.start_minute, row.end_minute, row.recurrence_type,
+                _cutoff_minute(row.recurrence_until), _scope(row.participants or ""),
+            )
+        return store.snapshot()
+    return read_cache.get(("history_columns", window_start, window_end), load)
 
-    session.commit()
-    session.refresh(meeting)
-    session.close()
+
+@timed("scheduler.get_meeting_page")
+@_current
+def get_meeting_page(page, page_size):
+    """
+    Page `page` (from 0) of all meetings in start order, as MeetingRow
+    tuples, and the number of meetings. The page is a slice of the
+    columnar snapshot; only its rows are read from the DB (through the
+    read cache).
+    """
+    columns = get_meeting_columns()
+    ids = columns.ids[page * page_size:(page + 1) * page_size].tolist()
+    rows = get_meetings_by_id(ids)
+    return [rows[meeting_id] for meeting_id in ids if meeting_id in rows], len(columns)
+
+
+@_current
+def precheck_conflicts(start_time, end_time, participants=None, ignore_meeting_id=None):
+    """
+    Cheap first look at whether a one-off meeting at [start_time, end_time)
+    would conflict, from the columnar snapshot: (ids of the participants'
+    one-off meetings overlapping it, ids of their recurring series that
+    may). Both empty means is_conflict would find nothing; otherwise
+    is_conflict has the exact answer.
+    """
+    people = None if participants is None else _scope(participants)
+    return get_meeting_columns().precheck(
+        to_utc_minutes(_naive(start_time)),
+        to_utc_minutes(_naive(end_time), round_up=True),
+        people=people,
+        ignore_id=ignore_meeting_id,
+    )
+
+
+def edit_meeting(
+    meeting_id,
+    title=None,
+    participants=None,
+    start_time=None,
+    end_time=None,
+    recurrence_type=None,
+    recurrence_until=None,
+):
+    """
+    Edit an existing meeting. Only non-None fields are updated; a new
+    start or end is checked against the other, stored one. A recurrence_type
+    replaces the whole rule, recurrence_until included (None: no end).
+    Checks the participants' calendars for conflicts at the new time.
+    """
+    start_time, end_time = _naive(start_time), _naive(end_time)
+    if recurrence_type is not None and recurrence_type not in RECURRENCE_TYPES:
+        return False, f"Unknown recurrence type {recurrence_type!r}."
+    with _booking() as session:
+        meeting = session.get(Meeting, meeting_id)
+
+        if meeting is None:
+            return False, f"Meeting with id {meeting_id} not found."
+
+        new_start = start_time if start_time is not None else meeting.start_time
+        new_end = end_time if end_time is not None else meeting.end_time
+        new_participants = participants if participants is not None else meeting.participants
+        if recurrence_type is not None:
+            new_type, new_until = recurrence_type, _naive(recurrence_until)
+        else:
+            new_type, new_until = meeting.recurrence_type, meeting.recurrence_until
+        if new_end <= new_start:
+            return False, "end_time must be after start_time."
+
+        conflict, _ = is_conflict(
+            new_start,
+            new_end,
+            session=session,
+            ignore_meeting_id=meeting_id,
+            recurrence_type=new_type,
+            recurrence_until=new_until,
+            participants=new_participants or "",
+        )
+
+        if conflict:
+            return False, "Updated time slot conflicts with another meeting."
+
+        if title is not None:
+            meeting.title = title
+        # Before the participant rows and times: they follow the rule (see
+        # Meeting._link_times).
+        meeting.recurrence_type = new_type
+        meeting.recurrence_until = new_until
+        if participants is not None:
+            meeting.set_participants(participants)
+
+        meeting.set_times(new_start, new_end)
+
+        try:
+            revision = _commit(session)
+        except IntegrityError as exc:
+            if not _rejected_by_database(exc):
+                raise
+            return False, "Updated time slot conflicts with another meeting."
+        session.refresh(meeting)
+
+        _index_meeting(meeting, revision)
+    read_cache.invalidate()
     return True, None
 
 
+def set_meeting_sources(sources):
+    """
+    Set Meeting.source for many meetings at once ({meeting_id: source}), as
+    the calendar sync does when it learns how a push went. Times and
+    participants are untouched, so the indexes stay as they are.
+    """
+    global _index_revision
+    if not sources:
+        return
+    table = Meeting.__table__
+    with _booking() as session:
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(source=bindparam("new_source")),
+            [{"row_id": meeting_id, "new_source": source} for meeting_id, source in sources.items()],
+        )
+        revision = _commit(session)
+        with _index_lock:
+            _index_revision = revision
+    read_cache.invalidate()
+
+
 def delete_meeting(meeting_id):
     """
     Delete an existing meeting by id.
     """
-    session = get_session()
-    meeting = session.get(Meeting, meeting_id)
+    with _booking() as session:
+        meeting = session.get(Meeting, meeting_id)
 
-    if meeting is None:
-        session.close()
-        return False, f"Meeting with id {meeting_id} not found."
+        if meeting is None:
+            return False, f"Meeting with id {meeting_id} not found."
 
-    session.delete(meeting)
-    session.commit()
-    session.close()
+        session.delete(meeting)
+        revision = _commit(session)
+
+        _unindex_meeting(meeting_id, revision)
+    read_cache.invalidate()
     return True, None
+
+
+def _archivable_ids(session, before, batch_size, keep_sources=()):
+    """
+    Up to `batch_size` ids of meetings whose every occurrence ended by
+    `before`: one-offs, and series whose last occurrence (starting before
+    the until cutoff) did.
+    """
+    before_minute = to_utc_minutes(before)
+    kept = []
+    if keep_sources:
+        kept.append(Meeting.source.not_in(keep_sources))
+
+    series = session.execute(
+        select(Meeting.id, Meeting.recurrence_until, Meeting.start_minute, Meeting.end_minute)
+        .where(
+            Meeting.recurrence_type.in_(RECURRING_TYPES),
+            Meeting.start_time < before,
+            Meeting.recurrence_until < before,
+            *kept,
+        )
+        .order_by(Meeting.id)
+    ).all()
+    ids = [
+        meeting_id
+        for meeting_id, until, start_minute, end_minute in series
+        if _cutoff_minute(until) + (end_minute - start_minute) <= before_minute
+    ][:batch_size]
+    if len(ids) < batch_size:
+        ids += session.scalars(
+            select(Meeting.id)
+            .where(
+                Meeting.recurrence_type == "none",
+                Meeting.start_time < before,
+                Meeting.end_minute <= before_minute,
+                *kept,
+            )
+            .limit(batch_size - len(ids))
+        ).all()
+    return ids
+
+
+def archive_meetings(before, batch_size=ARCHIVE_BATCH, keep_sources=()):
+    """
+    Move every meeting that was over by `before` (naive wall clock) from
+    the meetings table to meetings_archive, and raise the archive horizon
+    to `before`. Meetings whose source is in `keep_sources` stay.
+
+    Runs as a series of transactions of at most `batch_size` meetings, so
+    bookings only ever wait for one batch. Conflict checks, the calendar
+    and analytics views and get_meeting_history still see archived
+    meetings; the hot indexes and the meetings table no longer hold them.
+    Returns the number of meetings moved.
+    """
+    global _index_revision, _archive_horizon, _archive_longest
+    before = _naive(before)
+    names = [column.key for column in Meeting.__table__.columns]
+    moved = 0
+    while True:
+        with _booking() as session:
+            horizon, longest = session.execute(
+                select(ArchiveState.archived_before, ArchiveState.longest_minutes)
+            ).one()
+            horizon = before if horizon is None else max(horizon, before)
+            ids = _archivable_ids(session, before, batch_size, keep_sources)
+            if not ids and horizon == _archive_horizon:
+                break
+
+            archived_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            if ids:
+                batch_longest = session.execute(
+                    select(func.max(Meeting.end_minute - Meeting.start_minute)).where(Meeting.id.in_(ids))
+                ).scalar()
+                longest = batch_longest if longest is None else max(longest, batch_longest)
+                session.execute(insert(MeetingArchive).from_select(
+                    names + ["archived_at"],
+                    select(*(Meeting.__table__.c[name] for name in names), literal(archived_at))
+                    .where(Meeting.id.in_(ids)),
+                ))
+                session.execute(delete(MeetingParticipant).where(MeetingParticipant.meeting_id.in_(ids)))
+                session.execute(delete(Meeting).where(Meeting.id.in_(ids)))
+            session.execute(
+                update(ArchiveState).values(
+                    archived_before=horizon,
+                    archived_at=archived_at,
+                    archived_total=ArchiveState.archived_total + len(ids),
+                    longest_minutes=longest,
+                )
+            )
+            revision = _commit(session)
+
+            with _index_lock:
+                _index_revision = revision
+                _archive_horizon, _archive_longest = horizon, longest
+                _remove_many_from_indexes(ids)
+        read_cache.invalidate()
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+    return moved
@@ -0,0 +1,481 @@
+"""
+JSON-over-HTTP scheduling service, alongside the Streamlit UI.
+
+    python -m agent.service [--host 127.0.0.1] [--port 8080] [--workers 8]
+
+Endpoints (times are ISO 8601). Naive input times are wall-clock in the
+zone named by the `tz` query parameter (default: the calendar zone, see
+agent.timezones); aware ones may use any offset. Times in responses are
+calendar-zone wall-clock, as stored.
+
+    GET    /health
+    GET    /metrics        Prometheus text: call, SQL and rerun timings, cache
+                           hit rates
+    POST   /parse          {"text": ...}
+    POST   /propose        {"text": ...}  parse + conflict check + alternatives
+    POST   /meetings       {"title", "participants", "start_time", "end_time",
+                            "recurrence_type", "recurrence_until", "source"}
+    PATCH  /meetings/<id>  {"title", "participants", "start_time", "end_time"}
+    DELETE /meetings/<id>
+    GET    /meetings?start=&end=&limit=&cursor=   archived meetings included;
+                           limit is at most MAX_PAGE_SIZE (the default)
+    GET    /free-slots?participants=&duration=&start=&end=&n=&mode=
+                           duration (minutes) and n must be positive, the
+                           window at most scheduler.MAX_FREE_SLOT_WINDOW
+
+The server is plain asyncio streams (HTTP/1.1 with keep-alive). The
+scheduler and parser are synchronous, so every handler runs in a bounded
+thread pool; the event loop only does I/O.
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from . import cache, instrumentation, scheduler, sync
+from .archive import get_archive_worker
+from .db import init_db
+from .nlp import parse_meeting_request_cached
+from .recurrence import RECURRENCE_TYPES
+from .timezones import UnknownTimeZoneError, get_zone, localize, now, to_wall_clock
+
+# Threads running scheduler calls; writes are serialised by the scheduler
+# anyway, so a handful is enough to overlap reads with them.
+DEFAULT_WORKERS = int(os.getenv("SERVICE_WORKERS", "8"))
+MAX_BODY_BYTES = 1 << 20
+MAX_HEADER_LINES = 100
+# Most meetings one GET /meetings page returns; also the default page size.
+MAX_PAGE_SIZE = int(os.getenv("SERVICE_MAX_PAGE_SIZE", "1000"))
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# --- JSON <-> scheduler values ----------------------------------------------
+
+
+def _zone(query):
+    """
+    The request's `tz` zone name, or None for the calendar zone.
+    """
+    name = query.get("tz") or None
+    if name is not None:
+        try:
+            get_zone(name)
+        except UnknownTimeZoneError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"unknown time zone {name!r}")
+    return name
+
+
+def _parse_time(value, field, zone=None):
+    """
+    Calendar-zone wall-clock datetime for an ISO 8601 value; naive values
+    are read in `zone`.
+    """
+    if value in (None, ""):
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{field} must be an ISO 8601 datetime")
+    if dt.tzinfo is None and zone is not None:
+        dt = localize(dt, zone)
+    return to_wall_clock(dt)
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _meeting_json(row):
+    return {key: _isoformat(value) for key, value in row._asdict().items()}
+
+
+def _orm_meeting_json(meeting):
+    return {
+        column.key: _isoformat(getattr(meeting, column.key))
+        for column in scheduler.MEETING_ROW_COLUMNS
+    }
+
+
+def _parsed_json(parsed):
+    return {key: _isoformat(value) for key, value in parsed.items()}
+
+
+def _slots_json(slots):
+    return [{"start_time": start.isoformat(), "end_time": end.isoformat()} for start, end in slots]
+
+
+def _encode_cursor(cursor):
+    return None if cursor is None else f"{cursor[0].isoformat()},{cursor[1]}"
+
+
+def _decode_cursor(value):
+    if not value:
+        return None
+    try:
+        start, meeting_id = value.rsplit(",", 1)
+        return datetime.fromisoformat(start), int(meeting_id)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "bad cursor")
+
+
+def _int_arg(query, name, default=None, minimum=None):
+    value = query.get(name, default)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be at least {minimum}")
+    return value
+
+
+def _str_field(body, name):
+    """
+    body[name] if it is a string, None if it is missing or null; anything
+    else (a list, a number, ...) is a 400.
+    """
+    value = body.get(name)
+    if value is not None and not isinstance(value, str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be a string")
+    return value
+
+
+def _require_text(body):
+    text = body.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "text is required")
+    return text
+
+
+# --- Handlers (run in the thread pool) ---------------------------------------
+
+
+def health(body, query):
+    return HTTPStatus.OK, {"status": "ok", "meetings_indexed": len(scheduler.get_calendar_index())}
+
+
+def parse(body, query):
+    return HTTPStatus.OK, _parsed_json(parse_meeting_request_cached(_require_text(body), zone=_zone(query)))
+
+
+def propose(body, query):
+    parsed = parse_meeting_request_cached(_require_text(body), zone=_zone(query))
+    conflicts, suggestions = scheduler.check_proposal(
+        parsed["start_time"],
+        parsed["end_time"],
+        participants=parsed["participants"],
+        recurrence_type=parsed["recurrence_type"],
+        recurrence_until=parsed["recurrence_until"],
+    )
+    return HTTPStatus.OK, {
+        "meeting": _parsed_json(parsed),
+        "conflict": bool(conflicts),
+        "conflicting_meetings": [meeting.id for meeting in conflicts],
+        "suggested_slots": _slots_json(suggestions),
+    }
+
+
+def create(body, query):
+    zone = _zone(query)
+    title = _str_field(body, "title")
+    participants = _str_field(body, "participants") or ""
+    source = _str_field(body, "source") or "api"
+    start = _parse_time(body.get("start_time"), "start_time", zone)
+    end = _parse_time(body.get("end_time"), "end_time", zone)
+    if not title or start is None or end is None:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "title, start_time and end_time are required")
+    if end <= start:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "end_time must be after start_time")
+    recurrence_type = _str_field(body, "recurrence_type") or "none"
+    if recurrence_type not in RECURRENCE_TYPES:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"recurrence_type must be one of {RECURRENCE_TYPES}")
+    recurrence_until = _parse_time(body.get("recurrence_until"), "recurrence_until", zone)
+
+    meeting, error = scheduler.create_meeting(
+        title,
+        participants,
+        start,
+        end,
+        source=source,
+        recurrence_type=recurrence_type,
+        recurrence_until=recurrence_until,
+    )
+    if error:
+        return HTTPStatus.CONFLICT, {
+            "error": error,
+            "suggested_slots": _slots_json(scheduler.suggest_slots(
+                start, end,
+                participants=participants,
+                recurrence_type=recurrence_type,
+                recurrence_until=recurrence_until,
+            )),
+        }
+    sync.notify_saved(meeting.id)
+    return HTTPStatus.CREATED, _orm_meeting_json(meeting)
+
+
+def edit(body, query, meeting_id):
+    zone = _zone(query)
+    ok, error = scheduler.edit_meeting(
+        meeting_id,
+        title=_str_field(body, "title"),
+        participants=_str_field(body, "participants"),
+        start_time=_parse_time(body.get("start_time"), "start_time", zone),
+        end_time=_parse_time(body.get("end_time"), "end_time", zone),
+    )
+    if not ok:
+        if "not found" in error:
+            status = HTTPStatus.NOT_FOUND
+        elif "must be after" in error:
+            status = HTTPStatus.BAD_REQUEST
+        else:
+            status = HTTPStatus.CONFLICT
+        return status, {"error": error}
+    sync.notify_saved(meeting_id)
+    return HTTPStatus.OK, {"id": meeting_id}
+
+
+def delete(body, query, meeting_id):
+    ok, error = scheduler.delete_meeting(meeting_id)
+    if not ok:
+        return HTTPStatus.NOT_FOUND, {"error": error}
+    sync.notify_deleted(meeting_id)
+    return HTTPStatus.OK, {"id": meeting_id}
+
+
+def list_range(body, query):
+    zone = _zone(query)
+    rows, next_cursor = scheduler.get_meeting_history(
+        _parse_time(query.get("start"), "start", zone),
+        _parse_time(query.get("end"), "end", zone),
+        limit=min(_int_arg(query, "limit", MAX_PAGE_SIZE, minimum=1), MAX_PAGE_SIZE),
+        cursor=_decode_cursor(query.get("cursor")),
+    )
+    return HTTPStatus.OK, {
+        "meetings": [_meeting_json(row) for row in rows],
+        "next_cursor": _encode_cursor(next_cursor),
+    }
+
+
+def free_slots(body, query):
+    zone = _zone(query)
+    start = _parse_time(query.get("start"), "start", zone)
+    end = _parse_time(query.get("end"), "end", zone)
+    if start is None:
+        start = now().replace(tzinfo=None, second=0, microsecond=0)
+    if end is None:
+        end = start + timedelta(days=7)
+    mode = query.get("mode", "sweep")
+    if mode not in scheduler.FREE_SLOT_MODES:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"mode must be one of {scheduler.FREE_SLOT_MODES}")
+    participants = query.get("participants")
+    try:
+        slots = scheduler.find_free_slots(
+            participants,
+            _int_arg(query, "duration", 30),
+            (start, end),
+            n=_int_arg(query, "n", 5),
+            mode=mode,
+        )
+    except ValueError as exc:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, str(exc))
+    return HTTPStatus.OK, {"slots": _slots_json(slots)}
+
+
+def metrics(body, query):
+    # A str payload goes out as text/plain (see _response).
+    return HTTPStatus.OK, instrumentation.prometheus_text() + cache.prometheus_text()
+
+
+# (method, first path segment) -> handler; "meetings/<id>" routes pass the id.
+ROUTES = {
+    ("GET", "health"): health,
+    ("GET", "metrics"): metrics,
+    ("POST", "parse"): parse,
+    ("POST", "propose"): propose,
+    ("POST", "meetings"): create,
+    ("GET", "meetings"): list_range,
+    ("GET", "free-slots"): free_slots,
+}
+ITEM_ROUTES = {
+    ("PATCH", "meetings"): edit,
+    ("DELETE", "meetings"): delete,
+}
+
+
+def dispatch(method, target, body):
+    """
+    Route one request; returns (status, JSON-serialisable payload).
+    """
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    parts = [part for part in url.path.split("/") if part]
+
+    if len(parts) == 1 and (method, parts[0]) in ROUTES:
+        return ROUTES[method, parts[0]](body, query)
+    if len(parts) == 2 and (method, parts[0]) in ITEM_ROUTES:
+        try:
+            meeting_id = int(parts[1])
+        except ValueError:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "no such meeting")
+        return ITEM_ROUTES[method, parts[0]](body, query, meeting_id)
+    known = {route[1] for route in ROUTES} | {route[1] for route in ITEM_ROUTES}
+    if parts and parts[0] in known:
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed here")
+    raise HTTPError(HTTPStatus.NOT_FOUND, "no such endpoint")
+
+
+def _handle(method, target, raw_body):
+    try:
+        body = json.loads(raw_body) if raw_body else {}
+        if not isinstance(body, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+        return dispatch(method, target, body)
+    except HTTPError as exc:
+        return exc.status, {"error": exc.message}
+    except json.JSONDecodeError:
+        return HTTPStatus.BAD_REQUEST, {"error": "body is not valid JSON"}
+    except Exception as exc:
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+
+
+# --- HTTP/1.1 over asyncio streams -------------------------------------------
+
+
+async def _read_request(reader):
+    """
+    (method, target, version, headers, body) for the next request, or None
+    at EOF.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "bad request line")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "bad Content-Length")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version, headers, body
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), PROMETHEUS_CONTENT_TYPE
+    else:
+        body, content_type = json.dumps(payload).encode(), "application/json"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+class SchedulingService:
+    """
+    The HTTP server. Handlers run in a thread pool of `workers` threads.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=DEFAULT_WORKERS):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def _serve_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as exc:
+                    writer.write(_response(exc.status, {"error": exc.message}, False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+                status, payload = await loop.run_in_executor(
+                    self.executor, _handle, method, target, body
+                )
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, workers):
+    init_db()
+    scheduler.rebuild_interval_index()
+    get_archive_worker()
+    service = await SchedulingService(host, port, workers).start()
+    print(f"Scheduling service on http://{service.host}:{service.port}", flush=True)
+    await service.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,641 @@
+"""
+Two-way sync of the meetings table with a remote calendar provider.
+
+SyncEngine does the work: push() sends local creates, edits and deletes in
+provider batches, pull() applies remote changes page by page from a stored
+sync token. SyncWorker runs an engine on a background thread, so the UI and
+the HTTP service only ever enqueue meeting ids and return.
+"""
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, insert, select, update
+
+from . import timezones
+from .calendar_integration import FakeCalendarProvider, ProviderError, SyncTokenExpired
+from .db import session_scope, CalendarSyncState, Meeting, SyncedEvent, UnappliedEvent
+from .scheduler import (
+    MEETING_ROW_COLUMNS,
+    MeetingRow,
+    bulk_create_meetings,
+    delete_meeting,
+    edit_meeting,
+    set_meeting_sources,
+)
+
+# Meeting.source while a meeting waits for its first push, and after the
+# push has failed for good. Pushed and pulled meetings carry the provider's
+# name (e.g. "google_calendar").
+SYNC_PENDING_SOURCE = "sync_pending"
+SYNC_FAILED_SOURCE = "sync_failed"
+
+SYNC_CALENDAR_ID = os.getenv("SYNC_CALENDAR_ID", "primary")
+# Seconds between incremental pulls.
+PULL_INTERVAL = float(os.getenv("SYNC_PULL_INTERVAL", "60"))
+PULL_PAGE_SIZE = 500
+# Pages pulled per worker round, so a long resync never holds up pushes.
+PULL_PAGES_PER_ROUND = 4
+# Queued changes taken per worker round (sent max_batch at a time).
+PUSH_CHANGES_PER_ROUND = 200
+
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5  # seconds
+RETRY_MAX_DELAY = 30.0
+
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """
+    Seconds to wait before retry number `attempt` (0-based): exponential
+    backoff with full jitter, so clients that failed together do not retry
+    together.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _event_id(row):
+    # Client-chosen id (base32hex characters, as Google requires), so a
+    # create that is retried after a lost response cannot duplicate.
+    created = row.created_at.strftime("%Y%m%d%H%M%S%f") if row.created_at else "0"
+    return f"mtg{row.id}c{created}"
+
+
+def _event_fields(row):
+    return {
+        "title": row.title,
+        "participants": row.participants or "",
+        "start_time": timezones.localize(row.start_time),
+        "end_time": timezones.localize(row.end_time),
+        "recurrence_type": row.recurrence_type or "none",
+        "recurrence_until": timezones.localize(row.recurrence_until),
+    }
+
+
+def _meeting_record(event):
+    return {
+        "title": event.get("title") or "(no title)",
+        "participants": event.get("participants") or "",
+        "start_time": event.get("start_time"),
+        "end_time": event.get("end_time"),
+        "recurrence_type": event.get("recurrence_type") or "none",
+        "recurrence_until": event.get("recurrence_until"),
+    }
+
+
+# Datetime fields of a meeting record, ISO strings in UnappliedEvent.record
+_RECORD_TIMES = ("start_time", "end_time", "recurrence_until")
+
+
+def _dump_record(record):
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in record.items()
+    })
+
+
+def _load_record(text):
+    record = json.loads(text)
+    for key in _RECORD_TIMES:
+        if record.get(key):
+            record[key] = datetime.fromisoformat(record[key])
+    return record
+
+
+class SyncEngine:
+    """
+    Keeps the meetings table and one calendar of `provider` in step.
+
+    Local changes are pushed as ("save", meeting_id) and ("delete",
+    meeting_id) entries. Remote changes are pulled incrementally from the
+    calendar's sync token, or as a full listing when there is none (first
+    run, resync(), or an expired token). The listing position is saved
+    after every page, so an interrupted full resync picks up at its last
+    page. Provider calls are retried with jittered exponential backoff.
+    Remote events that conflict with local meetings are kept as
+    UnappliedEvent rows and retried whenever a pull catches up.
+    """
+
+    def __init__(self, provider, calendar_id=SYNC_CALENDAR_ID, page_size=PULL_PAGE_SIZE,
+                 sleep=time.sleep):
+        self.provider = provider
+        self.calendar_id = calendar_id
+        self.page_size = page_size
+        self._sleep = sleep
+        self._attempts = {}  # change -> failed push attempts so far
+        self.stats = {
+            "pushed": 0, "push_failed": 0, "pulled_created": 0, "pulled_updated": 0,
+            "pulled_deleted": 0, "pull_conflicts": 0, "retries": 0, "full_resyncs": 0,
+        }
+
+    def _call(self, method, *args):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return method(*args)
+            except ProviderError as exc:
+                if not exc.retryable or attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                self.stats["retries"] += 1
+                self._sleep(backoff_delay(attempt))
+
+    # --- push ---
+
+    def _plan(self, changes):
+        """
+        Provider operations for `changes`, as (change, operation) pairs,
+        deletes first. A save becomes an update if the meeting is linked to
+        an event, a create if it is waiting for its first push, and nothing
+        otherwise (a local-only meeting).
+        """
+        ids = {meeting_id for _, meeting_id in changes}
+        with session_scope() as session:
+            rows = {
+                row.id: MeetingRow(*row)
+                for row in session.execute(select(*MEETING_ROW_COLUMNS).where(Meeting.id.in_(ids)))
+            }
+            links = dict(session.execute(
+                select(SyncedEvent.meeting_id, SyncedEvent.event_id).where(
+                    SyncedEvent.calendar_id == self.calendar_id,
+                    SyncedEvent.meeting_id.in_(ids),
+                )
+            ).all())
+
+        # A deleted meeting's id may already belong to a new one (SQLite
+        # reused the highest rowid before migration 9); its link is the old
+        # meeting's.
+        deleted = {meeting_id for kind, meeting_id in changes if kind == "delete"}
+        deletes, saves, seen = [], [], set()
+        for change in changes:
+            if change in seen:
+                continue
+            seen.add(change)
+            kind, meeting_id = change
+            event_id = links.get(meeting_id)
+            if kind == "delete":
+                if event_id is not None:
+                    deletes.append((change, {"op": "delete", "event_id": event_id}))
+                continue
+            row = rows.get(meeting_id)
+            if row is None:
+                continue
+            if event_id is not None and meeting_id not in deleted:
+                saves.append((change, {"op": "update", "event_id": event_id, "event": _event_fields(row)}))
+            elif row.source == SYNC_PENDING_SOURCE:
+                saves.append((change, {"op": "create", "event_id": _event_id(row), "event": _event_fields(row)}))
+        return deletes + saves
+
+    def push(self, changes):
+        """
+        Push local changes, max_batch operations per provider request.
+        Returns the changes that hit a retryable error and should be pushed
+        again later; those that fail RETRY_ATTEMPTS times are given up on
+        (a create leaves the meeting's source at SYNC_FAILED_SOURCE).
+        """
+        planned = self._plan(changes)
+        retry = []
+        for pos in range(0, len(planned), self.provider.max_batch):
+            batch = planned[pos:pos + self.provider.max_batch]
+            results = self._call(self.provider.batch, self.calendar_id, [op for _, op in batch])
+            retry.extend(self._record_push(batch, results))
+        return retry
+
+    def _record_push(self, batch, results):
+        new_links, updated, errors, unlinked = [], {}, {}, []
+        sources = {}
+        retry = []
+        for (change, operation), result in zip(batch, results):
+            kind, meeting_id = change
+            event_id = operation["event_id"]
+            status = result.get("status")
+            if "error" in result and operation["op"] == "create" and status == 409:
+                # Created by an earlier attempt whose response was lost.
+                result = {"id": event_id, "updated": None}
+            if "error" in result and operation["op"] == "delete" and status == 404:
+                result = {"id": event_id}
+            if "error" not in result:
+                self._attempts.pop(change, None)
+                self.stats["pushed"] += 1
+                if operation["op"] == "create":
+                    new_links.append({
+                        "calendar_id": self.calendar_id, "event_id": event_id,
+                        "meeting_id": meeting_id, "remote_updated": result.get("updated"),
+                    })
+                    sources[meeting_id] = self.provider.name
+                elif operation["op"] == "update":
+                    updated[event_id] = result.get("updated")
+                    sources[meeting_id] = self.provider.name
+                else:
+                    unlinked.append(event_id)
+                continue
+
+            attempts = self._attempts.get(change, 0) + 1
+            if result.get("retryable") and attempts < RETRY_ATTEMPTS:
+                self._attempts[change] = attempts
+                retry.append(change)
+                continue
+            self._attempts.pop(change, None)
+            self.stats["push_failed"] += 1
+            if operation["op"] == "create":
+                sources[meeting_id] = SYNC_FAILED_SOURCE
+            else:
+                errors[event_id] = result["error"]
+
+        with session_scope(write=True) as session:
+            if new_links:
+                session.execute(insert(SyncedEvent), new_links)
+            for event_id, remote_updated in updated.items():
+                self._update_link(session, event_id, remote_updated=remote_updated, error=None)
+            for event_id, error in errors.items():
+                self._update_link(session, event_id, error=error)
+            if unlinked:
+                self._unlink(session, unlinked)
+            session.commit()
+        # Only sources that changed: an edit of a synced meeting needs none.
+        set_meeting_sources(self._changed_sources(sources))
+        return retry
+
+    def _changed_sources(self, sources):
+        if not sources:
+            return {}
+        with session_scope() as session:
+            current = dict(session.execute(
+                select(Meeting.id, Meeting.source).where(Meeting.id.in_(list(sources)))
+            ).all())
+        return {
+            meeting_id: source for meeting_id, source in sources.items()
+            if meeting_id in current and current[meeting_id] != source
+        }
+
+    def _update_link(self, session, event_id, **values):
+        session.execute(
+            update(SyncedEvent)
+            .where(SyncedEvent.calendar_id == self.calendar_id, SyncedEvent.event_id == event_id)
+            .values(**values)
+        )
+
+    def _unlink(self, session, event_ids):
+        session.execute(
+            delete(SyncedEvent).where(
+                SyncedEvent.calendar_id == self.calendar_id,
+                SyncedEvent.event_id.in_(event_ids),
+            )
+        )
+
+    # --- pull ---
+
+    def _load_state(self):
+        with session_scope() as session:
+            state = session.get(CalendarSyncState, self.calendar_id)
+            if state is None:
+                return None, None
+            return state.sync_token, state.page_token
+
+    def _save_state(self, sync_token, page_token, finished=False):
+        with session_scope(write=True) as session:
+            state = session.get(CalendarSyncState, self.calendar_id)
+            if state is None:
+                state = CalendarSyncState(calendar_id=self.calendar_id)
+                session.add(state)
+            state.sync_token = sync_token
+            state.page_token = page_token
+            if finished:
+                state.synced_at = _utcnow()
+            session.commit()
+
+    def resync(self):
+        """
+        Forget the sync token, so the next pull lists every remote event.
+        """
+        self._save_state(None, None)
+
+    def pull(self, max_pages=None):
+        """
+        Apply remote changes, at most `max_pages` pages of them (all if
+        None). Returns True once caught up (a fresh sync token is stored),
+        False if the listing has more pages for the next call.
+        """
+        sync_token, page_token = self._load_state()
+        if page_token is None and sync_token is None:
+            self.stats["full_resyncs"] += 1
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            try:
+                page = self._call(
+                    self.provider.list_events, self.calendar_id, sync_token, page_token,
+                    self.page_size,
+                )
+            except SyncTokenExpired:
+                sync_token = page_token = None
+                self._save_state(None, None)
+                self.stats["full_resyncs"] += 1
+                continue
+            self._apply(page["items"])
+            pages += 1
+            if page["next_page_token"]:
+                page_token = page["next_page_token"]
+                self._save_state(sync_token, page_token)
+            else:
+                self._save_state(page["next_sync_token"], None, finished=True)
+                self.retry_unapplied()
+                return True
+        return False
+
+    def retry_unapplied(self):
+        """
+        Try again to create the remote events earlier pulls had to leave
+        out; those that still conflict stay for the next round.
+        """
+        with session_scope() as session:
+            rows = session.execute(
+                select(UnappliedEvent.event_id, UnappliedEvent.remote_updated, UnappliedEvent.record)
+                .where(UnappliedEvent.calendar_id == self.calendar_id)
+                .order_by(UnappliedEvent.event_id)
+            ).all()
+        if rows:
+            self._create([
+                (event_id, remote_updated, _load_record(record))
+                for event_id, remote_updated, record in rows
+            ])
+
+    def unapplied_count(self):
+        with session_scope() as session:
+            return session.execute(
+                select(func.count()).select_from(UnappliedEvent)
+                .where(UnappliedEvent.calendar_id == self.calendar_id)
+            ).scalar()
+
+    def _apply(self, events):
+        """
+        Apply one page of remote events: new ones are created in one bulk
+        insert (links written in the same transaction, so a replayed page
+        finds them), changed ones edited (recurrence included), cancelled
+        ones deleted. New ones that conflict are kept as UnappliedEvent
+        rows.
+        """
+        if not events:
+            return
+        with session_scope() as session:
+            links = {
+                event_id: (meeting_id, remote_updated)
+                for event_id, meeting_id, remote_updated in session.execute(
+                    select(SyncedEvent.event_id, SyncedEvent.meeting_id, SyncedEvent.remote_updated)
+                    .where(
+                        SyncedEvent.calendar_id == self.calendar_id,
+                        SyncedEvent.event_id.in_([event["id"] for event in events]),
+                    )
+                )
+            }
+
+        new, updated, unlinked, withdrawn = [], {}, [], []
+        for event in events:
+            link = links.get(event["id"])
+            if event.get("status") == "cancelled":
+                if link is not None:
+                    delete_meeting(link[0])
+                    unlinked.append(event["id"])
+                    self.stats["pulled_deleted"] += 1
+                else:
+                    withdrawn.append(event["id"])  # nothing to retry any more
+                continue
+            if link is None:
+                new.append((event["id"], event.get("updated"), _meeting_record(event)))
+                continue
+            if link[1] == event.get("updated"):
+                continue  # the echo of our own push
+            record = _meeting_record(event)
+            _, error = edit_meeting(
+                link[0], title=record["title"], participants=record["participants"],
+                start_time=record["start_time"], end_time=record["end_time"],
+                recurrence_type=record["recurrence_type"],
+                recurrence_until=record["recurrence_until"],
+            )
+            updated[event["id"]] = (event.get("updated"), error)
+            self.stats["pulled_updated"] += 1
+
+        if new:
+            self.stats["pull_conflicts"] += len(new) - self._create(new)
+
+        if updated or unlinked or withdrawn:
+            with session_scope(write=True) as session:
+                for event_id, (remote_updated, error) in updated.items():
+                    self._update_link(session, event_id, remote_updated=remote_updated, error=error)
+                if unlinked:
+                    self._unlink(session, unlinked)
+                if withdrawn:
+                    self._forget_unapplied(session, withdrawn)
+                session.commit()
+
+    def _create(self, new):
+        """
+        Create meetings for (event_id, remote_updated, record) triples in
+        one bulk insert. Links are written, and the events dropped from
+        unapplied_events, in the same transaction; the ones that conflict
+        are (re)stored there with the reason. Returns how many were created.
+        """
+        def link_created(session, created):
+            session.execute(insert(SyncedEvent), [
+                {
+                    "calendar_id": self.calendar_id, "event_id": new[position][0],
+                    "meeting_id": meeting_id, "remote_updated": new[position][1],
+                }
+                for position, meeting_id in created
+            ])
+            self._forget_unapplied(session, [new[position][0] for position, _ in created])
+
+        report = bulk_create_meetings(
+            [record for _, _, record in new],
+            on_conflict="skip", source=self.provider.name, on_insert=link_created,
+        )
+        rejected = [
+            {
+                "calendar_id": self.calendar_id, "event_id": new[entry["index"]][0],
+                "remote_updated": new[entry["index"]][1],
+                "record": _dump_record(new[entry["index"]][2]), "error": entry["error"],
+            }
+            for entry in report
+            if entry["status"] != "created"
+        ]
+        if rejected:
+            with session_scope(write=True) as session:
+                self._forget_unapplied(session, [row["event_id"] for row in rejected])
+                session.execute(insert(UnappliedEvent), rejected)
+                session.commit()
+        created = len(report) - len(rejected)
+        self.stats["pulled_created"] += created
+        return created
+
+    def _forget_unapplied(self, session, event_ids):
+        session.execute(
+            delete(UnappliedEvent).where(
+                UnappliedEvent.calendar_id == self.calendar_id,
+                UnappliedEvent.event_id.in_(event_ids),
+            )
+        )
+
+
+class SyncWorker:
+    """
+    Runs a SyncEngine on a daemon thread. Callers only enqueue: save() after
+    creating or editing a meeting, deleted() after deleting one. Each round
+    the worker pushes what is queued (retryable failures come back after a
+    backoff delay) and, when a pull is due, pulls up to
+    PULL_PAGES_PER_ROUND pages, so a large resync is spread over rounds.
+    """
+
+    def __init__(self, engine, pull_interval=PULL_INTERVAL):
+        self.engine = engine
+        self.pull_interval = pull_interval
+        self._queue = queue.Queue()
+        self._delayed = []  # (not before, change) awaiting a retry
+        self._stop = threading.Event()
+        self._thread = None
+        self._busy = False
+        self._pull_due = 0.0
+        self.caught_up = False
+        self.last_error = None
+        self.last_round = None
+
+    def start(self):
+        """
+        Start the thread, first queueing meetings whose push never finished
+        (e.g. the process stopped with them still queued).
+        """
+        if self._thread is not None:
+            return self
+        with session_scope() as session:
+            pending = session.scalars(
+                select(Meeting.id).where(Meeting.source == SYNC_PENDING_SOURCE)
+            ).all()
+        for meeting_id in pending:
+            self.save(meeting_id)
+        self._thread = threading.Thread(target=self._run, name="calendar-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def save(self, meeting_id):
+        self._queue.put(("save", meeting_id))
+
+    def deleted(self, meeting_id):
+        self._queue.put(("delete", meeting_id))
+
+    def request_pull(self):
+        self._pull_due = 0.0
+        self._queue.put(None)
+
+    def pending(self):
+        """
+        Changes not yet pushed (queued, waiting for a retry, or in flight).
+        """
+        return self._queue.qsize() + len(self._delayed) + int(self._busy)
+
+    def status(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "pending": self.pending(),
+            "caught_up": self.caught_up,
+            "last_round": self.last_round.isoformat(timespec="seconds") if self.last_round else None,
+            "last_error": self.last_error,
+            "unapplied": self.engine.unapplied_count(),
+            **self.engine.stats,
+        }
+
+    def _next_wakeup(self):
+        wakeups = [self._pull_due] + [not_before for not_before, _ in self._delayed]
+        return 0.0 if not self.caught_up else max(0.0, min(wakeups) - time.monotonic())
+
+    def _take(self):
+        """
+        Wait for work, then take up to PUSH_CHANGES_PER_ROUND changes.
+        """
+        changes = []
+        wait = self._next_wakeup()
+        try:
+            item = self._queue.get(timeout=wait) if wait > 0 else self._queue.get_nowait()
+        except queue.Empty:
+            item = None
+        while True:
+            if item is not None:
+                changes.append(item)
+            if len(changes) >= PUSH_CHANGES_PER_ROUND:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        due = [change for not_before, change in self._delayed if not_before <= now]
+        self._delayed = [entry for entry in self._delayed if entry[0] > now]
+        return due + changes
+
+    def _run(self):
+        while not self._stop.is_set():
+            changes = self._take()
+            if self._stop.is_set():
+                break
+            self._busy = bool(changes)
+            try:
+                if changes:
+                    for change in self.engine.push(changes):
+                        attempt = self.engine._attempts.get(change, 1)
+                        self._delayed.append((time.monotonic() + backoff_delay(attempt), change))
+                if time.monotonic() >= self._pull_due or not self.caught_up:
+                    self.caught_up = self.engine.pull(max_pages=PULL_PAGES_PER_ROUND)
+                    if self.caught_up:
+                        self._pull_due = time.monotonic() + self.pull_interval
+                self.last_error = None
+            except Exception as exc:  # keep the worker alive; retry the round later
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._delayed.extend(
+                    (time.monotonic() + RETRY_MAX_DELAY, change) for change in changes
+                )
+                self.caught_up = True  # wait for the next wakeup instead of spinning
+                self._pull_due = time.monotonic() + RETRY_MAX_DELAY
+            finally:
+                self._busy = False
+                self.last_round = datetime.now()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_sync_worker(provider=None, calendar_id=SYNC_CALENDAR_ID):
+    """
+    The process-wide SyncWorker, started on first call (against a
+    FakeCalendarProvider unless `provider` is given).
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            engine = SyncEngine(provider or FakeCalendarProvider(), calendar_id)
+            _worker = SyncWorker(engine).start()
+        return _worker
+
+
+def notify_saved(meeting_id):
+    """
+    Queue a created or edited meeting for pushing, if sync is running.
+    """
+    if _worker is not None:
+        _worker.save(meeting_id)
+
+
+def notify_deleted(meeting_id):
+    """
+    Queue a deleted meeting's remote event for deletion, if sync is running.
+    """
+    if _worker is not None:
+        _worker.deleted(meeting_id)
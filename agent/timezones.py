@@ -0,0 +1,173 @@
+"""
+Time zone normalisation.
+
+Meetings are stored twice over: as naive wall-clock datetimes in the
+calendar zone (start_time/end_time -- what the UI shows and what recurrence
+rules step through) and as UTC epoch minutes (start_minute/end_minute), so
+range math is plain integer comparison. Users may work in any other zone;
+their times are converted at the edges with the helpers here.
+
+Conversions go through a per-zone table of UTC offsets built once from the
+tz database, so a lookup is a bisect instead of a pytz localize() call.
+"""
+import os
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import pytz
+from pytz import UnknownTimeZoneError  # noqa: F401 -- raised by get_zone()
+
+# Zone the meetings table's wall-clock columns are in.
+CALENDAR_ZONE = os.getenv("SCHEDULER_TIMEZONE", "Asia/Kolkata")
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+_EPOCH_DAY = EPOCH.toordinal()
+
+
+def _minutes(naive):
+    # Integer arithmetic on the fields is several times cheaper than
+    # (naive - EPOCH) // MINUTE.
+    return (naive.toordinal() - _EPOCH_DAY) * 1440 + naive.hour * 60 + naive.minute
+
+
+@lru_cache(maxsize=None)
+def get_zone(name=None):
+    """
+    pytz zone for `name` (default CALENDAR_ZONE). Raises
+    pytz.UnknownTimeZoneError for names the tz database does not know.
+    """
+    return pytz.timezone(name or CALENDAR_ZONE)
+
+
+class OffsetTable:
+    """
+    The UTC offsets of one zone, as sorted transition instants (epoch
+    minutes) and the offset in minutes (plus a matching fixed-offset
+    tzinfo) that applies from each.
+    """
+
+    def __init__(self, zone):
+        transitions = getattr(zone, "_utc_transition_times", None)
+        if transitions:
+            self.utc_starts = [_minutes(instant) for instant in transitions]
+            infos = zone._transition_info  # (utcoffset, dst, tzname) from each
+        else:
+            # Fixed-offset zones (UTC, Etc/GMT+5, ...)
+            self.utc_starts = [_minutes(datetime.min)]
+            infos = [(zone.utcoffset(EPOCH), timedelta(0), zone.tzname(EPOCH))]
+        self.offsets = [int(offset.total_seconds()) // 60 for offset, _, _ in infos]
+        self.dst = [bool(dst) for _, dst, _ in infos]
+        fixed = {}
+        self.tzinfos = [
+            fixed.setdefault((minutes, name), timezone(timedelta(minutes=minutes), name))
+            for minutes, (_, _, name) in zip(self.offsets, infos)
+        ]
+        # The same transitions on the local clock. Local times in a DST gap
+        # or overlap resolve to the offset in force *before* the change
+        # (gap) or *after* it (overlap): standard time either way, like
+        # pytz's localize(is_dst=False).
+        self.local_starts = [
+            start + offset for start, offset in zip(self.utc_starts, self.offsets)
+        ]
+        # Most lookups fall after the last transition (zones without DST,
+        # like the default); those skip the bisect.
+        self.last_utc_start = self.utc_starts[-1]
+        self.last_local_start = self.local_starts[-1]
+        self.last_offset = self.offsets[-1]
+
+    def _utc_position(self, utc_minute):
+        if utc_minute >= self.last_utc_start:
+            return -1
+        return max(bisect_right(self.utc_starts, utc_minute) - 1, 0)
+
+    def utc_offset(self, utc_minute):
+        return self.offsets[self._utc_position(utc_minute)]
+
+    def utc_tzinfo(self, utc_minute):
+        return self.tzinfos[self._utc_position(utc_minute)]
+
+    def _local_position(self, local_minute):
+        if local_minute >= self.last_local_start:
+            return -1
+        return max(bisect_right(self.local_starts, local_minute) - 1, 0)
+
+    def local_offset(self, local_minute):
+        return self.offsets[self._local_position(local_minute)]
+
+    def local_tzinfo(self, local_minute):
+        return self.tzinfos[self._local_position(local_minute)]
+
+
+_tables = {}  # zone name (None for CALENDAR_ZONE) -> OffsetTable
+
+
+def offset_table(name=None):
+    table = _tables.get(name)
+    if table is None:
+        table = _tables[name] = OffsetTable(get_zone(name))
+    return table
+
+
+def to_utc_minutes(dt, zone=None, round_up=False):
+    """
+    UTC epoch minutes of `dt`. Naive values are wall-clock time in `zone`
+    (default CALENDAR_ZONE). Seconds are dropped, or rounded up to the next
+    minute with round_up=True (for interval ends).
+    """
+    minute = _minutes(dt)
+    if round_up and (dt.second or dt.microsecond):
+        minute += 1
+    if dt.tzinfo is not None:
+        return minute - dt.utcoffset() // MINUTE
+    return minute - offset_table(zone).local_offset(minute)
+
+
+def from_utc_minutes(minutes, zone=None):
+    """
+    Naive wall-clock datetime in `zone` (default CALENDAR_ZONE) for UTC
+    epoch minutes.
+    """
+    return EPOCH + MINUTE * (minutes + offset_table(zone).utc_offset(minutes))
+
+
+def localize(dt, zone=None):
+    """
+    Aware datetime for `dt`: naive values are taken as wall-clock time in
+    `zone` and get the fixed-offset tzinfo in force then (from the offset
+    table, far cheaper than pytz's localize()); aware ones are converted.
+    """
+    if dt is None:
+        return None
+    table = offset_table(zone)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=table.local_tzinfo(_minutes(dt)))
+    return dt.astimezone(table.utc_tzinfo(to_utc_minutes(dt)))
+
+
+def to_wall_clock(dt, zone=None):
+    """
+    Naive wall-clock datetime in `zone` (default CALENDAR_ZONE), the form
+    the meetings table stores. Aware values are converted; naive ones are
+    assumed to be in `zone` already.
+    """
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return localize(dt, zone).replace(tzinfo=None)
+
+
+def convert(dt, from_zone=None, to_zone=None):
+    """
+    Naive wall-clock `dt` in `from_zone` as naive wall-clock in `to_zone`.
+    """
+    if dt is None:
+        return None
+    return to_wall_clock(localize(dt, from_zone), to_zone)
+
+
+def now(zone=None):
+    """
+    Current time, aware, in `zone` (default CALENDAR_ZONE).
+    """
+    return datetime.now(get_zone(zone))
@@ -1,27 +1,96 @@
+import json
+import os
+
 import streamlit as st
 import pytz
-import pandas as pd
-from datetime import datetime
-from streamlit_extras.add_vertical_space import add_vertical_space
-from streamlit_extras.let_it_rain import rain
-from streamlit_lottie import st_lottie 
 
+# pandas (calendar view, analytics), the parser (dateutil) and the
+# streamlit_lottie / streamlit_extras components are imported where they
+# are used: together they take longer to import than the rest of the app,
+# and most reruns never need them.
 from agent.db import init_db
-from agent.nlp import parse_meeting_request
-from agent.scheduler import create_meeting, get_all_meetings, edit_meeting, delete_meeting
-from agent.calendar_integration import create_google_calendar_event
-from agent.calendar_view import show_calendar_view
+from agent.scheduler import (
+    check_proposal_async,
+    create_meeting,
+    get_meeting_page,
+    edit_meeting,
+    delete_meeting,
+    rebuild_interval_index,
+    suggest_slots,
+)
+from agent.sync import SYNC_PENDING_SOURCE, get_sync_worker, notify_deleted, notify_saved
+from agent.exporters import EXPORT_FORMATS, export_file_name, export_mime_type, export_stream
+from agent.archive import archive_status, get_archive_worker
+from agent.cache import parse_cache, read_cache
+from agent import instrumentation, timezones
+
+
+# Header animation, bundled so rendering it needs no network request
+LOTTIE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "scheduler_loading.json")
 
+# Meetings shown per page in the Manage tab
+MANAGE_PAGE_SIZE = 20
 
-# Lottie animation JSON (futuristic loading animation)
-lottie_animation = {
-    "url": "https://assets4.lottiefiles.com/packages/lf20_1pxqjqps.json"  # Futuristic loading
+# Custom CSS for light mode only
+PAGE_CSS = """
+<style>
+.main {
+    background: linear-gradient(135deg, #ffffff 0%, #f0f0f0 50%, #e0e0e0 100%);
+    color: #000000;
+}
+.stApp {
+    background: linear-gradient(135deg, #ffffff 0%, #f0f0f0 50%, #e0e0e0 100%);
+}
+.stTitle {
+    color: #007bff !important;
+    text-shadow: 0 0 10px #007bff;
+}
+.stTextInput > div > div > input {
+    background-color: #ffffff;
+    color: #000000;
+    border: 1px solid #007bff;
+    box-shadow: 0 0 5px #007bff;
 }
+.stButton > button {
+    background: linear-gradient(45deg, #007bff, #28a745);
+    color: #ffffff;
+    border: none;
+    box-shadow: 0 0 10px #007bff;
+    transition: all 0.3s ease;
+}
+.stButton > button:hover {
+    box-shadow: 0 0 20px #007bff;
+    transform: scale(1.05);
+}
+.meeting-card {
+    background: rgba(255, 255, 255, 0.9);
+    border: 1px solid #007bff;
+    border-radius: 10px;
+    padding: 15px;
+    box-shadow: 0 0 15px rgba(0, 123, 255, 0.3);
+    margin-bottom: 10px;
+}
+</style>
+"""
 
-IST = pytz.timezone("Asia/Kolkata")
 
+@st.cache_resource(show_spinner=False)
 def init():
+    """
+    Create/migrate the database, build the in-memory indexes and start the
+    archive worker, once per process (Streamlit re-executes this script on
+    every rerun).
+    """
     init_db()
+    rebuild_interval_index()
+    get_archive_worker()
+
+
+@st.cache_resource(show_spinner=False)
+def load_lottie_animation():
+    with open(LOTTIE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
 
 def main():
     st.set_page_config(
@@ -31,209 +100,289 @@ def main():
         initial_sidebar_state="expanded"
     )
 
-    # Custom CSS for light mode only
-    css = """
-    <style>
-    .main {
-        background: linear-gradient(135deg, #ffffff 0%, #f0f0f0 50%, #e0e0e0 100%);
-        color: #000000;
-    }
-    .stApp {
-        background: linear-gradient(135deg, #ffffff 0%, #f0f0f0 50%, #e0e0e0 100%);
-    }
-    .stTitle {
-        color: #007bff !important;
-        text-shadow: 0 0 10px #007bff;
-    }
-    .stTextInput > div > div > input {
-        background-color: #ffffff;
-        color: #000000;
-        border: 1px solid #007bff;
-        box-shadow: 0 0 5px #007bff;
-    }
-    .stButton > button {
-        background: linear-gradient(45deg, #007bff, #28a745);
-        color: #ffffff;
-        border: none;
-        box-shadow: 0 0 10px #007bff;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        box-shadow: 0 0 20px #007bff;
-        transform: scale(1.05);
-    }
-    .meeting-card {
-        background: rgba(255, 255, 255, 0.9);
-        border: 1px solid #007bff;
-        border-radius: 10px;
-        padding: 15px;
-        box-shadow: 0 0 15px rgba(0, 123, 255, 0.3);
-        margin-bottom: 10px;
-    }
-    </style>
+    # Time this rerun (and profile it, if asked for in the debug panel).
+    profile = st.session_state.get("debug_profile", "off")
+    with instrumentation.rerun_scope(profile=None if profile == "off" else profile) as rerun:
+        debug_panel = render_page()
+    show_debug_panel(debug_panel, rerun)
+
+
+def show_debug_panel(panel, rerun):
+    """
+    Per-rerun breakdown: where the time went, SQL statements, profile.
+    """
+    with panel:
+        st.caption(f"This rerun: {rerun.seconds * 1000:.1f} ms, {rerun.sql_statements} SQL statements")
+        st.dataframe(rerun.breakdown(), hide_index=True, width="stretch")
+        if rerun.profile:
+            st.code(rerun.profile, language=None)
+
+
+def render_page():
+    """
+    Everything below the page config; returns the sidebar's debug panel,
+    filled in once the rerun's numbers are known.
     """
-    st.markdown(css, unsafe_allow_html=True)
+    # Streamlit drops whatever a rerun does not emit, so the (constant)
+    # stylesheet has to be sent every time.
+    st.html(PAGE_CSS)
 
     with st.sidebar:
         st.header("⚙️ Settings")
         use_google = st.checkbox("Simulate Google Calendar integration", value=False)
+        if use_google:
+            # Sync runs on a background thread; the UI only enqueues.
+            sync_worker = get_sync_worker()
+            with st.expander("🔄 Calendar sync"):
+                st.json(sync_worker.status())
+                if st.button("Pull changes now", key="sync_pull"):
+                    sync_worker.request_pull()
+        zones = pytz.common_timezones
+        user_zone = st.selectbox(
+            "Your time zone",
+            zones,
+            index=zones.index(timezones.CALENDAR_ZONE) if timezones.CALENDAR_ZONE in zones else 0,
+            help=f"Requests are read in this zone; the calendar is kept in {timezones.CALENDAR_ZONE}.",
+        )
         st.markdown("---")
         st.write("🚀 Futuristic AI Meeting Scheduler")
         st.caption("Enhanced for advanced features & animations")
+        with st.expander("📊 Read cache"):
+            st.json(read_cache.metrics())
+        with st.expander("📊 Parse cache"):
+            st.json(parse_cache.metrics())
+        with st.expander("🗄️ Archive"):
+            st.json({**archive_status(), "worker": get_archive_worker().status()}, expanded=False)
+        debug_panel = st.expander("🩺 Debug: this rerun")
+        with debug_panel:
+            st.selectbox(
+                "Profile reruns with", ["off"] + instrumentation.available_profilers(),
+                key="debug_profile",
+            )
 
     # Header with animation
     col1, col2 = st.columns([1, 3])
     with col1:
-        st_lottie("https://assets4.lottiefiles.com/packages/lf20_1pxqjqps.json", height=100, key="lottie")
+        from streamlit_lottie import st_lottie
+
+        st_lottie(load_lottie_animation(), height=100, key="lottie")
     with col2:
         st.title("🚀 Futuristic AI Meeting Scheduler")
         st.caption("Schedule meetings with natural language - now with recurring events & calendar view!")
 
-    add_vertical_space(2)
+    st.space("medium")
 
-    tab1, tab2, tab3 = st.tabs(["➕ Schedule Meeting", "📅 Calendar View", "📋 Manage Meetings"])
+    # Only the open tab runs on a rerun (switching tabs triggers one).
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["➕ Schedule Meeting", "📅 Calendar View", "📋 Manage Meetings", "📈 Analytics"],
+        key="main_tab", on_change="rerun",
+    )
 
-    with tab1:
-        st.subheader("Schedule via Natural Language")
-        st.caption("Example: *Schedule a 30-minute sync with Rahul tomorrow at 3 PM about project status every week*")
+    if tab1.open:
+        with tab1:
+            st.subheader("Schedule via Natural Language")
+            st.caption("Example: *Schedule a 30-minute sync with Rahul tomorrow at 3 PM about project status every week*")
 
-        user_input = st.text_area("Your request", height=120, key="input")
+            user_input = st.text_area("Your request", height=120, key="input")
 
-        if st.button("🔍 AI Analyze & Propose", type="primary"):
-            if not user_input.strip():
-                st.warning("Please enter a meeting request.")
-            else:
-                with st.spinner("AI analyzing your request..."):
-                    parsed = parse_meeting_request(user_input)
-                    st.session_state.parsed = parsed
+            if st.button("🔍 AI Analyze & Propose", type="primary"):
+                if not user_input.strip():
+                    st.warning("Please enter a meeting request.")
+                else:
+                    with st.spinner("AI analyzing your request..."):
+                        from agent.nlp import parse_meeting_request_cached
+
+                        parsed = parse_meeting_request_cached(user_input, zone=user_zone)
+                        st.session_state.parsed = parsed
+                        st.session_state.suggested_slots = []
+                    # Checked on a background thread while the preview renders.
+                    proposal_check = check_proposal_async(
+                        parsed["start_time"],
+                        parsed["end_time"],
+                        participants=parsed["participants"],
+                        recurrence_type=parsed.get("recurrence_type", "none"),
+                        recurrence_until=parsed.get("recurrence_until"),
+                    )
+
+                    if 'parsed' in st.session_state:
+                        parsed = st.session_state.parsed
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.success("✅ Proposed Meeting Details")
+                            st.write(f"**Title:** {parsed['title']}")
+                            st.write(f"**Participants:** {parsed['participants'] or 'Not specified'}")
+                            st.write(f"**Start:** {parsed['start_time'].strftime('%Y-%m-%d %H:%M %Z')}")
+                            st.write(f"**End:** {parsed['end_time'].strftime('%Y-%m-%d %H:%M %Z')}")
+                            if parsed.get('recurrence_type') != 'none':
+                                st.write(f"**Recurrence:** {parsed['recurrence_type']} until {parsed['recurrence_until'].strftime('%Y-%m-%d') if parsed['recurrence_until'] else 'Ongoing'}")
+                        with col2:
+                            st.info("Preview")
+                            # Simple preview card
+                            with st.container():
+                                st.markdown(f"""
+                                <div class="meeting-card">
+                                    <h4>{parsed['title']}</h4>
+                                    <p><strong>With:</strong> {parsed['participants'] or 'Team'}</p>
+                                    <p><strong>When:</strong> {parsed['start_time'].strftime('%Y-%m-%d %H:%M')} - {parsed['end_time'].strftime('%H:%M')}</p>
+                                    {f'<p><strong>Repeats:</strong> {parsed.get("recurrence_type", "Once")}</p>' if parsed.get('recurrence_type') != 'none' else ''}
+                                </div>
+                                """, unsafe_allow_html=True)
+
+                        conflicts, suggestions = proposal_check.result()
+                        if conflicts:
+                            clashes = ", ".join(
+                                f"{meeting.title} ({meeting.start_time.strftime('%Y-%m-%d %H:%M')})"
+                                for meeting in conflicts[:3]
+                            )
+                            more = f" and {len(conflicts) - 3} more" if len(conflicts) > 3 else ""
+                            st.warning(f"⚠️ This slot conflicts with {clashes}{more}.")
+                            st.session_state.suggested_slots = suggestions
+                        else:
+                            st.success("🟢 This slot is free for everyone invited.")
+
+            if 'parsed' in st.session_state and st.session_state.parsed:
+                confirm = st.button("✅ Confirm & Schedule Meeting", type="primary")
 
-                if 'parsed' in st.session_state:
+                if confirm:
                     parsed = st.session_state.parsed
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.success("✅ Proposed Meeting Details")
-                        st.write(f"**Title:** {parsed['title']}")
-                        st.write(f"**Participants:** {parsed['participants'] or 'Not specified'}")
-                        st.write(f"**Start:** {parsed['start_time'].strftime('%Y-%m-%d %H:%M IST')}")
-                        st.write(f"**End:** {parsed['end_time'].strftime('%Y-%m-%d %H:%M IST')}")
+                    meeting, error = create_meeting(
+                        title=parsed["title"],
+                        participants=parsed["participants"],
+                        start_time=parsed["start_time"],
+                        end_time=parsed["end_time"],
+                        source=SYNC_PENDING_SOURCE if use_google else "local",
+                        recurrence_type=parsed.get("recurrence_type", "none"),
+                        recurrence_until=parsed.get("recurrence_until")
+                    )
+
+                    if error:
+                        st.error(f"❌ Error: {error}")
+                        st.session_state.suggested_slots = suggest_slots(
+                            parsed["start_time"],
+                            parsed["end_time"],
+                            participants=parsed["participants"],
+                            recurrence_type=parsed.get("recurrence_type", "none"),
+                            recurrence_until=parsed.get("recurrence_until"),
+                        )
+                    else:
+                        st.success("🎉 Meeting scheduled successfully!")
                         if parsed.get('recurrence_type') != 'none':
-                            st.write(f"**Recurrence:** {parsed['recurrence_type']} until {parsed['recurrence_until'].strftime('%Y-%m-%d') if parsed['recurrence_until'] else 'Ongoing'}")
-                    with col2:
-                        st.info("Preview")
-                        # Simple preview card
-                        with st.container():
-                            st.markdown(f"""
-                            <div class="meeting-card">
-                                <h4>{parsed['title']}</h4>
-                                <p><strong>With:</strong> {parsed['participants'] or 'Team'}</p>
-                                <p><strong>When:</strong> {parsed['start_time'].strftime('%Y-%m-%d %H:%M')} - {parsed['end_time'].strftime('%H:%M')}</p>
-                                {f'<p><strong>Repeats:</strong> {parsed.get("recurrence_type", "Once")}</p>' if parsed.get('recurrence_type') != 'none' else ''}
-                            </div>
-                            """, unsafe_allow_html=True)
-
-        if 'parsed' in st.session_state and st.session_state.parsed:
-            confirm = st.button("✅ Confirm & Schedule Meeting", type="primary")
-
-            if confirm:
-                parsed = st.session_state.parsed
-                meeting, error = create_meeting(
-                    title=parsed["title"],
-                    participants=parsed["participants"],
-                    start_time=parsed["start_time"],
-                    end_time=parsed["end_time"],
-                    source="google_calendar" if use_google else "local",
-                    recurrence_type=parsed.get("recurrence_type", "none"),
-                    recurrence_until=parsed.get("recurrence_until")
-                )
-
-                if error:
-                    st.error(f"❌ Error: {error}")
-                else:
-                    st.success("🎉 Meeting scheduled successfully!")
-                    if parsed.get('recurrence_type') != 'none':
-                        st.balloons()
-                        rain(emoji="🚀")
-                    if use_google:
-                        event = create_google_calendar_event(parsed)
-                        st.info("📧 Simulated Google Calendar event created. In a real implementation, this would open your Google Calendar.")
-                        # Avoid 404 by not linking to simulated URL
-                        # st.markdown(f"[Open calendar event]({event.get('event_link', '')})")
-                    st.session_state.parsed = None
-                    st.rerun()
-
-    with tab2:
-        st.subheader("📅 Interactive Calendar View")
-        show_calendar_view()
-
-    with tab3:
-        st.subheader("📋 Manage All Meetings")
-        meetings = get_all_meetings()
-        if not meetings:
-            st.info("No meetings scheduled yet. Schedule one in the first tab!")
-        else:
-            # Export button
-            col1, col2 = st.columns([4, 1])
-            with col2:
-                if st.button("📤 Export to CSV"):
-                    df = pd.DataFrame([
-                        {
-                            "ID": m.id,
-                            "Title": m.title,
-                            "Participants": m.participants or '',
-                            "Start": m.start_time.strftime('%Y-%m-%d %H:%M'),
-                            "End": m.end_time.strftime('%Y-%m-%d %H:%M'),
-                            "Source": m.source,
-                            "Recurrence": m.recurrence_type,
-                            "Created": m.created_at.strftime('%Y-%m-%d %H:%M')
-                        } for m in meetings
-                    ])
-                    csv = df.to_csv(index=False)
+                            st.balloons()
+                            from streamlit_extras.let_it_rain import rain
+
+                            rain(emoji="🚀")
+                        if use_google:
+                            notify_saved(meeting.id)
+                            st.info("📧 Queued for (simulated) Google Calendar sync; it runs in the background.")
+                        st.session_state.parsed = None
+                        st.session_state.suggested_slots = []
+                        st.rerun()
+
+                suggested_slots = st.session_state.get("suggested_slots") or []
+                if suggested_slots:
+                    st.write("🕒 **Free alternatives:**")
+                    for slot_start, slot_end in suggested_slots:
+                        # Slots are calendar-zone wall clock; offer them in the user's zone.
+                        start = timezones.localize(timezones.localize(slot_start), user_zone)
+                        end = timezones.localize(timezones.localize(slot_end), user_zone)
+                        label = f"{start.strftime('%a %Y-%m-%d %H:%M')} - {end.strftime('%H:%M %Z')}"
+                        if st.button(label, key=f"slot_{slot_start.isoformat()}"):
+                            parsed = st.session_state.parsed
+                            parsed["start_time"] = start
+                            parsed["end_time"] = end
+                            st.session_state.suggested_slots = []
+                            st.rerun()
+
+    if tab2.open:
+        with tab2:
+            st.subheader("📅 Interactive Calendar View")
+            from agent.calendar_view import show_calendar_view
+
+            show_calendar_view()
+
+    if tab3.open:
+        with tab3:
+            st.subheader("📋 Manage All Meetings")
+            # Pages are slices of the scheduler's columnar snapshot.
+            page = st.session_state.setdefault("manage_page", 0)
+            meetings, total = get_meeting_page(page, MANAGE_PAGE_SIZE)
+            pages = -(-total // MANAGE_PAGE_SIZE)
+            if not meetings and page > 0:
+                # The page emptied out (e.g. after deletes); go to the last one.
+                st.session_state.manage_page = max(pages - 1, 0)
+                st.rerun()
+            if not meetings:
+                st.info("No meetings scheduled yet. Schedule one in the first tab!")
+            else:
+                # Export: the file is only generated when the button is clicked,
+                # streamed chunk by chunk into a spooled temp file.
+                col1, col2 = st.columns([4, 1])
+                with col2:
+                    export_format = st.selectbox(
+                        "Export format", list(EXPORT_FORMATS), key="export_format",
+                        format_func=str.upper,
+                    )
                     st.download_button(
-                        label="Download CSV",
-                        data=csv,
-                        file_name=f"meetings_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv"
+                        label=f"📤 Export to {export_format.upper()}",
+                        data=lambda: export_stream(export_format),
+                        file_name=export_file_name(export_format),
+                        mime=export_mime_type(export_format),
                     )
-                    # For PDF, simple text export for now
-                    if st.button("📄 Export to PDF (Text)"):
-                        pdf_text = "\n".join([f"{m.title} - {m.start_time} to {m.end_time}" for m in meetings])
-                        st.download_button(
-                            label="Download Text File",
-                            data=pdf_text,
-                            file_name="meetings.txt",
-                            mime="text/plain"
-                        )
 
-            for m in meetings:
-                with st.container():
-                    col1, col2, col3 = st.columns([3, 1, 1])
-                    with col1:
-                        with st.expander(f"**{m.title}** - {m.start_time.strftime('%Y-%m-%d %H:%M')} to {m.end_time.strftime('%H:%M')} ({m.recurrence_type if m.recurrence_type != 'none' else 'Once'})", expanded=False):
-                            st.write(f"**Participants:** {m.participants or 'Not specified'}")
-                            st.write(f"**Source:** {m.source}")
-                            st.write(f"**Created:** {m.created_at.strftime('%Y-%m-%d %H:%M')}")
-                            if m.recurrence_type != 'none':
-                                st.write(f"**Recurrence:** {m.recurrence_type} until {m.recurrence_until.strftime('%Y-%m-%d') if m.recurrence_until else 'Ongoing'}")
-                    with col2:
-                        if st.button("✏️ Edit", key=f"edit_{m.id}"):
-                            # Simple edit form
-                            new_title = st.text_input("Title", value=m.title, key=f"title_{m.id}")
-                            new_participants = st.text_input("Participants", value=m.participants or '', key=f"part_{m.id}")
-                            success, err = edit_meeting(m.id, title=new_title, participants=new_participants)
-                            if success:
-                                st.success("Updated!")
-                                st.rerun()
-                            elif err:
-                                st.error(err)
-                    with col3:
-                        if st.button("🗑️ Delete", key=f"del_{m.id}"):
-                            success, err = delete_meeting(m.id)
-                            if success:
-                                st.success("Deleted!")
-                                st.rerun()
-                            elif err:
-                                st.error(err)
+                for m in meetings:
+                    with st.container():
+                        col1, col2, col3 = st.columns([3, 1, 1])
+                        with col1:
+                            with st.expander(f"**{m.title}** - {m.start_time.strftime('%Y-%m-%d %H:%M')} to {m.end_time.strftime('%H:%M')} ({m.recurrence_type if m.recurrence_type != 'none' else 'Once'})", expanded=False):
+                                st.write(f"**Participants:** {m.participants or 'Not specified'}")
+                                st.write(f"**Source:** {m.source}")
+                                st.write(f"**Created:** {m.created_at.strftime('%Y-%m-%d %H:%M')}")
+                                if m.recurrence_type != 'none':
+                                    st.write(f"**Recurrence:** {m.recurrence_type} until {m.recurrence_until.strftime('%Y-%m-%d') if m.recurrence_until else 'Ongoing'}")
+                        with col2:
+                            if st.button("✏️ Edit", key=f"edit_{m.id}"):
+                                # Simple edit form
+                                new_title = st.text_input("Title", value=m.title, key=f"title_{m.id}")
+                                new_participants = st.text_input("Participants", value=m.participants or '', key=f"part_{m.id}")
+                                success, err = edit_meeting(m.id, title=new_title, participants=new_participants)
+                                if success:
+                                    notify_saved(m.id)
+                                    st.success("Updated!")
+                                    st.rerun()
+                                elif err:
+                                    st.error(err)
+                        with col3:
+                            if st.button("🗑️ Delete", key=f"del_{m.id}"):
+                                success, err = delete_meeting(m.id)
+                                if success:
+                                    notify_deleted(m.id)
+                                    st.success("Deleted!")
+                                    st.rerun()
+                                elif err:
+                                    st.error(err)
+
+                prev_col, page_col, next_col = st.columns([1, 3, 1])
+                with prev_col:
+                    if page > 0 and st.button("◀ Previous", key="manage_prev"):
+                        st.session_state.manage_page = page - 1
+                        st.rerun()
+                with page_col:
+                    st.caption(f"Page {page + 1} of {pages} ({total} meetings)")
+                with next_col:
+                    if page + 1 < pages and st.button("Next ▶", key="manage_next"):
+                        st.session_state.manage_page = page + 1
+                        st.rerun()
+
+    if tab4.open:
+        with tab4:
+            st.subheader("📈 Meeting Load")
+            from agent.analytics_view import show_analytics_view
+
+            show_analytics_view()
+
+    return debug_panel
 
 if __name__ == "__main__":
     init()
     main()
+
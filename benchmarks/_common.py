@@ -0,0 +1,137 @@
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from agent import db
+from agent.db import Meeting, MeetingParticipant
+
+BASE_TIME = datetime(2025, 1, 6, 9, 0)
+
+
+def use_temp_database():
+    """
+    Point agent.db at a fresh SQLite file in a temp directory and create the
+    schema. Returns the file path.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="meetings-bench-"), "meetings.db")
+    db.configure(f"sqlite:///{path}")
+    db.init_db()
+    return path
+
+
+def seed_meetings(n, slot_minutes=30, gap_minutes=30):
+    """
+    Insert n back-to-back, non-overlapping one-off meetings starting at
+    BASE_TIME. Returns the list of (start, end) pairs.
+    """
+    session = db.get_session()
+    step = timedelta(minutes=slot_minutes + gap_minutes)
+    length = timedelta(minutes=slot_minutes)
+    slots = [(BASE_TIME + i * step, BASE_TIME + i * step + length) for i in range(n)]
+    session.bulk_insert_mappings(
+        Meeting,
+        [
+            {
+                "title": f"Meeting {i}",
+                "participants": "",
+                "start_time": start,
+                "end_time": end,
+                "source": "bench",
+                "recurrence_type": "none",
+            }
+            for i, (start, end) in enumerate(slots)
+        ],
+    )
+    session.commit()
+    session.close()
+    return slots
+
+
+# Recurrence mix of the synthetic calendars: share of meetings per type.
+RECURRENCE_MIX = {"none": 0.97, "daily": 0.005, "weekly": 0.02, "monthly": 0.005}
+# People in the synthetic calendars; constant, so bigger calendars are
+# longer, not denser per person.
+PARTICIPANTS = 200
+SEED_CHUNK = 20_000
+
+
+def synthetic_meetings(n, participants=PARTICIPANTS, per_day=40, recurrence_mix=RECURRENCE_MIX,
+                       seed=0):
+    """
+    Yield n synthetic meeting dicts (with explicit ids 1..n), ordered by
+    start: `per_day` meetings a day on a 15-minute grid in working hours,
+    30 or 60 minutes long, each with 1-3 of `participants` people,
+    recurring types drawn from `recurrence_mix` (series end after 4-12
+    weeks). The same arguments always give the same calendar.
+    """
+    rng = random.Random(seed)
+    people = [f"person{i}" for i in range(participants)]
+    types, weights = zip(*recurrence_mix.items())
+    for i in range(n):
+        day = BASE_TIME.replace(hour=9) + timedelta(days=i // per_day)
+        start = day + timedelta(minutes=15 * rng.randrange(32))
+        recurrence_type = rng.choices(types, weights)[0]
+        # Series run 4-12 weeks, so the number running on any one day (and
+        # so a day's occurrences) does not grow with n.
+        until = None
+        if recurrence_type != "none":
+            until = start + timedelta(weeks=rng.randrange(4, 13))
+        yield {
+            "id": i + 1,
+            "title": f"Meeting {i}",
+            "participants": ", ".join(rng.sample(people, rng.randint(1, min(3, len(people))))),
+            "start_time": start,
+            "end_time": start + timedelta(minutes=rng.choice((30, 60))),
+            "source": "bench",
+            "recurrence_type": recurrence_type,
+            "recurrence_until": until,
+        }
+
+
+def seed_synthetic(n, **options):
+    """
+    Insert synthetic_meetings(n, **options) and their participant rows
+    straight into the tables (no conflict checks, so even 1M rows seed in
+    a minute or two). Returns the list of participant names used.
+    """
+    people = set()
+    chunk = []
+
+    def flush():
+        links = [
+            {
+                "meeting_id": row["id"],
+                "person": person,
+                "start_time": row["start_time"] if row["recurrence_type"] == "none" else None,
+                "end_time": row["end_time"] if row["recurrence_type"] == "none" else None,
+            }
+            for row in chunk
+            for person in row["participants"].split(", ")
+        ]
+        people.update(link["person"] for link in links)
+        with db.engine.begin() as conn:
+            conn.execute(insert(Meeting), chunk)
+            conn.execute(insert(MeetingParticipant), links)
+        chunk.clear()
+
+    for row in synthetic_meetings(n, **options):
+        chunk.append(row)
+        if len(chunk) >= SEED_CHUNK:
+            flush()
+    if chunk:
+        flush()
+    return sorted(people)
+
+
+def timed(fn, repeat):
+    """
+    Call fn() `repeat` times and return the mean wall time in microseconds.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
@@ -0,0 +1,84 @@
+"""
+Meeting-load reports (agent/analytics.py) over a synthetic calendar whose
+recurring series expand to about N occurrences (default 1,000,000):
+occurrence expansion checked against recurrence.iter_occurrences on a
+sample window, then every report timed on the full window.
+
+    python -m benchmarks.bench_analytics [N]
+"""
+import sys
+import time
+from datetime import timedelta
+
+from agent import analytics, scheduler
+from agent.cache import read_cache
+from agent.recurrence import iter_occurrences
+
+from ._common import BASE_TIME, seed_synthetic, use_temp_database
+
+PER_DAY = 40
+# Half the meetings repeat; series run 4-12 weeks, so each expands to ~30
+# occurrences on average.
+RECURRENCE_MIX = {"none": 0.5, "daily": 0.1, "weekly": 0.3, "monthly": 0.1}
+OCCURRENCES_PER_MEETING = 8
+
+
+def check_expansion(window_start, window_end):
+    """
+    The vectorised expansion against walking every meeting's occurrences.
+    """
+    report = analytics.LoadReport(scheduler.get_meeting_columns(), window_start, window_end)
+    expected = sorted(
+        (row.id, start, end)
+        for row in scheduler.get_all_meetings()
+        for start, end in iter_occurrences(
+            row.start_time, row.end_time, row.recurrence_type, row.recurrence_until,
+            window_start, window_end,
+        )
+    )
+    got = sorted(
+        (meeting_id, analytics._from_wall_minutes(start), analytics._from_wall_minutes(end))
+        for meeting_id, start, end in zip(report.ids.tolist(), report.starts.tolist(), report.ends.tolist())
+    )
+    assert got == expected, (len(got), len(expected))
+    return len(got)
+
+
+def run(n):
+    use_temp_database()
+    meetings = max(n // OCCURRENCES_PER_MEETING, 1)
+    people = seed_synthetic(meetings, per_day=PER_DAY, recurrence_mix=RECURRENCE_MIX)
+    scheduler.rebuild_interval_index()
+
+    checked = check_expansion(BASE_TIME + timedelta(days=20), BASE_TIME + timedelta(days=80))
+    print(f"expansion matches iter_occurrences on a 60-day window ({checked:,} occurrences)")
+
+    window_start = BASE_TIME.replace(hour=0)
+    window_end = window_start + timedelta(days=meetings // PER_DAY + 90)
+    read_cache.invalidate()
+    started = time.perf_counter()
+    report = analytics.load_report(window_start, window_end)
+    build = time.perf_counter() - started
+    print(f"{meetings:,} meetings -> {len(report):,} occurrences, "
+          f"{len(report.person):,} attendances: built in {build:.2f} s")
+
+    team = {"Team A": people[:10], "Team B": people[10:30]}
+    for name, fn in [
+        ("weekly hours", report.weekly_hours),
+        ("back to back", report.back_to_back),
+        ("heatmap", report.heatmap),
+        ("team heatmap", lambda: report.heatmap(team["Team A"])),
+        ("recurring cost", report.recurring_cost),
+        ("team summary", lambda: report.team_summary(team)),
+    ]:
+        started = time.perf_counter()
+        frame = fn()
+        print(f"{name:15s} {time.perf_counter() - started:6.3f} s  {frame.shape}")
+
+    started = time.perf_counter()
+    assert analytics.load_report(window_start, window_end) is report
+    print(f"cached report: {(time.perf_counter() - started) * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if sys.argv[1:] else 1_000_000)
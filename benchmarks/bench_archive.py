@@ -0,0 +1,143 @@
+"""
+Archival (agent/archive.py) on a synthetic calendar of N meetings (default
+100,000), archiving everything over before the last ARCHIVED_SHARE of its
+span:
+
+- every read that covers history (get_meeting_history, the calendar
+  agenda, analytics, exports, conflict checks in the archived past) gives
+  the same answer before and after, and again after a rebuild from the DB;
+- hot-path latency (conflict checks, week reads, index rebuild) before and
+  after, which should no longer depend on how much history there is;
+- batched archival and VACUUM / ANALYZE timings and the file size.
+
+    python -m benchmarks.bench_archive [N]
+"""
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+from agent import analytics, archive, scheduler
+from agent.exporters import iter_meeting_chunks
+
+from ._common import BASE_TIME, seed_synthetic, timed, use_temp_database
+
+PER_DAY = 40
+# Share of the calendar's span left in the hot table.
+ARCHIVED_SHARE = 0.9
+OPS = 200
+
+
+def _all_ids(read):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = read(limit=5000, cursor=cursor)
+        ids.extend(row.id for row in rows)
+        if cursor is None:
+            return ids
+
+
+def _agenda(first):
+    return {
+        day: [(start, end, row.id) for start, end, row in entries]
+        for day, entries in scheduler.get_agenda(first, first + timedelta(days=6)).items()
+    }
+
+
+def _conflicts(probes):
+    return [
+        sorted(meeting.id for meeting in scheduler.is_conflict(start, end, participants=names)[1])
+        for start, end, names in probes
+    ]
+
+
+def _hot_timings(recent, probes):
+    week = timed(lambda: scheduler.get_meetings_in_range(recent, recent + timedelta(days=7)), 1)
+    pending = iter(probes)
+    conflict = timed(lambda: (lambda p: scheduler.is_conflict(p[0], p[1], participants=p[2]))(next(pending)), OPS)
+    started = time.perf_counter()
+    scheduler.rebuild_interval_index()
+    rebuild = time.perf_counter() - started
+    return week, conflict, rebuild
+
+
+def run(n):
+    rng = random.Random(0)
+    path = use_temp_database()
+    people = seed_synthetic(n, per_day=PER_DAY)
+    scheduler.rebuild_interval_index()
+    span_days = max(1, n // PER_DAY)
+    cutoff = BASE_TIME.replace(hour=0) + timedelta(days=int(span_days * ARCHIVED_SHARE))
+    recent = cutoff + timedelta(days=(span_days - (cutoff - BASE_TIME).days) // 2)
+
+    def probe(first_day, days):
+        start = BASE_TIME.replace(hour=9) + timedelta(days=first_day + rng.randrange(days), minutes=15 * rng.randrange(32))
+        return start, start + timedelta(minutes=30), rng.sample(people, 2)
+
+    archived_days = (cutoff - BASE_TIME).days
+    past_probes = [probe(0, archived_days) for _ in range(50)]
+    probes = [probe(archived_days + 1, span_days - archived_days - 1) for _ in range(OPS)]
+    weeks = [BASE_TIME.date() + timedelta(days=rng.randrange(archived_days)) for _ in range(5)]
+    window = (BASE_TIME + timedelta(days=archived_days // 2), BASE_TIME + timedelta(days=archived_days // 2 + 28))
+
+    before = {
+        "history": _all_ids(scheduler.get_meeting_history),
+        "agenda": [_agenda(first) for first in weeks],
+        "past conflicts": _conflicts(past_probes),
+        "conflicts": _conflicts(probes),
+        "booked hours": analytics.load_report(*window).booked_hours(),
+        "export": sum(len(chunk) for chunk in iter_meeting_chunks()),
+    }
+    week_before, conflict_before, rebuild_before = _hot_timings(recent, probes)
+    size_before = os.path.getsize(path)
+
+    started = time.perf_counter()
+    moved = scheduler.archive_meetings(cutoff)
+    archive_seconds = time.perf_counter() - started
+    hot = len(scheduler.get_calendar_index())
+    print(f"n={n:,}: archived {moved:,} meetings in {archive_seconds:.2f} s "
+          f"({scheduler.ARCHIVE_BATCH:,} per transaction), {hot:,} left in the hot table")
+    assert moved and hot + moved == n, (moved, hot)
+
+    for label in ("after archival", "after a rebuild"):
+        after = {
+            "history": _all_ids(scheduler.get_meeting_history),
+            "agenda": [_agenda(first) for first in weeks],
+            "past conflicts": _conflicts(past_probes),
+            "conflicts": _conflicts(probes),
+            "booked hours": analytics.load_report(*window).booked_hours(),
+            "export": sum(len(chunk) for chunk in iter_meeting_chunks()),
+        }
+        for key, value in before.items():
+            assert after[key] == value, f"{key} differs {label}"
+        print(f"{label}: history, agenda, analytics, export and conflict checks unchanged")
+        scheduler.rebuild_interval_index()
+        scheduler.read_cache.invalidate()
+
+    # The archived past stays closed to clashes: a booking on top of an
+    # archived meeting is refused, by create_meeting and by bulk imports.
+    start, end, names = next(probe for probe, ids in zip(past_probes, before["past conflicts"]) if ids)
+    _, error = scheduler.create_meeting("Late entry", ", ".join(names), start, end)
+    assert error, "booking over an archived meeting was accepted"
+    report = scheduler.bulk_create_meetings(
+        [{"title": "Late import", "participants": ", ".join(names), "start_time": start, "end_time": end}]
+    )
+    assert report[0]["status"] == "conflict", report
+
+    week_after, conflict_after, rebuild_after = _hot_timings(recent, probes)
+    print(f"week read:    {week_before / 1000:8.2f} ms -> {week_after / 1000:8.2f} ms")
+    print(f"is_conflict:  {conflict_before:8.1f} us -> {conflict_after:8.1f} us")
+    print(f"rebuild:      {rebuild_before:8.2f} s  -> {rebuild_after:8.2f} s")
+
+    archive.VACUUM_INTERVAL = timedelta(0)
+    started = time.perf_counter()
+    ran = archive.run_maintenance(moved)
+    print(f"maintenance:  {', '.join(ran)} in {time.perf_counter() - started:.2f} s; "
+          f"file {size_before / 1e6:.1f} MB -> {os.path.getsize(path) / 1e6:.1f} MB "
+          f"(the archive keeps the rows, the participant table and hot indexes shrink)")
+    assert ran == ["vacuum", "analyze"], ran
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if sys.argv[1:] else 100_000)
@@ -0,0 +1,91 @@
+"""
+Rows per second for bulk_create_meetings (and the CSV importer built on
+it) versus one create_meeting call per row.
+
+    python -m benchmarks.bench_bulk_import [N]
+"""
+import csv
+import io
+import random
+import sys
+import time
+from datetime import timedelta
+
+from agent import scheduler
+from agent.importers import import_csv
+
+from ._common import BASE_TIME, use_temp_database
+
+
+def make_records(n, rng):
+    """
+    Back-to-back 30-minute slots with a gap, ~5% nudged into a neighbour.
+    """
+    records = []
+    for i in range(n):
+        start = BASE_TIME + timedelta(minutes=60 * i)
+        if rng.random() < 0.05:
+            start -= timedelta(minutes=45)
+        records.append({
+            "title": f"Imported {i}",
+            "participants": rng.choice(["", "Rahul", "Priya, Sam"]),
+            "start_time": start,
+            "end_time": start + timedelta(minutes=30),
+        })
+    rng.shuffle(records)
+    return records
+
+
+def to_csv(records):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["Title", "Participants", "Start", "End"])
+    for record in records:
+        writer.writerow([
+            record["title"],
+            record["participants"],
+            record["start_time"].strftime("%Y-%m-%d %H:%M"),
+            record["end_time"].strftime("%Y-%m-%d %H:%M"),
+        ])
+    return out.getvalue()
+
+
+def rate(label, n, seconds, report=None):
+    extra = ""
+    if report is not None:
+        created = sum(entry["status"] == "created" for entry in report)
+        extra = f"  created={created} rejected={n - created}"
+    print(f"{label:<28} {n:>7} rows  {seconds:7.2f} s  {n / seconds:10,.0f} rows/s{extra}")
+
+
+def run(n):
+    rng = random.Random(n)
+    records = make_records(n, rng)
+
+    use_temp_database()
+    scheduler.rebuild_interval_index()
+    started = time.perf_counter()
+    report = scheduler.bulk_create_meetings(records, on_conflict="skip")
+    rate("bulk_create_meetings", n, time.perf_counter() - started, report)
+
+    use_temp_database()
+    scheduler.rebuild_interval_index()
+    text = to_csv(records)
+    started = time.perf_counter()
+    report = import_csv(text)
+    rate("import_csv", n, time.perf_counter() - started, report)
+
+    use_temp_database()
+    scheduler.rebuild_interval_index()
+    sample = records[:min(n, 1000)]
+    started = time.perf_counter()
+    for record in sample:
+        scheduler.create_meeting(
+            record["title"], record["participants"],
+            record["start_time"], record["end_time"],
+        )
+    rate("create_meeting per row", len(sample), time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,87 @@
+"""
+Calendar view lookups against calendars of growing length (same density,
+a fixed set of recurring series): DayBuckets day, week and month views
+should cost the same whatever the total number of meetings.
+
+    python -m benchmarks.bench_calendar_view [N ...]
+"""
+import random
+import sys
+import time
+from datetime import timedelta
+
+from agent.day_buckets import DayBuckets
+from agent.recurrence import iter_occurrences
+
+from ._common import BASE_TIME, timed
+
+SERIES = 100  # standing recurring meetings, whatever the history length
+PER_DAY = 40  # calendars grow in length, not density
+
+
+def make_rows(n, rng, days):
+    rows = []
+    for meeting_id in range(1, n + 1):
+        start = BASE_TIME + timedelta(minutes=15 * rng.randrange(4 * 24 * days))
+        end = start + timedelta(minutes=rng.choice([15, 30, 60]))
+        if meeting_id <= SERIES:
+            rtype = rng.choice(["daily", "weekly", "monthly"])
+            until = start + timedelta(days=rng.randrange(30, 365)) if rng.random() < 0.5 else None
+        else:
+            rtype, until = "none", None
+        rows.append((meeting_id, start, end, rtype, until))
+    return rows
+
+
+def reference_day(rows, day):
+    """
+    Reference answer: expand every meeting over the day.
+    """
+    day_start = BASE_TIME.replace(year=day.year, month=day.month, day=day.day, hour=0)
+    day_end = day_start + timedelta(days=1)
+    hits = []
+    for meeting_id, start, end, rtype, until in rows:
+        for occ_start, occ_end in iter_occurrences(start, end, rtype, until, day_start, day_end):
+            if occ_start >= day_start:
+                hits.append((occ_start, occ_end, meeting_id))
+    return sorted(hits)
+
+
+def run(n, lookups=200):
+    rng = random.Random(n)
+    span = max(60, n // PER_DAY)
+    rows = make_rows(n, rng, span)
+
+    started = time.perf_counter()
+    buckets = DayBuckets.build(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    days = [(BASE_TIME + timedelta(days=rng.randrange(span - 31))).date() for _ in range(lookups)]
+    for day in days[:5]:
+        assert buckets.day(day) == reference_day(rows, day), f"mismatch on {day}"
+
+    def view(length):
+        """
+        (cold, warm) microseconds per lookup: recurring days expanded
+        afresh, then served from the memo as on a Streamlit rerun.
+        """
+        def lookups_of(pending):
+            def lookup():
+                first = next(pending)
+                buckets.days(first, first + timedelta(days=length - 1))
+            return lookup
+        buckets._expanded.clear()
+        cold = timed(lookups_of(iter(days)), lookups)
+        warm = timed(lookups_of(iter(days)), lookups)
+        return f"{cold:8.1f}/{warm:7.1f}"
+
+    print(
+        f"n={n:>8,}  build={build_ms:7.1f} ms  us per view (cold/warm): "
+        f"day={view(1)}  week={view(7)}  month={view(31)}"
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,151 @@
+"""
+Concurrent create_meeting calls competing for the same slots, from threads
+of one process and then from separate processes sharing the SQLite file:
+checks that nothing is double-booked and reports bookings per second.
+
+    python -m benchmarks.bench_concurrent_booking [WRITERS ...]
+"""
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from agent import db, scheduler
+
+from ._common import BASE_TIME, use_temp_database
+
+# Pairs of meetings sharing a participant whose times overlap
+DOUBLE_BOOKINGS_SQL = text("""
+    SELECT COUNT(*)
+    FROM meeting_participants p1
+    JOIN meeting_participants p2
+      ON p2.person = p1.person AND p2.meeting_id > p1.meeting_id
+    JOIN meetings a ON a.id = p1.meeting_id
+    JOIN meetings b ON b.id = p2.meeting_id
+    WHERE a.start_time < b.end_time AND b.start_time < a.end_time
+""")
+
+
+def _write(number, attempts, choices, barrier):
+    """
+    One writer's share of the load: (bookings made, lock timeouts, error or
+    None, seconds from the barrier to the last attempt). A booking that
+    waited longer than SQLite's busy_timeout for the write lock counts as a
+    timeout and the writer carries on; any other error stops it.
+    """
+    rng = random.Random(number)
+    created = timeouts = 0
+    barrier.wait()
+    started = time.perf_counter()
+    for _ in range(attempts):
+        person, start = rng.choice(choices)
+        try:
+            meeting, _ = scheduler.create_meeting(
+                "Load", person, start, start + timedelta(minutes=30)
+            )
+        except OperationalError as exc:
+            if "database is locked" not in str(exc):
+                return created, timeouts, f"{type(exc).__name__}: {exc}", time.perf_counter() - started
+            timeouts += 1
+            continue
+        except Exception as exc:
+            return created, timeouts, f"{type(exc).__name__}: {exc}", time.perf_counter() - started
+        if meeting is not None:
+            created += 1
+    return created, timeouts, None, time.perf_counter() - started
+
+
+def _process_writer(url, number, attempts, choices, barrier, results):
+    # A process of its own: its own engine, indexes and write lock, so only
+    # BEGIN IMMEDIATE and the revision check keep it from double-booking.
+    db.configure(url)
+    scheduler.rebuild_interval_index()
+    results.put(_write(number, attempts, choices, barrier))
+
+
+def _run_threads(writers, attempts, choices):
+    barrier = threading.Barrier(writers)
+    outcomes = [None] * writers
+
+    def writer(number):
+        outcomes[number] = _write(number, attempts, choices, barrier)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def _run_processes(url, writers, attempts, choices):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(writers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_process_writer, args=(url, i, attempts, choices, barrier, results))
+        for i in range(writers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0, f"writer process exited with {process.exitcode}"
+    return outcomes
+
+
+def run(writers, attempts_per_writer=200, people=4, slots=1000, processes=False):
+    """
+    `writers` threads of this process, or with processes=True separate
+    processes sharing the SQLite file, booking at once.
+    """
+    path = use_temp_database()
+    scheduler.rebuild_interval_index()
+
+    # Every writer draws from the same set of (person, slot) pairs,
+    # with slots overlapping their neighbours, so many attempts collide.
+    choices = [
+        (f"person {p}", BASE_TIME + timedelta(minutes=20 * i))
+        for p in range(people)
+        for i in range(slots)
+    ]
+    if processes:
+        outcomes = _run_processes(f"sqlite:///{path}", writers, attempts_per_writer, choices)
+    else:
+        outcomes = _run_threads(writers, attempts_per_writer, choices)
+    created = sum(outcome[0] for outcome in outcomes)
+    timeouts = sum(outcome[1] for outcome in outcomes)
+    errors = [outcome[2] for outcome in outcomes if outcome[2]]
+    seconds = max(outcome[3] for outcome in outcomes)
+
+    session = db.get_session()
+    double_booked = session.execute(DOUBLE_BOOKINGS_SQL).scalar()
+    stored = session.execute(text("SELECT COUNT(*) FROM meetings")).scalar()
+    session.close()
+
+    attempts = writers * attempts_per_writer
+    print(
+        f"{'processes' if processes else 'threads':<9} writers={writers:>3}  attempts={attempts:>6}  "
+        f"booked={created:>5}  {attempts / seconds:8,.0f} attempts/s  {created / seconds:7,.0f} bookings/s  "
+        f"double-booked={double_booked}  lock timeouts={timeouts}  errors={len(errors)}"
+    )
+    assert not errors, errors[0]
+    assert stored == created, "stored rows differ from successful bookings"
+    assert double_booked == 0, "double booking detected"
+
+
+if __name__ == "__main__":
+    levels = [int(arg) for arg in sys.argv[1:]] or [1, 8, 32]
+    for level in levels:
+        run(level)
+    # The same load from separate processes: the process-wide write lock no
+    # longer serialises them, the database has to.
+    for level in levels:
+        if level > 1:
+            run(level, processes=True)
@@ -0,0 +1,83 @@
+"""
+Compare the in-memory interval index against the original SQL range query
+for conflict checks.
+
+    python -m benchmarks.bench_conflicts [N ...]
+"""
+import random
+import sys
+from datetime import timedelta
+
+from agent import scheduler
+from agent.db import Meeting, get_session
+
+from ._common import seed_meetings, timed, use_temp_database
+
+
+def sql_is_conflict(session, start_time, end_time):
+    """
+    The pre-index implementation: unindexed range query + full hydration.
+    """
+    conflicts = session.query(Meeting).filter(
+        Meeting.start_time < end_time,
+        Meeting.end_time > start_time,
+    ).all()
+    return len(conflicts) > 0
+
+
+def run(n, queries=200):
+    use_temp_database()
+    slots = seed_meetings(n)
+    rng = random.Random(n)
+
+    probes = []
+    for _ in range(queries):
+        start, _ = rng.choice(slots)
+        # Half the probes land on a meeting, half in the gap after it.
+        offset = timedelta(minutes=rng.choice([10, 40]))
+        probes.append((start + offset, start + offset + timedelta(minutes=15)))
+
+    session = get_session()
+    expected = [sql_is_conflict(session, s, e) for s, e in probes]
+
+    build_us = timed(lambda: scheduler.rebuild_interval_index(session), 1)
+    got = [scheduler.is_conflict(s, e, session=session)[0] for s, e in probes]
+    assert got == expected, "index and SQL disagree"
+
+    probe_iter = iter(probes * 10)
+
+    def sql_once():
+        s, e = next(probe_iter)
+        sql_is_conflict(session, s, e)
+
+    sql_us = timed(sql_once, queries)
+
+    index = scheduler.get_interval_index()
+    probe_iter = iter(probes * 10)
+
+    def index_once():
+        s, e = next(probe_iter)
+        index.overlaps(s, e)
+
+    index_us = timed(index_once, queries)
+
+    # One meeting spanning the whole calendar must not slow every query
+    # down to a scan of everything that starts during it.
+    index.add(-1, slots[0][0], slots[-1][1])
+    probe_iter = iter(probes * 10)
+    outlier_us = timed(index_once, queries)
+    index.remove(-1)
+    session.close()
+
+    print(
+        f"n={n:>7}  build={build_us / 1000:8.1f} ms  "
+        f"sql={sql_us:9.1f} us/query  index={index_us:6.2f} us/query  "
+        f"speedup={sql_us / index_us:8.0f}x  "
+        f"with one calendar-long meeting={outlier_us:6.2f} us/query"
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,132 @@
+"""
+Peak memory and time of the streaming exports (CSV, iCalendar, Parquet,
+plain text) against the old DataFrame-based CSV export.
+
+    python -m benchmarks.bench_export [N ...]    (default N = 1,000,000)
+
+Each export runs in a fresh subprocess so its peak RSS is its own; the
+figure reported is the peak over the process's RSS just before exporting
+(Linux only: uses /proc/self/status and clear_refs).
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from agent import db
+
+from ._common import seed_meetings, use_temp_database
+
+MODES = ["dataframe-csv", "csv", "ics", "parquet", "txt"]
+
+
+def _status_mb(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024  # kB
+    raise RuntimeError(f"{field} not in /proc/self/status")
+
+
+def reset_peak_rss():
+    """
+    Restart peak-RSS tracking (VmHWM) from the current RSS, so transient
+    allocations made while importing do not count.
+    """
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def legacy_csv():
+    """
+    What the Manage tab did before: every row in a DataFrame, then one CSV
+    string.
+    """
+    import pandas as pd
+    from agent.scheduler import get_all_meetings
+
+    df = pd.DataFrame([
+        {
+            "ID": m.id,
+            "Title": m.title,
+            "Participants": m.participants or "",
+            "Start": m.start_time.strftime("%Y-%m-%d %H:%M"),
+            "End": m.end_time.strftime("%Y-%m-%d %H:%M"),
+            "Source": m.source,
+            "Recurrence": m.recurrence_type,
+            "Created": m.created_at.strftime("%Y-%m-%d %H:%M"),
+        }
+        for m in get_all_meetings()
+    ])
+    return len(df.to_csv(index=False).encode("utf-8"))
+
+
+def child(mode, url):
+    """
+    Run one export in this (fresh) process and print a JSON result line.
+    """
+    import pandas  # noqa: F401 -- imported up front so no mode pays for it in RSS
+    import pyarrow.parquet  # noqa: F401
+    from agent import exporters
+
+    db.configure(url)
+    gc.collect()
+    reset_peak_rss()
+    baseline = _status_mb("VmRSS")
+    started = time.perf_counter()
+    if mode == "dataframe-csv":
+        size = legacy_csv()
+    else:
+        stream = exporters.export_stream(mode)
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+    seconds = time.perf_counter() - started
+    print(json.dumps({
+        "mode": mode, "bytes": size, "seconds": seconds,
+        "peak_rss_growth_mb": _status_mb("VmHWM") - baseline,
+    }))
+
+
+def check_ics_attendees():
+    """
+    ICS attendees are the people the scheduler scopes conflicts to,
+    whatever separators the participants field uses.
+    """
+    from agent import exporters
+    from agent.participants import split_participants
+    from agent.scheduler import MeetingRow
+
+    participants = "Rahul; Priya and Sam & rahul"
+    start = datetime(2025, 1, 6, 9)
+    row = MeetingRow(1, "Sync", participants, start, start + timedelta(hours=1), "local", start, "none", None)
+    lines = exporters._ics_event(row, "Asia/Kolkata", "20250101T000000Z")
+    attendees = [line.rsplit(":", 1)[1] for line in lines if line.startswith("ATTENDEE")]
+    assert attendees == split_participants(participants), attendees
+
+
+def run(n):
+    check_ics_attendees()
+    path = use_temp_database()
+    seed_meetings(n)
+    url = f"sqlite:///{path}"
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_export", "--child", mode, url],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"n={n:>9,}  {mode:<14} {result['bytes'] / 2**20:8.1f} MB out  "
+            f"{result['seconds']:7.2f} s  peak RSS +{result['peak_rss_growth_mb']:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+    else:
+        for n in [int(arg) for arg in sys.argv[1:]] or [1_000_000]:
+            run(n)
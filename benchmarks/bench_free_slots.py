@@ -0,0 +1,109 @@
+"""
+find_free_slots for many participants over a quarter, sweep vs bitmap.
+
+    python -m benchmarks.bench_free_slots [PARTICIPANTS]
+"""
+import random
+import sys
+import time
+from datetime import timedelta
+
+from agent import db, scheduler
+from agent.db import Meeting, MeetingParticipant
+
+from ._common import BASE_TIME, use_temp_database
+
+QUARTER = timedelta(days=91)
+
+
+def seed_calendars(people, per_day, rng):
+    """
+    Give every person `per_day` random 30/60-minute meetings per working day
+    over the quarter, plus one weekly recurring meeting each. Meetings
+    cluster around a few common start times, as in a meeting-heavy org.
+    """
+    session = db.get_session()
+    meetings, links = [], []
+    meeting_id = 0
+    for person in people:
+        for day in range(QUARTER.days):
+            date = BASE_TIME + timedelta(days=day)
+            if date.weekday() >= 5:
+                continue
+            for _ in range(per_day):
+                meeting_id += 1
+                start = date.replace(hour=rng.choice([9, 11, 14, 16]), minute=rng.choice([0, 30]))
+                meetings.append({
+                    "id": meeting_id, "title": "busy", "participants": person,
+                    "start_time": start,
+                    "end_time": start + timedelta(minutes=rng.choice([30, 60])),
+                    "source": "bench", "recurrence_type": "none",
+                })
+                links.append({"meeting_id": meeting_id, "person": person})
+        meeting_id += 1
+        start = BASE_TIME.replace(hour=rng.choice([9, 11, 14])) + timedelta(days=rng.randrange(5))
+        meetings.append({
+            "id": meeting_id, "title": "1:1", "participants": person,
+            "start_time": start, "end_time": start + timedelta(minutes=30),
+            "source": "bench", "recurrence_type": "weekly",
+        })
+        links.append({"meeting_id": meeting_id, "person": person})
+    session.bulk_insert_mappings(Meeting, meetings)
+    session.bulk_insert_mappings(MeetingParticipant, links)
+    session.commit()
+    session.close()
+    return len(meetings)
+
+
+def run(n_people, per_day=2, n_slots=10):
+    rng = random.Random(n_people)
+    use_temp_database()
+    people = [f"person {i}" for i in range(n_people)]
+    total = seed_calendars(people, per_day, rng)
+
+    window = (BASE_TIME, BASE_TIME + QUARTER)
+    started = time.perf_counter()
+    scheduler.rebuild_interval_index()
+    build_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    lists = scheduler._busy_interval_lists(people, *window)
+    fetch_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    busy = scheduler._merge_busy(lists)
+    merge_ms = (time.perf_counter() - started) * 1000
+
+    results = {}
+    for mode in scheduler.FREE_SLOT_MODES:
+        search = scheduler._free_slots_bitmap if mode == "bitmap" else scheduler._free_slots_sweep
+        started = time.perf_counter()
+        for _ in range(20):
+            results[mode] = search(
+                busy, *window, timedelta(minutes=30), scheduler.WORKING_HOURS,
+                scheduler.WORKING_DAYS, scheduler.SLOT_GRANULARITY, n_slots,
+            )
+        results[mode + "_ms"] = (time.perf_counter() - started) * 1000 / 20
+    assert results["sweep"] == results["bitmap"], "sweep and bitmap disagree"
+
+    started = time.perf_counter()
+    slots = scheduler.find_free_slots(people, 30, window, n=n_slots)
+    total_ms = (time.perf_counter() - started) * 1000
+
+    too_long = (BASE_TIME, BASE_TIME + scheduler.MAX_FREE_SLOT_WINDOW + timedelta(days=1))
+    for duration, n, bad_window in ((0, 1, window), (-30, 1, window), (30, -1, window), (30, 1, too_long)):
+        try:
+            scheduler.find_free_slots(people[:1], duration, bad_window, n=n, mode="bitmap")
+        except ValueError:
+            continue
+        raise AssertionError(f"duration={duration} n={n} window={bad_window} accepted")
+
+    print(f"participants={n_people} meetings={total} busy blocks={len(busy)}")
+    print(f"  index build:     {build_ms:8.1f} ms (once per process)")
+    print(f"  lookup + expand: {fetch_ms:8.1f} ms")
+    print(f"  k-way merge:     {merge_ms:8.1f} ms")
+    print(f"  sweep search:    {results['sweep_ms']:8.2f} ms")
+    print(f"  bitmap search:   {results['bitmap_ms']:8.2f} ms")
+    print(f"  find_free_slots: {total_ms:8.1f} ms end to end -> {len(slots)} slots, first {slots[:1]}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
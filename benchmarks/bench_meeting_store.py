@@ -0,0 +1,133 @@
+"""
+The columnar meeting snapshot (agent/meeting_store.py) on a synthetic
+calendar of N meetings (default 100,000):
+
+- memory per meeting, which must stay under BYTES_PER_MEETING_BUDGET;
+- week range filters, against the keyset SQL read of the same window;
+- Manage-tab pages, against slicing the full SQL listing;
+- day bucketing of a month and overlap counts over a week of slots;
+- conflict pre-checks, which must never miss a conflict is_conflict finds;
+- folding writes into a new snapshot.
+
+    python -m benchmarks.bench_meeting_store [N]
+"""
+import random
+import sys
+import time
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+
+from agent import scheduler
+from agent.meeting_store import BYTES_PER_MEETING_BUDGET
+from agent.timezones import to_utc_minutes
+
+from ._common import BASE_TIME, seed_synthetic, timed, use_temp_database
+
+PER_DAY = 40
+OPS = 200
+
+
+def run(n):
+    rng = random.Random(0)
+    use_temp_database()
+    people = seed_synthetic(n, per_day=PER_DAY)
+    started = time.perf_counter()
+    scheduler.rebuild_interval_index()
+    columns = scheduler.get_meeting_columns()
+    print(f"n={n:,}: indexes + snapshot built in {time.perf_counter() - started:.2f} s")
+
+    per_meeting = columns.bytes_per_meeting()
+    print(f"snapshot: {columns.nbytes / 1e6:.1f} MB, {per_meeting:.1f} bytes per meeting "
+          f"(budget {BYTES_PER_MEETING_BUDGET}), {len(columns.people)} interned people")
+    assert per_meeting <= BYTES_PER_MEETING_BUDGET, per_meeting
+
+    span_days = max(1, n // PER_DAY)
+    starts = [BASE_TIME + timedelta(days=rng.randrange(span_days)) for _ in range(OPS)]
+
+    # Week range filter vs SQL.
+    for start in starts[:20]:
+        end = start + timedelta(days=7)
+        rows, _ = scheduler.get_meetings_in_range(start, end)
+        positions = columns.in_range(to_utc_minutes(start), to_utc_minutes(end, round_up=True))
+        assert columns.ids[positions].tolist() == [row.id for row in rows]
+    pending = iter(starts)
+    us = timed(lambda: columns.in_range(*(lambda s: (to_utc_minutes(s), to_utc_minutes(s + timedelta(days=7))))(next(pending))), OPS)
+    print(f"week range filter: {us:8.1f} us")
+
+    # Manage-tab pages vs the full listing.
+    listing = [row.id for row in scheduler.get_all_meetings()]
+    for page in (0, 1, len(listing) // 40):
+        rows, total = scheduler.get_meeting_page(page, 20)
+        assert total == len(listing)
+        assert sorted(row.id for row in rows) == sorted(listing[page * 20:(page + 1) * 20])
+    pages = [rng.randrange(max(1, len(listing) // 20)) for _ in range(OPS)]
+    pending = iter(pages)
+    us = timed(lambda: columns.ids[next(pending) * 20:][:20].tolist(), OPS)
+    print(f"page slice:        {us:8.1f} us")
+
+    # Day bucketing of a month vs counting SQL rows by date.
+    first = starts[0].date()
+    last = first + timedelta(days=30)
+    counts = columns.day_counts(first, last)
+    rows, _ = scheduler.get_meetings_in_range(
+        starts[0].replace(hour=0, minute=0) - timedelta(days=1), starts[0] + timedelta(days=32)
+    )
+    expected = Counter(row.start_time.date() for row in rows)
+    assert counts.tolist() == [expected.get(first + timedelta(days=d), 0) for d in range(31)]
+    pending = iter(starts)
+    us = timed(lambda: columns.day_counts(*(lambda d: (d, d + timedelta(days=30)))(next(pending).date())), OPS)
+    print(f"month day buckets: {us:8.1f} us")
+
+    # Overlap counts for every 15-minute slot of a week.
+    week = to_utc_minutes(starts[1])
+    slot_starts = week + 15 * np.arange(7 * 96)
+    slot_counts = columns.overlap_counts(slot_starts, slot_starts + 15)
+    for i in range(0, len(slot_starts), 97):
+        positions = columns.in_range(int(slot_starts[i]), int(slot_starts[i]) + 15)
+        assert slot_counts[i] == len(positions), (i, slot_counts[i], len(positions))
+    us = timed(lambda: columns.overlap_counts(slot_starts, slot_starts + 15), 50)
+    print(f"overlap counts:    {us:8.1f} us for {len(slot_starts)} slots")
+
+    # Pre-checks never miss what is_conflict finds.
+    probes = [
+        (BASE_TIME.replace(hour=9) + timedelta(days=rng.randrange(span_days), minutes=15 * rng.randrange(32)),
+         rng.sample(people, 2))
+        for _ in range(OPS)
+    ]
+    ruled_out = 0
+    for start, names in probes:
+        end = start + timedelta(minutes=30)
+        one_off, series = scheduler.precheck_conflicts(start, end, participants=names)
+        conflict, meetings = scheduler.is_conflict(start, end, participants=names)
+        assert {meeting.id for meeting in meetings} <= set(one_off) | set(series)
+        ruled_out += not (one_off or series)
+    pending = iter(probes)
+    us = timed(lambda: (lambda p: scheduler.precheck_conflicts(p[0], p[0] + timedelta(minutes=30), participants=p[1]))(next(pending)), OPS)
+    print(f"conflict pre-check:{us:8.1f} us ({ruled_out}/{OPS} probes ruled out without the exact check)")
+
+    # Writes are folded into the next snapshot.
+    after = BASE_TIME + timedelta(days=span_days + 1)
+    created = []
+    for i in range(OPS):
+        meeting, error = scheduler.create_meeting(
+            f"Store {i}", f"store{i}", after + timedelta(hours=i), after + timedelta(hours=i, minutes=30)
+        )
+        assert error is None, error
+        created.append(meeting.id)
+    scheduler.delete_meeting(created[0])
+    started = time.perf_counter()
+    merged = scheduler.get_meeting_columns()
+    merge_ms = (time.perf_counter() - started) * 1000
+    assert len(merged) == len(columns) + OPS - 1
+    scheduler.rebuild_interval_index()
+    fresh = scheduler.get_meeting_columns()
+    for name in ("ids", "start", "end", "recurrence", "until", "person_offsets"):
+        assert np.array_equal(getattr(merged, name), getattr(fresh, name)), name
+    assert [merged.people[code] for code in merged.person_codes] == [fresh.people[code] for code in fresh.person_codes]
+    print(f"fold {OPS + 1} writes:  {merge_ms:8.1f} ms (matches a rebuild)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if sys.argv[1:] else 100_000)
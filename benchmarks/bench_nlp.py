@@ -0,0 +1,93 @@
+"""
+Check parse_meeting_request against the golden corpus, then measure its
+throughput, uncached and through the parse cache.
+
+    python -m benchmarks.bench_nlp
+
+nlp_golden.json holds the outputs of the original regex/dateutil parser
+for a fixed reference time; the parser must reproduce them exactly.
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from agent.cache import TTLCache, parse_cache
+from agent.nlp import parse_meeting_request, parse_meeting_request_cached
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "nlp_golden.json")
+
+
+def load_golden():
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        golden = json.load(f)
+    return datetime.fromisoformat(golden["now"]), golden["cases"]
+
+
+def _encode(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def check_golden(now, cases):
+    failures = []
+    for case in cases:
+        got = {
+            key: _encode(value)
+            for key, value in parse_meeting_request(case["input"], now=now).items()
+        }
+        if got != case["expected"]:
+            failures.append((case["input"], case["expected"], got))
+    for text, expected, got in failures:
+        print(f"MISMATCH {text!r}\n  expected {expected}\n  got      {got}")
+    assert not failures, f"{len(failures)}/{len(cases)} golden cases differ"
+    print(f"golden corpus: {len(cases)} cases ok")
+
+
+def check_cached(now, cases):
+    """
+    Cached parses anywhere in the reference hour match fresh ones of the
+    same input, whitespace variants included, and a cache entry expires
+    after its TTL.
+    """
+    parse_cache.clear()
+    texts = [case["input"] for case in cases]
+    # The same requests with their spaces doubled: titles and participants
+    # keep them, so they must not be served each other's results.
+    texts += [text.replace(" ", "  ") for text in texts]
+    for minutes in (0, 17, 59):
+        at = now.replace(minute=0) + timedelta(minutes=minutes)
+        for text in texts:
+            assert parse_meeting_request_cached(text, now=at) == parse_meeting_request(text, now=at), text
+    metrics = parse_cache.metrics()
+    assert metrics["misses"] == len(set(texts)), metrics
+
+    clock = [0.0]
+    cache = TTLCache(max_entries=2, ttl=10, clock=lambda: clock[0])
+    assert cache.get("a", lambda: 1) == 1 and cache.get("a", lambda: 2) == 1
+    clock[0] = 11
+    assert cache.get("a", lambda: 3) == 3
+    cache.get("b", lambda: 4)
+    cache.get("c", lambda: 5)
+    assert cache.metrics()["expired"] == 1 and cache.metrics()["evicted"] == 1
+    print(f"parse cache: {metrics['hits']} hits / {metrics['misses']} misses, matches fresh parses")
+
+
+def throughput(now, texts, seconds=2.0, parse=parse_meeting_request):
+    parsed = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for text in texts:
+            parse(text, now=now)
+        parsed += len(texts)
+    return parsed / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    now, cases = load_golden()
+    check_golden(now, cases)
+    check_cached(now, cases)
+    texts = [case["input"] for case in cases]
+    rate = throughput(now, texts)
+    print(f"parse_meeting_request:        {rate:,.0f} parses/s")
+    rate = throughput(now, texts, parse=parse_meeting_request_cached)
+    print(f"parse_meeting_request_cached: {rate:,.0f} parses/s (warm)")
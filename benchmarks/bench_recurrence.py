@@ -0,0 +1,100 @@
+"""
+Benchmark the recurrence engine: 10k recurring series queried against a
+one-year window.
+
+    python -m benchmarks.bench_recurrence [N_SERIES]
+"""
+import random
+import sys
+import time
+from datetime import timedelta
+
+from agent.recurrence import Series, SeriesIndex, add_months
+
+from ._common import BASE_TIME, timed
+
+YEAR = timedelta(days=365)
+
+
+def make_series(n, rng):
+    rows = []
+    for meeting_id in range(1, n + 1):
+        rtype = rng.choices(["daily", "weekly", "monthly"], weights=[1, 6, 3])[0]
+        start = BASE_TIME + timedelta(minutes=15 * rng.randrange(4 * 24 * 365))
+        end = start + timedelta(minutes=rng.choice([15, 30, 60]))
+        until = start + timedelta(days=rng.randrange(30, 730)) if rng.random() < 0.5 else None
+        rows.append((meeting_id, start, end, rtype, until))
+    return rows
+
+
+def enumerate_hits(rows, start, end):
+    """
+    Reference answer: walk every occurrence from each series' first one.
+    """
+    hits = set()
+    for meeting_id, s, e, rtype, until in rows:
+        series = Series(meeting_id, s, e, rtype, until)
+        k = 0
+        while series.last is None or k <= series.last:
+            if rtype == "monthly":
+                occ_start = add_months(s, k)
+            else:
+                occ_start = s + k * (timedelta(days=1) if rtype == "daily" else timedelta(weeks=1))
+            if occ_start >= end:
+                break
+            if occ_start + series.duration > start:
+                hits.add(meeting_id)
+                break
+            k += 1
+    return hits
+
+
+def run(n, queries=500):
+    rng = random.Random(n)
+    rows = make_series(n, rng)
+
+    started = time.perf_counter()
+    index = SeriesIndex.build(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    window_start = BASE_TIME + timedelta(days=180)
+    window_end = window_start + YEAR
+    probes = []
+    for _ in range(queries):
+        s = window_start + timedelta(minutes=15 * rng.randrange(4 * 24 * 365))
+        probes.append((s, s + timedelta(minutes=30)))
+
+    sample = probes[:5]
+    for s, e in sample:
+        assert set(index.find(s, e)) == enumerate_hits(rows, s, e), "index disagrees with enumeration"
+
+    probe_iter = iter(probes)
+    find_us = timed(lambda: index.find(*next(probe_iter)), queries)
+    probe_iter = iter(probes)
+    any_us = timed(lambda: index.overlaps(*next(probe_iter)), queries)
+
+    enum_us = timed(lambda: enumerate_hits(rows, *sample[0]), 3)
+
+    started = time.perf_counter()
+    occurrences = sum(1 for _ in index.occurrences(window_start, window_end))
+    expand_ms = (time.perf_counter() - started) * 1000
+
+    proposal = Series(None, window_start, window_start + timedelta(minutes=30), "weekly")
+    started = time.perf_counter()
+    clashes = sum(
+        1
+        for s, e in proposal.occurrences(window_start, window_end)
+        if index.overlaps(s, e)
+    )
+    proposal_ms = (time.perf_counter() - started) * 1000
+
+    print(f"series={n}  build={build_ms:.1f} ms")
+    print(f"  range hit (ids):      {find_us:10.1f} us/query")
+    print(f"  range hit (any):      {any_us:10.1f} us/query")
+    print(f"  full enumeration:     {enum_us:10.1f} us/query  ({enum_us / find_us:.0f}x slower)")
+    print(f"  expand 1y window:     {expand_ms:10.1f} ms  ({occurrences} occurrences)")
+    print(f"  weekly proposal, 1y:  {proposal_ms:10.1f} ms  ({clashes} clashing weeks)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
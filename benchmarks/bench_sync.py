@@ -0,0 +1,186 @@
+"""
+Calendar sync against the in-memory fake provider:
+
+- a full resync of N remote events (default 10,000), interrupted halfway
+  and resumed, timed per page;
+- pushing N local meetings in provider batches, with injected 503s;
+- incremental pulls of remote edits (recurrence included) and
+  cancellations, and the echo of our own pushes being skipped;
+- remote events that clash with local meetings kept and retried;
+- a SyncWorker round trip, to show enqueueing does not wait on the provider.
+
+    python -m benchmarks.bench_sync [N]
+"""
+import sys
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from agent import db, scheduler, timezones
+from agent.calendar_integration import FakeCalendarProvider
+from agent.db import Meeting, SyncedEvent
+from agent.sync import SYNC_PENDING_SOURCE, SyncEngine, SyncWorker
+
+from ._common import BASE_TIME, use_temp_database
+
+
+def count(query):
+    with db.session_scope() as session:
+        return session.execute(query).scalar()
+
+
+def meetings_from(source):
+    return count(select(func.count()).select_from(Meeting).where(Meeting.source == source))
+
+
+def seed_remote(provider, n):
+    for i in range(n):
+        start = BASE_TIME + timedelta(hours=i)
+        provider.put_event(
+            "primary", title=f"Remote {i}", participants=f"person{i % 50}",
+            start_time=start, end_time=start + timedelta(minutes=30),
+        )
+
+
+def run(n):
+    use_temp_database()
+    scheduler.rebuild_interval_index()
+    provider = FakeCalendarProvider()
+    engine = SyncEngine(provider, sleep=lambda seconds: None)
+
+    # Full resync, interrupted after half the pages, then resumed by a new
+    # engine (as after a restart).
+    seed_remote(provider, n)
+    pages = -(-n // engine.page_size)
+    started = time.perf_counter()
+    assert engine.pull(max_pages=pages // 2) is False
+    half = count(select(func.count()).select_from(Meeting))
+    provider.fail_next(times=2)  # the first requests after the restart fail
+    resumed = SyncEngine(provider, sleep=lambda seconds: None)
+    assert resumed.pull() is True
+    seconds = time.perf_counter() - started
+    assert meetings_from("google_calendar") == n, meetings_from("google_calendar")
+    assert count(select(func.count()).select_from(SyncedEvent)) == n
+    print(
+        f"full resync of {n:,} events: {seconds:6.2f} s "
+        f"({seconds / pages * 1000:6.1f} ms per {engine.page_size}-event page), "
+        f"{half:,} before the interruption, {resumed.stats['retries']} retries, "
+        f"{provider.requests['list']} list requests"
+    )
+
+    # Nothing changed remotely: the incremental pull is one empty page.
+    before = dict(resumed.stats)
+    assert resumed.pull() is True
+    assert resumed.stats == before
+
+    # Push n local meetings waiting for sync, with a 503 in the middle.
+    start = BASE_TIME + timedelta(days=3650)
+    report = scheduler.bulk_create_meetings(
+        [
+            {"title": f"Local {i}", "participants": f"local{i % 50}",
+             "start_time": start + timedelta(hours=i),
+             "end_time": start + timedelta(hours=i, minutes=30)}
+            for i in range(n)
+        ],
+        source=SYNC_PENDING_SOURCE,
+    )
+    ids = [entry["meeting_id"] for entry in report]
+    batches_before = provider.requests["batch"]
+    provider.fail_next(times=1)
+    started = time.perf_counter()
+    assert resumed.push([("save", meeting_id) for meeting_id in ids]) == []
+    seconds = time.perf_counter() - started
+    assert meetings_from(SYNC_PENDING_SOURCE) == 0
+    assert len(provider.live_events("primary")) == 2 * n
+    print(
+        f"push of {n:,} creates: {seconds:6.2f} s in "
+        f"{provider.requests['batch'] - batches_before} batch requests "
+        f"(max {provider.max_batch} per batch, one 503 retried)"
+    )
+
+    # Our own pushes come back in the next pull and are skipped.
+    before = dict(resumed.stats)
+    assert resumed.pull() is True
+    assert resumed.stats["pulled_updated"] == before["pulled_updated"]
+
+    # Remote edits and cancellations arrive incrementally.
+    with db.session_scope() as session:
+        links = session.execute(
+            select(SyncedEvent.event_id, SyncedEvent.meeting_id).order_by(SyncedEvent.meeting_id).limit(3)
+        ).all()
+    (renamed, renamed_id), (cancelled, cancelled_id), _ = links
+    until = BASE_TIME + timedelta(days=60)
+    provider.put_event(
+        "primary", renamed, title="Renamed remotely",
+        recurrence_type="weekly", recurrence_until=timezones.localize(until),
+    )
+    provider.cancel_event("primary", cancelled)
+    assert resumed.pull() is True
+    with db.session_scope() as session:
+        meeting = session.get(Meeting, renamed_id)
+        assert meeting.title == "Renamed remotely"
+        assert (meeting.recurrence_type, meeting.recurrence_until) == ("weekly", until), meeting.recurrence_type
+        assert session.get(SyncedEvent, ("primary", renamed)).error is None
+        assert session.get(Meeting, cancelled_id) is None
+
+    # Local edit and delete pushed back.
+    local_id = ids[0]
+    scheduler.edit_meeting(local_id, title="Renamed locally")
+    scheduler.delete_meeting(ids[1])
+    assert resumed.push([("save", local_id), ("delete", ids[1])]) == []
+    events = {event["title"] for event in provider.live_events("primary")}
+    assert "Renamed locally" in events and "Local 1" not in events
+
+    # Remote events that clash with local meetings are kept, shown in the
+    # status count and retried by later pulls; a cancelled one is dropped.
+    slot = BASE_TIME - timedelta(days=7)
+    blocker, error = scheduler.create_meeting("Local blocker", "clash", slot, slot + timedelta(hours=1))
+    assert error is None, error
+    clashing = [
+        provider.put_event(
+            "primary", title=f"Clashing {i}", participants="clash",
+            start_time=timezones.localize(slot), end_time=timezones.localize(slot + timedelta(minutes=30)),
+        )
+        for i in range(2)
+    ]
+    conflicts = resumed.stats["pull_conflicts"]
+    assert resumed.pull() is True
+    assert resumed.stats["pull_conflicts"] == conflicts + 2
+    assert resumed.unapplied_count() == 2
+    provider.cancel_event("primary", clashing[1])
+    assert resumed.pull() is True
+    assert resumed.unapplied_count() == 1
+    scheduler.delete_meeting(blocker.id)
+    assert resumed.pull() is True  # nothing new remotely: only the retry
+    assert resumed.unapplied_count() == 0
+    with db.session_scope() as session:
+        meeting_id = session.get(SyncedEvent, ("primary", clashing[0])).meeting_id
+        assert session.get(Meeting, meeting_id).title == "Clashing 0"
+
+    # Expired sync token: falls back to a full listing, nothing duplicated.
+    provider.expire_sync_tokens()
+    total = count(select(func.count()).select_from(Meeting))
+    assert resumed.pull() is True
+    assert count(select(func.count()).select_from(Meeting)) == total
+
+    # The worker: enqueueing returns at once, the push happens off-thread.
+    worker = SyncWorker(resumed, pull_interval=3600).start()
+    meeting, error = scheduler.create_meeting(
+        "Worker meeting", "someone", BASE_TIME - timedelta(days=1),
+        BASE_TIME - timedelta(days=1) + timedelta(minutes=30), source=SYNC_PENDING_SOURCE,
+    )
+    assert error is None
+    started = time.perf_counter()
+    worker.save(meeting.id)
+    enqueue_us = (time.perf_counter() - started) * 1e6
+    deadline = time.monotonic() + 10
+    while (worker.pending() or meetings_from(SYNC_PENDING_SOURCE)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.stop(timeout=5)
+    assert meetings_from(SYNC_PENDING_SOURCE) == 0, worker.status()
+    print(f"worker: enqueue {enqueue_us:.1f} us, pushed in the background; status {worker.status()}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if sys.argv[1:] else 10_000)
@@ -0,0 +1,104 @@
+"""
+Import-time report and budget for app.py, from `python -X importtime`.
+
+`streamlit run` has imported streamlit before it executes the script, so
+streamlit is imported first and only what app.py adds on top is counted.
+The import is repeated and the fastest run kept; it fails if that run is
+over IMPORT_BUDGET_MS or pulls in a module that should load lazily.
+
+    python -m benchmarks.check_import_time [--runs 5] [--report importtime.txt]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds for `import app` once streamlit is loaded (it was ~1,200 ms
+# with pandas, streamlit_lottie and streamlit_extras imported at the top).
+IMPORT_BUDGET_MS = 700
+# Imported only by the tabs / actions that use them.
+LAZY_MODULES = (
+    "pandas", "pyarrow", "streamlit_lottie", "streamlit_extras", "dateutil.parser", "agent.nlp",
+    "agent.analytics",
+)
+# Modules listed in the report, slowest (cumulative) first.
+REPORT_TOP = 15
+
+
+def importtime(module="app"):
+    """
+    Raw `-X importtime` output (stderr) of importing `module` after
+    streamlit.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import streamlit; import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return result.stderr
+
+
+def parse(output):
+    """
+    [(name, self_us, cumulative_us, depth)] in import order, from
+    `-X importtime` output.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def app_imports(modules, module="app"):
+    """
+    The modules imported while `module` was (they are listed before it),
+    and its cumulative time in microseconds.
+    """
+    names = [name for name, _, _, _ in modules]
+    end = names.index(module)
+    start = end
+    # Nested imports come first, at a greater depth than `module` itself.
+    while start > 0 and modules[start - 1][3] > modules[end][3]:
+        start -= 1
+    return modules[start:end], modules[end][2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--report", help="write the raw importtime output of the fastest run here")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for _ in range(args.runs):
+        output = importtime()
+        nested, total_us = app_imports(parse(output))
+        runs.append((total_us, nested, output))
+    total_us, nested, output = min(runs, key=lambda run: run[0])
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(output)
+
+    print(f"import app: {total_us / 1000:.0f} ms (fastest of {args.runs}), budget {IMPORT_BUDGET_MS} ms")
+    direct = [module for module in nested if module[3] == nested[-1][3]] if nested else []
+    for name, _, cumulative_us, _ in sorted(direct, key=lambda module: -module[2])[:REPORT_TOP]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    loaded = {name for name, _, _, _ in nested}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    assert not eager, f"imported at startup, should be lazy: {', '.join(eager)}"
+    assert total_us <= IMPORT_BUDGET_MS * 1000, (
+        f"import app took {total_us / 1000:.0f} ms, over the {IMPORT_BUDGET_MS} ms budget"
+    )
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
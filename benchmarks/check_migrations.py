@@ -0,0 +1,108 @@
+"""
+Upgrade a database in the original schema (the one data/meetings.db ships
+with: no recurrence columns, no indexes, no participants table) that
+already holds meetings, and assert every migration applies and the data
+comes through: participants backfilled, epoch minutes filled in, indexes
+created, conflicts found, and ids of deleted meetings never handed out
+again.
+
+    python -m benchmarks.check_migrations
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import timedelta
+
+from sqlalchemy import inspect, select
+
+from agent import db, scheduler
+from agent.timezones import to_utc_minutes
+
+from ._common import BASE_TIME
+
+SHIPPED_DATABASE = os.path.join(os.path.dirname(__file__), os.pardir, "data", "meetings.db")
+BASELINE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER NOT NULL,
+    title VARCHAR NOT NULL,
+    participants VARCHAR,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    source VARCHAR,
+    created_at DATETIME,
+    PRIMARY KEY (id)
+)
+"""
+HOUR = timedelta(hours=1)
+
+
+def baseline_database(rows):
+    """
+    A temp SQLite file in the original schema holding `rows` of
+    (title, participants, start, end).
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="meetings-migrate-"), "meetings.db")
+    if os.path.exists(SHIPPED_DATABASE):
+        shutil.copyfile(SHIPPED_DATABASE, path)
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO meetings (title, participants, start_time, end_time, source) "
+        "VALUES (?, ?, ?, ?, 'local')",
+        [(title, names, start.isoformat(" "), end.isoformat(" ")) for title, names, start, end in rows],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def main():
+    t = BASE_TIME
+    rows = [
+        ("Sync", "Rahul, Priya", t, t + HOUR),
+        ("Review", "Sam", t + 2 * HOUR, t + 3 * HOUR),
+        ("Solo", None, t + 4 * HOUR, t + 5 * HOUR),
+    ]
+    db.configure(f"sqlite:///{baseline_database(rows)}")
+    db.init_db()
+
+    with db.session_scope() as session:
+        versions = session.execute(select(db.SchemaVersion.version)).scalars().all()
+        assert sorted(versions) == list(range(1, db.SCHEMA_VERSION + 1)), versions
+        meetings = session.execute(select(db.Meeting).order_by(db.Meeting.id)).scalars().all()
+        assert [m.title for m in meetings] == [row[0] for row in rows]
+        for meeting, (_, _, start, end) in zip(meetings, rows):
+            assert meeting.recurrence_type == "none"
+            assert meeting.start_minute == to_utc_minutes(start), meeting.start_minute
+            assert meeting.end_minute == to_utc_minutes(end, round_up=True)
+        people = session.execute(
+            select(db.MeetingParticipant.person).order_by(db.MeetingParticipant.person)
+        ).scalars().all()
+        assert people == ["priya", "rahul", "sam"], people
+
+    with db.engine.connect() as conn:
+        indexes = {index["name"] for index in inspect(conn).get_indexes("meetings")}
+    expected = {index.name for index in db.Meeting.__table__.indexes}
+    assert expected <= indexes, expected - indexes
+
+    with db.engine.connect() as conn:
+        ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'meetings'").scalar()
+        assert "AUTOINCREMENT" in ddl, ddl
+        assert conn.exec_driver_sql("PRAGMA foreign_key_check").all() == []
+
+    scheduler.rebuild_interval_index()
+    _, error = scheduler.create_meeting("Clash", "priya", t + HOUR / 2, t + HOUR)
+    assert error, "upgraded meeting does not conflict"
+    newest = meetings[-1].id
+    ok, error = scheduler.delete_meeting(newest)
+    assert ok, error
+    meeting, error = scheduler.create_meeting("Later", "sam", t + 6 * HOUR, t + 7 * HOUR)
+    assert error is None, error
+    assert meeting.id > newest, f"id {meeting.id} reused"
+    print(f"ok   upgraded a {len(rows)}-meeting database from the original schema "
+          f"through {db.SCHEMA_VERSION} migrations")
+
+
+if __name__ == "__main__":
+    main()
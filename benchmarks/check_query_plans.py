@@ -0,0 +1,95 @@
+"""
+Assert that the hot queries are answered from the composite indexes, using
+SQLite's EXPLAIN QUERY PLAN on a seeded temp database.
+
+    python -m benchmarks.check_query_plans
+
+tests/test_query_plans.py runs the same checks under pytest.
+"""
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from agent import db
+from agent.timezones import to_utc_minutes
+
+from ._common import BASE_TIME, seed_meetings, use_temp_database
+
+# (description, SQL, indexes of which one is expected in the plan)
+HOT_QUERIES = [
+    (
+        "overlap predicate (is_conflict)",
+        "SELECT id FROM meetings WHERE start_time < :end AND end_time > :start",
+        ("ix_meetings_start_end",),
+    ),
+    (
+        "bounded overlap on epoch minutes (get_meetings_in_range)",
+        "SELECT id FROM meetings WHERE start_minute < :end_minute "
+        "AND start_minute >= :start_minute - 60 AND end_minute > :start_minute",
+        ("ix_meetings_start_end_minute",),
+    ),
+    (
+        "list ordered by start (get_all_meetings)",
+        "SELECT * FROM meetings ORDER BY start_time",
+        # Both indexes lead with start_time; the planner may pick either.
+        ("ix_meetings_start_end", "ix_meetings_start_id"),
+    ),
+    (
+        "keyset page after a cursor (get_meetings_in_range)",
+        "SELECT id FROM meetings WHERE (start_time, id) > (:start, 0) "
+        "ORDER BY start_time, id LIMIT 21",
+        # A range on the index, not a scan of all of it.
+        ("ix_meetings_start_id (start_time>?)",),
+    ),
+    (
+        "recurring series by type",
+        "SELECT id FROM meetings WHERE recurrence_type = 'weekly' AND start_time < :end",
+        ("ix_meetings_recurrence_start",),
+    ),
+    (
+        "meetings of one person",
+        "SELECT meeting_id FROM meeting_participants WHERE person = :person",
+        ("ix_meeting_participants_person",),
+    ),
+]
+
+
+def query_plan(conn, sql, params):
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def seeded_database():
+    """
+    Seed a temp database and ANALYZE it; returns the parameters to plan
+    HOT_QUERIES with.
+    """
+    use_temp_database()
+    seed_meetings(2_000)
+    with db.engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    params = {
+        "start": BASE_TIME + timedelta(days=3),
+        "end": BASE_TIME + timedelta(days=3, hours=1),
+        "person": "rahul",
+    }
+    params["start_minute"] = to_utc_minutes(params["start"])
+    params["end_minute"] = to_utc_minutes(params["end"])
+    return params
+
+
+def main():
+    params = seeded_database()
+    failures = 0
+    with db.engine.connect() as conn:
+        for description, sql, expected in HOT_QUERIES:
+            plan = query_plan(conn, sql, params)
+            ok = any(index in plan for index in expected)
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {description}: {plan}")
+
+    assert not failures, f"{failures} hot queries do not use their index"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Run the booking paths against each storage backend and assert they agree:
+per-person conflicts, edits, bulk import, concurrent writers, writes by
+another process, archival and maintenance, and no leaked connections.
+
+    python -m benchmarks.check_storage [DATABASE_URL ...]
+
+Without arguments this checks a temp SQLite file and, if the optional
+`pgserver` and `psycopg2` packages are installed, a throwaway local
+Postgres. A URL given on the command line must point at a scratch
+database: its tables are dropped first.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from agent import archive, db, scheduler
+
+from ._common import BASE_TIME
+from .bench_concurrent_booking import DOUBLE_BOOKINGS_SQL
+
+HOUR = timedelta(hours=1)
+
+
+def postgres_stand_in():
+    """
+    URL of a throwaway local Postgres, or None if pgserver is not installed.
+    """
+    try:
+        import pgserver
+        import psycopg2  # noqa: F401 -- the driver SQLAlchemy will use
+    except ImportError:
+        return None
+    server = pgserver.get_server(tempfile.mkdtemp(prefix="meetings-pg-"), cleanup_mode="stop")
+    return server.get_uri().replace("postgresql://", "postgresql+psycopg2://", 1)
+
+
+def fresh_database(url):
+    engine = db.configure(url)
+    if engine.dialect.name != "sqlite":
+        with engine.begin() as conn:
+            db.Base.metadata.drop_all(conn)
+            conn.execute(text("DROP TABLE IF EXISTS schema_version"))
+    db.init_db()
+    scheduler.rebuild_interval_index()
+    return engine
+
+
+def check_bookings():
+    t = BASE_TIME
+    meeting, error = scheduler.create_meeting("Sync", "Rahul, Priya", t, t + HOUR)
+    assert error is None, error
+    other, error = scheduler.create_meeting("Other team", "Sam", t, t + HOUR)
+    assert error is None, "disjoint attendees must not conflict"
+    _, error = scheduler.create_meeting("Clash", "priya", t + HOUR / 2, t + 2 * HOUR)
+    assert error, "shared attendee must conflict"
+
+    ok, _ = scheduler.edit_meeting(other.id, participants="Sam, Rahul")
+    assert not ok, "adding a busy attendee must conflict"
+    ok, error = scheduler.edit_meeting(other.id, start_time=t + HOUR, end_time=t + 2 * HOUR,
+                                       participants="Sam, Rahul")
+    assert ok, error
+
+    report = scheduler.bulk_create_meetings([
+        {"title": "a", "participants": "Zed", "start_time": t, "end_time": t + HOUR},
+        {"title": "b", "participants": "zed", "start_time": t + HOUR / 2, "end_time": t + HOUR},
+        {"title": "c", "participants": "Amy", "start_time": t, "end_time": t + HOUR,
+         "recurrence_type": "weekly"},
+    ])
+    assert [entry["status"] for entry in report] == ["created", "conflict", "created"], report
+
+    ok, error = scheduler.delete_meeting(meeting.id)
+    assert ok, error
+    _, error = scheduler.create_meeting("Retry", "priya", t + HOUR / 2, t + HOUR)
+    assert error is None, error
+
+
+def check_concurrent_writers(writers=8, attempts=25):
+    def writer(number):
+        for i in range(attempts):
+            start = BASE_TIME + timedelta(days=7, minutes=20 * ((number + i) % 10))
+            scheduler.create_meeting("Load", "Contended", start, start + timedelta(minutes=30))
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with db.session_scope() as session:
+        assert session.execute(DOUBLE_BOOKINGS_SQL).scalar() == 0, "double booking"
+
+
+def check_other_process(url):
+    """
+    A meeting booked by another process shows up in this one's reads
+    (cached ranges, page totals, free slots, proposal checks) within
+    REVISION_CHECK_INTERVAL.
+    """
+    day = BASE_TIME.replace(hour=0) + timedelta(days=21)
+    slot = (day.replace(hour=11), day.replace(hour=11, minute=30))
+    window = (slot[0], day.replace(hour=18))
+    _, total = scheduler.get_meeting_page(0, 20)
+    assert scheduler.find_free_slots("Sam", slot[1] - slot[0], window, n=1) == [slot]
+    assert scheduler.get_meetings_in_range(*window)[0] == []
+    assert scheduler.check_proposal(*slot, participants="Sam") == ([], [])
+
+    booking = (
+        "from agent import scheduler; "
+        f"_, error = scheduler.create_meeting('Elsewhere', 'Sam', {slot[0]!r}, {slot[1]!r}); "
+        "assert error is None, error"
+    )
+    subprocess.run(
+        [sys.executable, "-c", f"import datetime; {booking}"],
+        env={**os.environ, "DATABASE_URL": url}, check=True,
+    )
+    time.sleep(scheduler.REVISION_CHECK_INTERVAL)
+
+    assert [row.title for row in scheduler.get_meetings_in_range(*window)[0]] == ["Elsewhere"]
+    assert scheduler.get_meeting_page(0, 20)[1] == total + 1
+    assert scheduler.find_free_slots("Sam", slot[1] - slot[0], window, n=1) != [slot]
+    conflicts, _ = scheduler.check_proposal(*slot, participants="Sam")
+    assert [row.title for row in conflicts] == ["Elsewhere"], conflicts
+
+
+def check_overlap_constraint():
+    """
+    Postgres only: a booking the in-memory indexes miss (here, a row
+    written behind their back) is still refused by the database.
+    """
+    start = BASE_TIME + timedelta(days=14)
+    with db.session_scope() as session:
+        meeting = db.Meeting(title="Behind the back", start_time=start, end_time=start + HOUR)
+        meeting.set_participants("Dana")
+        session.add(meeting)
+        session.commit()
+    _, error = scheduler.create_meeting("Clash", "dana", start, start + HOUR)
+    assert error, "overlap constraint did not fire"
+
+
+def _history_ids():
+    rows, _ = scheduler.get_meeting_history(limit=10_000)
+    return [row.id for row in rows]
+
+
+def check_archive():
+    """
+    Archive the first days' meetings: history reads are unchanged, the
+    archived slots still conflict, a new meeting never takes an archived
+    id (even once the newest meeting is deleted), and VACUUM / ANALYZE run
+    on the backend.
+    """
+    before = _history_ids()
+    moved = scheduler.archive_meetings(BASE_TIME + timedelta(days=2), batch_size=2)
+    assert moved, "nothing archived"
+    assert _history_ids() == before, "history changed by archival"
+    _, error = scheduler.create_meeting("Late", "Priya", BASE_TIME + HOUR / 2, BASE_TIME + HOUR)
+    assert error, "booking over an archived meeting was accepted"
+
+    ok, error = scheduler.delete_meeting(max(row.id for row in scheduler.get_all_meetings()))
+    assert ok, error
+    meeting, error = scheduler.create_meeting("Fresh", "Nobody", BASE_TIME + timedelta(days=30),
+                                              BASE_TIME + timedelta(days=30) + HOUR)
+    assert error is None, error
+    assert meeting.id not in before, f"id {meeting.id} reused"
+    ids = _history_ids()
+    assert len(ids) == len(set(ids)), "duplicate ids in history"
+    ran = archive.run_maintenance(moved, force=True)
+    assert ran == ["vacuum", "analyze"], ran
+
+
+def run(url):
+    engine = fresh_database(url)
+    check_bookings()
+    check_concurrent_writers()
+    check_other_process(engine.url.render_as_string(hide_password=False))
+    constrained = db.ensure_postgres_constraints(engine)
+    if constrained:
+        check_overlap_constraint()
+    check_archive()
+    assert engine.pool.checkedout() == 0, "leaked connections"
+    print(f"ok   {engine.dialect.name:<10} {engine.url.render_as_string(hide_password=True)}"
+          f"  overlap constraint: {'yes' if constrained else 'no'}")
+
+
+def main():
+    urls = sys.argv[1:]
+    if not urls:
+        urls = [f"sqlite:///{tempfile.mkdtemp(prefix='meetings-bench-')}/meetings.db"]
+        stand_in = postgres_stand_in()
+        if stand_in:
+            urls.append(stand_in)
+        else:
+            print("skip postgres (pip install pgserver psycopg2-binary for a local stand-in)")
+    for url in urls:
+        run(url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Load generator for agent.service: keep-alive clients firing a mix of
+requests, reporting p50/p99 latency and requests per second.
+
+    python -m benchmarks.load_service [--url http://127.0.0.1:8080]
+        [--concurrency 16] [--requests 4000] [--workers 8]
+
+Without --url a service is started in a subprocess on a temp SQLite
+database and seeded first.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from urllib.parse import urlencode, urlsplit
+
+from ._common import BASE_TIME
+
+PEOPLE = [f"person {i}" for i in range(50)]
+
+# (endpoint label, weight)
+MIX = [
+    ("GET /meetings", 35),
+    ("GET /free-slots", 15),
+    ("POST /parse", 15),
+    ("POST /propose", 10),
+    ("POST /meetings", 17),
+    ("PATCH /meetings/<id>", 5),
+    ("DELETE /meetings/<id>", 3),
+]
+
+PHRASES = [
+    "Schedule a 30 minute sync with {a} and {b} tomorrow at 4 pm about roadmap",
+    "1 hour call with {a} today at 11:30 am about hiring",
+    "Weekly standup with {a}, {b} at 10 am",
+]
+
+
+class Client:
+    """
+    One keep-alive HTTP/1.1 connection.
+    """
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self.reader.readexactly(length)
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+def random_slot(rng):
+    start = BASE_TIME + timedelta(days=rng.randrange(28), minutes=30 * rng.randrange(18))
+    return start, start + timedelta(minutes=rng.choice([30, 60]))
+
+
+def make_request(label, rng, meeting_ids):
+    a, b = rng.sample(PEOPLE, 2)
+    start, end = random_slot(rng)
+    if label == "GET /meetings":
+        day = BASE_TIME + timedelta(days=rng.randrange(28))
+        query = {"start": day.isoformat(), "end": (day + timedelta(days=1)).isoformat(), "limit": 50}
+        return "GET", f"/meetings?{urlencode(query)}", None
+    if label == "GET /free-slots":
+        query = {
+            "participants": f"{a}, {b}", "duration": 30,
+            "start": BASE_TIME.isoformat(), "end": (BASE_TIME + timedelta(days=14)).isoformat(),
+        }
+        return "GET", f"/free-slots?{urlencode(query)}", None
+    if label in ("POST /parse", "POST /propose"):
+        return "POST", label.split()[1], {"text": rng.choice(PHRASES).format(a=a, b=b)}
+    if label == "POST /meetings" or not meeting_ids:
+        return "POST", "/meetings", {
+            "title": "Load", "participants": f"{a}, {b}",
+            "start_time": start.isoformat(), "end_time": end.isoformat(),
+        }
+    meeting_id = rng.choice(meeting_ids)
+    if label == "PATCH /meetings/<id>":
+        return "PATCH", f"/meetings/{meeting_id}", {
+            "start_time": start.isoformat(), "end_time": end.isoformat(),
+        }
+    meeting_ids.remove(meeting_id)
+    return "DELETE", f"/meetings/{meeting_id}", None
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def seed(host, port, n, rng):
+    client = Client(host, port)
+    ids = []
+    for _ in range(n):
+        a, b = rng.sample(PEOPLE, 2)
+        start, end = random_slot(rng)
+        status, payload = await client.request("POST", "/meetings", {
+            "title": "Seed", "participants": f"{a}, {b}",
+            "start_time": start.isoformat(), "end_time": end.isoformat(),
+        })
+        if status == 201:
+            ids.append(payload["id"])
+    await client.close()
+    return ids
+
+
+# Bodies with a field of the wrong JSON type, times that would leave the
+# meeting ending before it starts, or out-of-range page sizes and free-slot
+# searches: each must be a 400, not a 500 or a 200.
+MALFORMED = [
+    ("POST", "/meetings", {"participants": ["Rahul", "Priya"]}),
+    ("POST", "/meetings", {"participants": 42}),
+    ("POST", "/meetings", {"title": {"text": "Sync"}}),
+    ("POST", "/meetings", {"start_time": 1736150400}),
+    ("PATCH", "/meetings/{id}", {"participants": ["Sam"]}),
+    ("PATCH", "/meetings/{id}", {"title": 7}),
+    ("POST", "/meetings", {"start_time": "2026-01-01T12:00", "end_time": "2026-01-01T11:00"}),
+    # After the stored end (seed meetings are in the next few weeks)...
+    ("PATCH", "/meetings/{id}", {"start_time": "2100-01-01T12:00"}),
+    # ...and before the stored start.
+    ("PATCH", "/meetings/{id}", {"end_time": "2000-01-01T11:00"}),
+    ("GET", "/meetings?limit=0", None),
+    ("GET", "/meetings?limit=-1", None),
+    ("GET", "/free-slots?duration=0", None),
+    ("GET", "/free-slots?duration=-30", None),
+    ("GET", "/free-slots?n=-1", None),
+    ("GET", "/free-slots?start=2025-01-01T00:00&end=2125-01-01T00:00&mode=bitmap", None),
+]
+
+
+async def check_malformed(host, port, meeting_id):
+    client = Client(host, port)
+    start, end = random_slot(random.Random(1))
+    valid = {"title": "Bad", "participants": "Sam", "start_time": start.isoformat(), "end_time": end.isoformat()}
+    for method, path, fields in MALFORMED:
+        payload = {**valid, **fields} if method == "POST" else fields
+        status, body = await client.request(method, path.format(id=meeting_id), payload)
+        assert status == 400, (method, path, fields, status, body)
+    await client.close()
+
+
+async def run_load(host, port, concurrency, total, seed_meetings):
+    rng = random.Random(0)
+    meeting_ids = await seed(host, port, seed_meetings, rng)
+    await check_malformed(host, port, meeting_ids[0])
+    labels = [label for label, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    latencies = {label: [] for label in labels}
+    statuses = {}
+    remaining = [total]
+
+    async def worker(number):
+        client = Client(host, port)
+        worker_rng = random.Random(number)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            label = worker_rng.choices(labels, weights)[0]
+            method, path, payload = make_request(label, worker_rng, meeting_ids)
+            started = time.perf_counter()
+            status, body = await client.request(method, path, payload)
+            latencies[label].append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if method == "POST" and path == "/meetings" and status == 201:
+                meeting_ids.append(body["id"])
+        await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    print(f"{'endpoint':<24} {'count':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    everything = []
+    for label in labels:
+        values = sorted(latencies[label])
+        everything.extend(values)
+        print(f"{label:<24} {len(values):>6} {percentile(values, 0.5) * 1000:8.2f} "
+              f"{percentile(values, 0.99) * 1000:8.2f}")
+    everything.sort()
+    print(f"{'all':<24} {len(everything):>6} {percentile(everything, 0.5) * 1000:8.2f} "
+          f"{percentile(everything, 0.99) * 1000:8.2f}")
+    print(f"concurrency={concurrency}  {len(everything) / seconds:,.0f} requests/s  "
+          f"statuses={dict(sorted(statuses.items()))}")
+    assert not any(status >= 500 for status in statuses), "server errors"
+
+
+def start_service(workers):
+    """
+    Launch agent.service on a free port against a temp SQLite database.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="meetings-bench-"), "meetings.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "agent.service", "--port", "0", "--workers", str(workers)],
+        env=env, stdout=subprocess.PIPE, text=True,
+    )
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("service failed to start")
+    return process, line.strip().rsplit("/", 1)[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed-meetings", type=int, default=500)
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, address = start_service(args.workers)
+        url = f"http://{address}"
+    target = urlsplit(url)
+    try:
+        asyncio.run(run_load(
+            target.hostname, target.port, args.concurrency, args.requests, args.seed_meetings
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
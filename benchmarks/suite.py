@@ -0,0 +1,219 @@
+"""
+Benchmark suite: the scheduler, the parser and the calendar view's data
+prep against synthetic calendars of growing size (see synthetic_meetings),
+each seeded into a fresh temporary SQLite database. Results are written as
+JSON, so runs can be compared between commits.
+
+    python -m benchmarks.suite [--sizes 1000 100000 1000000] [--ops 200]
+                               [--out results.json]
+                               [--compare baseline.json] [--tolerance 0.25]
+
+Timings are microseconds per operation (_us) or seconds (_s); lower is
+better except parses_per_s. Reads are measured cold: the read cache is
+invalidated before each one. With --compare, every metric that got worse
+by more than the tolerance is listed and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy
+
+from agent import scheduler
+from agent.cache import read_cache
+from agent.calendar_view import agenda_frame
+
+from ._common import BASE_TIME, seed_synthetic, timed, use_temp_database
+from .bench_nlp import load_golden, throughput
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+PER_DAY = 40
+VIEW_DAYS = {"day": 1, "week": 7, "month": 31}
+
+
+def _per_op(fn, items):
+    """
+    Mean microseconds of fn(item) over `items`.
+    """
+    pending = iter(items)
+    return timed(lambda: fn(next(pending)), len(items))
+
+
+def _cold(fn):
+    def call(*args):
+        read_cache.invalidate()
+        return fn(*args)
+    return call
+
+
+def bench_size(n, ops, seed=0):
+    rng = random.Random(seed)
+    results = {}
+    use_temp_database()
+
+    started = time.perf_counter()
+    people = seed_synthetic(n, per_day=PER_DAY, seed=seed)
+    results["seed_s"] = time.perf_counter() - started
+    started = time.perf_counter()
+    scheduler.rebuild_interval_index()
+    results["index_build_s"] = time.perf_counter() - started
+
+    span_days = max(1, n // PER_DAY)
+    last_start = BASE_TIME + timedelta(days=span_days)
+
+    def random_time(days=span_days):
+        return BASE_TIME.replace(hour=9) + timedelta(
+            days=rng.randrange(days), minutes=15 * rng.randrange(32)
+        )
+
+    # Conflict checks: two existing people at a random working-hours slot
+    # (a hit also loads the conflicting meetings).
+    probes = [(random_time(), ", ".join(rng.sample(people, 2))) for _ in range(ops)]
+    results["conflict_check_us"] = _per_op(
+        lambda probe: scheduler.is_conflict(
+            probe[0], probe[0] + timedelta(minutes=30), participants=probe[1]
+        ),
+        probes,
+    )
+
+    # Create, edit and delete the same `ops` meetings: new people, after the
+    # seeded calendar, so none of them conflicts and the table ends as it was.
+    fresh = [
+        (f"Bench {i}", f"bench{i}", last_start + timedelta(days=1 + i // 8, hours=i % 8))
+        for i in range(ops)
+    ]
+    created = []
+
+    def create(spec):
+        title, person, start = spec
+        meeting, error = scheduler.create_meeting(title, person, start, start + timedelta(minutes=30))
+        assert error is None, error
+        created.append((meeting.id, start))
+
+    results["create_us"] = _per_op(create, fresh)
+    results["edit_us"] = _per_op(
+        lambda item: scheduler.edit_meeting(
+            item[0], title="Edited", start_time=item[1] + timedelta(minutes=30),
+            end_time=item[1] + timedelta(minutes=60),
+        ),
+        created,
+    )
+    results["delete_us"] = _per_op(lambda item: scheduler.delete_meeting(item[0]), created)
+
+    # Reads, cold.
+    windows = [random_time() for _ in range(ops)]
+    results["list_week_us"] = _per_op(
+        _cold(lambda start: scheduler.get_meetings_in_range(start, start + timedelta(days=7))),
+        windows,
+    )
+    results["list_page_us"] = _per_op(
+        _cold(lambda start: scheduler.get_meetings_in_range(limit=20, cursor=(start, 0))),
+        windows,
+    )
+
+    # Calendar view data prep: agenda lookup + the DataFrame shown.
+    for view, days in VIEW_DAYS.items():
+        firsts = [random_time(max(1, span_days - days)).date() for _ in range(ops)]
+        results[f"view_{view}_us"] = _per_op(
+            _cold(lambda first: agenda_frame(scheduler.get_agenda(first, first + timedelta(days=days - 1)))),
+            firsts,
+        )
+    return results
+
+
+def bench_parser():
+    now, cases = load_golden()
+    return {"parses_per_s": throughput(now, [case["input"] for case in cases])}
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, ops):
+    report = {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "describe": _git("describe", "--always", "--dirty"),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "ops": ops,
+            "per_day": PER_DAY,
+        },
+        "parser": bench_parser(),
+        "sizes": {},
+    }
+    print(f"parser: {report['parser']['parses_per_s']:,.0f} parses/s", flush=True)
+    for n in sizes:
+        results = bench_size(n, ops)
+        report["sizes"][str(n)] = results
+        print(f"n={n:>9,}  " + "  ".join(
+            f"{key}={value:.2f}" if key.endswith("_s") else f"{key}={value:.1f}"
+            for key, value in results.items()
+        ), flush=True)
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """
+    Metrics at least `tolerance` (a fraction) worse than in `baseline`, as
+    (where, metric, old, new) tuples.
+    """
+    pairs = [("parser", report["parser"], baseline.get("parser", {}))] + [
+        (f"n={size}", results, baseline.get("sizes", {}).get(size, {}))
+        for size, results in report["sizes"].items()
+    ]
+    worse = []
+    for where, new, old in pairs:
+        for metric, value in new.items():
+            if metric not in old or not old[metric]:
+                continue
+            ratio = value / old[metric]
+            if metric.endswith("_per_s"):
+                ratio = 1 / ratio if ratio else float("inf")
+            if ratio > 1 + tolerance:
+                worse.append((where, metric, old[metric], value))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--ops", type=int, default=200, help="operations timed per metric")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a metric counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.ops)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        worse = compare(report, baseline, args.tolerance)
+        against = baseline.get("meta", {}).get("describe")
+        for where, metric, old, new in worse:
+            print(f"REGRESSION {where} {metric}: {old:.2f} -> {new:.2f} ({new / old:.2f}x)")
+        print(f"{len(worse)} regressions beyond {args.tolerance:.0%} against {against}")
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+The hot queries are answered from their composite indexes (SQLite EXPLAIN
+QUERY PLAN on a seeded temp database; see benchmarks.check_query_plans).
+"""
+import pytest
+
+from agent import db
+from benchmarks.check_query_plans import HOT_QUERIES, query_plan, seeded_database
+
+
+@pytest.fixture(scope="module")
+def params():
+    return seeded_database()
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [(sql, expected) for _, sql, expected in HOT_QUERIES],
+    ids=[description for description, _, _ in HOT_QUERIES],
+)
+def test_uses_index(params, sql, expected):
+    with db.engine.connect() as conn:
+        plan = query_plan(conn, sql, params)
+    assert any(index in plan for index in expected), plan